@@ -28,7 +28,7 @@ class DomBot:
         (re.compile(r"^\s*do you want me to (?P<rest>.+)$", re.IGNORECASE), "Please {rest}."),
         (re.compile(r"^\s*i can help(?: you)?(?: with)? (?P<rest>.+)$", re.IGNORECASE), "Please {rest}."),
     )
-    _SCHEDULING_TOOLS = ("discord_schedule_message", "bsky_schedule_post")
+    _SCHEDULING_TOOLS = ("discord_schedule_message", "discord_schedule_messages", "bsky_schedule_post")
     
     def __init__(self, discord_bot=None, bluesky_client=None):
         self.settings = get_settings()
@@ -155,7 +155,7 @@ class DomBot:
             # Special handling for tools that need additional context
             if tool_name == "discord_send_now":
                 result = await handler(args, self.discord_bot)
-            elif tool_name == "discord_schedule_message":
+            elif tool_name in ("discord_schedule_message", "discord_schedule_messages"):
                 result = await handler(args, self.discord_bot, channel_id)
             elif tool_name == "bsky_schedule_post":
                 result = await handler(args, self.bluesky_client, image_data, image_content_type)
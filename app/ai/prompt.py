@@ -38,6 +38,7 @@ CRITICAL: When scheduling messages or posts:
 - You MUST use FUTURE UTC datetimes (after the current datetime shown above)
 - Use ISO 8601 format ending with 'Z' (e.g., '2026-01-06T17:30:00Z' for 2.5 hours from now if current time is 2026-01-06T15:00:00Z)
 - For "every few hours" requests, schedule each message at intervals from the current time (e.g., +2 hours, +4 hours, +6 hours)
+- To schedule several Discord messages, use one discord_schedule_messages call with all of them
 - NEVER use dates from the past (2023, 2024, or any date before current date)
 - Calculate relative times: if user says "every 2 hours", start from current time and add 2 hours for each check-in
 
@@ -5,37 +5,82 @@ from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 import json
 
+from sqlalchemy.exc import OperationalError
+
 from app.core.scheduler import get_scheduler
 from app.core.logger import log_event, log_error
-from app.storage.db import get_db_sync
+from app.storage.async_db import run_db, run_db_read
+from app.storage.codec import event_payload
+from app.storage.db import get_read_db, unit_of_work
 from app.storage.models import Event, Memory
+from app.storage.search import search_events, search_memory
+from app.storage.stats import bump_table_counter
 from app.ai.audit import log_tool_call
 
 
+def _parse_utc(value: Optional[str]) -> Optional[datetime]:
+    """Parse an optional ISO 8601 string into a naive UTC datetime (as stored in SQLite)."""
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
 async def memory_search(args: Dict[str, Any]) -> Dict[str, Any]:
     """
     Search memory/events in the database by query string.
     
+    Uses the FTS5 index (ranked MATCH) when available, otherwise falls back
+    to a substring scan of event payloads. The query runs on a DB reader
+    thread, not the event loop.
+    
     Args:
-        args: Dictionary with 'query' (str) and optional 'limit' (int)
+        args: Dictionary with 'query' (str) and optional 'limit' (int),
+              'source', 'type', 'since' and 'until' (ISO 8601) filters
         
     Returns:
-        Dictionary with 'results' list
+        Dictionary with 'results' list (events) and 'memories' list
     """
+    return await run_db_read(_memory_search, args)
+
+
+def _memory_search(args: Dict[str, Any]) -> Dict[str, Any]:
     query = args.get("query", "")
     limit = args.get("limit", 10)
+    source = args.get("source")
+    event_type = args.get("type")
     
-    db = get_db_sync()
+    db = get_read_db(allow_snapshot=False)
     try:
-        # Search in Event table (payload_json contains searchable text)
-        events = db.query(Event).filter(
-            Event.payload_json.contains(query)
-        ).order_by(Event.ts.desc()).limit(limit).all()
+        since = _parse_utc(args.get("since"))
+        until = _parse_utc(args.get("until"))
+        
+        memories = []
+        try:
+            events = search_events(
+                db, query, limit=limit, source=source, event_type=event_type, since=since, until=until
+            )
+            memories = search_memory(db, query, limit=limit)
+        except OperationalError:
+            # FTS5 index unavailable - fall back to substring scan
+            db.rollback()
+            q = db.query(Event).filter(Event.payload_json.contains(query))
+            if source:
+                q = q.filter(Event.source == source)
+            if event_type:
+                q = q.filter(Event.type == event_type)
+            if since:
+                q = q.filter(Event.ts >= since)
+            if until:
+                q = q.filter(Event.ts <= until)
+            events = q.order_by(Event.ts.desc()).limit(limit).all()
         
         results = []
         for event in events:
             try:
-                payload = json.loads(event.payload_json)
+                payload = event_payload(event)
             except:
                 payload = {"raw": event.payload_json[:200]}
             
@@ -47,7 +92,16 @@ async def memory_search(args: Dict[str, Any]) -> Dict[str, Any]:
                 "payload": payload
             })
         
-        result = {"results": results, "count": len(results)}
+        memory_results = [
+            {
+                "key": memory.key,
+                "value": memory.value,
+                "updated_at": memory.updated_at.isoformat() if memory.updated_at else None
+            }
+            for memory in memories
+        ]
+        
+        result = {"results": results, "count": len(results), "memories": memory_results}
         log_tool_call("memory_search", args, result)
         return result
     except Exception as e:
@@ -59,7 +113,7 @@ async def memory_search(args: Dict[str, Any]) -> Dict[str, Any]:
 
 async def memory_upsert(args: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Insert or update a memory entry in the database.
+    Insert or update a memory entry in the database (on the DB writer thread).
     
     Args:
         args: Dictionary with 'key' (str), 'value' (str), and optional 'metadata' (dict)
@@ -67,6 +121,10 @@ async def memory_upsert(args: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dictionary with 'key', 'created' (bool), 'updated' (bool)
     """
+    return await run_db(_memory_upsert, args)
+
+
+def _memory_upsert(args: Dict[str, Any]) -> Dict[str, Any]:
     key = args.get("key")
     value = args.get("value")
     metadata = args.get("metadata")
@@ -74,38 +132,35 @@ async def memory_upsert(args: Dict[str, Any]) -> Dict[str, Any]:
     if not key or not value:
         return {"error": "key and value are required"}
     
-    db = get_db_sync()
     try:
-        # Check if exists
-        existing = db.query(Memory).filter(Memory.key == key).first()
-        
-        metadata_json = json.dumps(metadata) if metadata else None
-        
-        if existing:
-            existing.value = value
-            existing.metadata_json = metadata_json
-            existing.updated_at = datetime.now(timezone.utc)
-            created = False
-        else:
-            memory = Memory(
-                key=key,
-                value=value,
-                metadata_json=metadata_json
-            )
-            db.add(memory)
-            created = True
-        
-        db.commit()
-        
-        result = {"key": key, "created": created, "updated": not created}
-        log_tool_call("memory_upsert", args, result)
+        # The memory row and its tool_call event commit together
+        with unit_of_work() as db:
+            # Check if exists
+            existing = db.query(Memory).filter(Memory.key == key).first()
+            
+            metadata_json = json.dumps(metadata) if metadata else None
+            
+            if existing:
+                existing.value = value
+                existing.metadata_json = metadata_json
+                existing.updated_at = datetime.now(timezone.utc)
+                created = False
+            else:
+                memory = Memory(
+                    key=key,
+                    value=value,
+                    metadata_json=metadata_json
+                )
+                db.add(memory)
+                bump_table_counter(db, "memory")
+                created = True
+            
+            result = {"key": key, "created": created, "updated": not created}
+            log_tool_call("memory_upsert", args, result)
         return result
     except Exception as e:
-        db.rollback()
         log_error("dom_bot", e, {"tool": "memory_upsert", "args": args})
         return {"error": str(e)}
-    finally:
-        db.close()
 
 
 async def discord_send_now(args: Dict[str, Any], discord_bot) -> Dict[str, Any]:
@@ -211,7 +266,7 @@ async def discord_schedule_message(
         
         # Schedule it
         scheduler = get_scheduler()
-        task_id = scheduler.schedule_at(
+        task_id = await scheduler.schedule_at_async(
             when_dt,
             send_scheduled_message(),
             name=f"discord_msg_{channel_id}",
@@ -236,6 +291,101 @@ async def discord_schedule_message(
         return {"error": str(e)}
 
 
+async def discord_schedule_messages(
+    args: Dict[str, Any],
+    discord_bot,
+    channel_id: str
+) -> Dict[str, Any]:
+    """
+    Schedule a sequence of Discord messages in one call.
+
+    All messages are validated first and scheduled together (one database
+    transaction); if any is invalid, none is scheduled. They are sent by
+    the registered 'discord_schedule_message' restore handler.
+
+    Args:
+        args: Dictionary with 'messages': list of {'message', 'when_utc'} items
+        discord_bot: DiscordBot instance
+        channel_id: Discord channel ID
+
+    Returns:
+        Dictionary with 'task_ids' (list) and 'scheduled_for' (ISO strings), in order
+    """
+    items = args.get("messages") or []
+    if not items:
+        return {"error": "messages is required"}
+
+    try:
+        now = datetime.now(timezone.utc)
+        entries = []
+        for index, item in enumerate(items):
+            message = item.get("message", "")
+            when_utc_str = item.get("when_utc", "")
+            if not message or not when_utc_str:
+                return {"error": f"messages[{index}]: message and when_utc are required"}
+            try:
+                when_dt = datetime.fromisoformat(when_utc_str.replace("Z", "+00:00"))
+            except ValueError as e:
+                return {"error": f"messages[{index}]: Invalid datetime format: {str(e)}"}
+            if when_dt.tzinfo is None:
+                when_dt = when_dt.replace(tzinfo=timezone.utc)
+            else:
+                when_dt = when_dt.astimezone(timezone.utc)
+            if when_dt <= now:
+                log_event(
+                    source="dom_bot",
+                    event_type="scheduling_error_past_date",
+                    payload={
+                        "requested": when_dt.isoformat(),
+                        "current": now.isoformat(),
+                        "message_preview": message[:100]
+                    }
+                )
+                return {
+                    "error": (
+                        f"messages[{index}]: Cannot schedule message in the past. "
+                        f"Requested: {when_dt.isoformat()}, "
+                        f"Current UTC: {now.isoformat()}. "
+                        f"Nothing was scheduled; please use FUTURE datetimes relative to the current time."
+                    )
+                }
+            entries.append((when_dt, "discord_schedule_message", {"message": message, "channel_id": channel_id}))
+
+        scheduler = get_scheduler()
+        task_ids = await scheduler.schedule_many_async(entries, name=f"discord_msg_{channel_id}")
+
+        result = {
+            "task_ids": task_ids,
+            "task_id": task_ids[0],
+            "scheduled_for": [when_dt.isoformat() for when_dt, _, _ in entries],
+            "count": len(task_ids),
+            "success": True
+        }
+        log_tool_call("discord_schedule_messages", args, result)
+        return result
+    except Exception as e:
+        log_error("dom_bot", e, {"tool": "discord_schedule_messages", "count": len(items)})
+        return {"error": str(e)}
+
+
+def _post_to_bluesky(
+    bluesky_client,
+    text: str,
+    image_data: Optional[bytes] = None,
+    image_content_type: str = "image/jpeg"
+) -> Dict[str, Any]:
+    """Post text (and an optional image) with the sync Bluesky client; blocks on HTTP."""
+    if image_data:
+        # Upload blob first
+        blob_result = bluesky_client.upload_blob(image_data, image_content_type)
+        images = [{
+            "blob": blob_result.get("blob", {}),
+            "alt": text[:500]  # Use text as alt
+        }]
+        return bluesky_client.create_image_post(text, images)
+    return bluesky_client.post_message(text)
+
+
 async def bsky_schedule_post(
     args: Dict[str, Any],
     bluesky_client,
@@ -307,19 +457,12 @@ async def bsky_schedule_post(
             except Exception as e:
                 return {"error": f"Invalid base64 image data: {str(e)}"}
         
-        # Create coroutine to post
+        # Create coroutine to post (the client is sync: its HTTP calls run on a scheduler worker thread)
         async def post_scheduled():
             try:
-                if final_image_data:
-                    # Upload blob first
-                    blob_result = bluesky_client.upload_blob(final_image_data, final_image_type)
-                    images = [{
-                        "blob": blob_result.get("blob", {}),
-                        "alt": text[:500]  # Use text as alt
-                    }]
-                    post_result = bluesky_client.create_image_post(text, images)
-                else:
-                    post_result = bluesky_client.post_message(text)
+                post_result = await get_scheduler().run_blocking(
+                    _post_to_bluesky, bluesky_client, text, final_image_data, final_image_type
+                )
                 
                 log_event(
                     source="dom_bot",
@@ -344,7 +487,7 @@ async def bsky_schedule_post(
             import base64
             image_b64 = base64.b64encode(final_image_data).decode('utf-8')
         
-        task_id = scheduler.schedule_at(
+        task_id = await scheduler.schedule_at_async(
             when_dt,
             post_scheduled(),
             name="bsky_post",
@@ -377,6 +520,7 @@ TOOL_HANDLERS = {
     "memory_upsert": memory_upsert,
     "discord_send_now": discord_send_now,
     "discord_schedule_message": discord_schedule_message,
+    "discord_schedule_messages": discord_schedule_messages,
     "bsky_schedule_post": bsky_schedule_post,
 }
 
@@ -422,8 +566,8 @@ def register_scheduler_restore_handlers(
     
     # Register Bluesky post restoration handler
     if bluesky_client:
-        async def restore_bsky_post(parameters: Dict[str, Any]) -> None:
-            """Restore a scheduled Bluesky post."""
+        def restore_bsky_post(parameters: Dict[str, Any]) -> None:
+            """Restore a scheduled Bluesky post (sync: the scheduler runs it on a worker thread)."""
             text = parameters.get("text", "")
             image_bytes_b64 = parameters.get("image_bytes")
             image_content_type = parameters.get("image_content_type", "image/jpeg")
@@ -434,16 +578,7 @@ def register_scheduler_restore_handlers(
                     if image_bytes_b64:
                         image_data = base64.b64decode(image_bytes_b64)
                     
-                    if image_data:
-                        # Upload blob first
-                        blob_result = bluesky_client.upload_blob(image_data, image_content_type)
-                        images = [{
-                            "blob": blob_result.get("blob", {}),
-                            "alt": text[:500]
-                        }]
-                        post_result = bluesky_client.create_image_post(text, images)
-                    else:
-                        post_result = bluesky_client.post_message(text)
+                    post_result = _post_to_bluesky(bluesky_client, text, image_data, image_content_type)
                     
                     log_event(
                         source="scheduler",
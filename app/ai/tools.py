@@ -21,6 +21,22 @@ def get_tools() -> list[Dict[str, Any]]:
                             "type": "integer",
                             "description": "Maximum number of results to return",
                             "default": 10
+                        },
+                        "source": {
+                            "type": "string",
+                            "description": "Optional event source filter (e.g., 'discord', 'dom_bot', 'scheduler')"
+                        },
+                        "type": {
+                            "type": "string",
+                            "description": "Optional event type filter (e.g., 'tool_call', 'message_sent')"
+                        },
+                        "since": {
+                            "type": "string",
+                            "description": "Optional ISO 8601 UTC datetime; only events at or after this time"
+                        },
+                        "until": {
+                            "type": "string",
+                            "description": "Optional ISO 8601 UTC datetime; only events at or before this time"
                         }
                     },
                     "required": ["query"]
@@ -91,6 +107,37 @@ def get_tools() -> list[Dict[str, Any]]:
                 }
             }
         },
+        {
+            "type": "function",
+            "function": {
+                "name": "discord_schedule_messages",
+                "description": "Schedule a sequence of Discord messages (e.g. a series of check-ins) in one call; all are scheduled or none",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "messages": {
+                            "type": "array",
+                            "description": "Messages to schedule, each with its own send time",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "message": {
+                                        "type": "string",
+                                        "description": "Message text to send"
+                                    },
+                                    "when_utc": {
+                                        "type": "string",
+                                        "description": "ISO 8601 datetime string in UTC ending with 'Z' (e.g., '2026-01-06T17:30:00Z'). MUST be a FUTURE datetime relative to the current time provided in the system message."
+                                    }
+                                },
+                                "required": ["message", "when_utc"]
+                            }
+                        }
+                    },
+                    "required": ["messages"]
+                }
+            }
+        },
         {
             "type": "function",
             "function": {
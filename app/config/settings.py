@@ -1,4 +1,6 @@
 """Configuration management using Pydantic settings."""
+from typing import Dict
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -38,6 +40,81 @@ class Settings(BaseSettings):
     # OpenAI - Required for Dom Bot
     openai_api_key: str | None = Field(default=None, description="OpenAI API Key")
     
+    # Database engine (SQLite pragmas applied to every connection, plus pool sizing)
+    db_journal_mode: str = Field(default="wal", description="SQLite journal mode: wal | delete | truncate | persist")
+    db_synchronous: str = Field(default="normal", description="SQLite synchronous: off | normal | full | extra")
+    db_events_file: str = Field(default="", description="Database file for events, counters and error aggregates (empty keeps them in local.db)")
+    db_control_file: str = Field(default="", description="Database file for consent, scheduler tasks and memory (empty keeps them in local.db)")
+    db_busy_timeout_ms: int = Field(default=5000, description="Milliseconds to wait on a locked database before failing")
+    db_mmap_size: int = Field(default=256 * 1024 * 1024, description="Bytes of the database file to memory-map (0 disables)")
+    db_cache_size_kib: int = Field(default=65536, description="Page cache size per connection in KiB")
+    db_temp_store: str = Field(default="memory", description="SQLite temp_store: default | file | memory")
+    db_pool_size: int = Field(default=5, description="Connections kept open in the pool")
+    db_max_overflow: int = Field(default=10, description="Extra connections allowed beyond the pool size under load")
+    db_pool_timeout: float = Field(default=30.0, description="Seconds to wait for a free pooled connection")
+    db_read_pool_size: int = Field(default=5, description="Connections kept open by the read-only engine")
+    db_read_max_overflow: int = Field(default=10, description="Extra read-only connections allowed under load")
+    db_read_statement_timeout_ms: int = Field(default=10000, description="Interrupt read-only statements after this long (0 disables)")
+    db_read_snapshot_path: str | None = Field(default=None, description="Serve dashboard reads from this periodically refreshed copy")
+    db_read_snapshot_interval_seconds: float = Field(default=300.0, description="Seconds between read snapshot refreshes")
+    db_auto_vacuum: str = Field(default="incremental", description="auto_vacuum for new databases: none | full | incremental")
+    db_maintenance_cron: str = Field(default="30 4 * * *", description="Cron schedule for database maintenance (empty disables)")
+    db_maintenance_timezone: str = Field(default="UTC", description="Timezone the maintenance cron schedule is in")
+    db_maintenance_budget_seconds: float = Field(default=60.0, description="Time budget for one maintenance run")
+    db_maintenance_vacuum_pages: int = Field(default=2000, description="Free pages reclaimed per incremental_vacuum batch")
+    
+    # Event logging
+    event_writer_mode: str = Field(default="sync", description="Event writer mode: sync | buffered (events logged on an event loop are always buffered)")
+    event_buffer_size: int = Field(default=10000, description="Max events held in memory by the buffered writer")
+    event_batch_size: int = Field(default=200, description="Queued events that trigger an early group commit")
+    event_flush_interval: float = Field(default=0.5, description="Seconds between buffered writer flushes")
+    event_payload_encoding: str = Field(default="json", description="Event payload storage: json | compact (msgpack + zstd)")
+    event_sampling_rules: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Sampling rules keyed 'source:event_type' (e.g. {\"lovense:event_received\": \"rate=5,burst=20\"})"
+    )
+    event_sampling_summary_interval: float = Field(default=60.0, description="Seconds between suppressed-event summaries")
+    event_sinks: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Event sink per source: database | file | console, '*' sets the default (e.g. {\"lovense\": \"file\"})"
+    )
+    event_file_sink_dir: str = Field(default="logs/events", description="Directory for the JSONL file sink")
+    event_file_sink_max_bytes: int = Field(default=50 * 1024 * 1024, description="Rotate the JSONL file sink at this size")
+    event_file_sink_compress: bool = Field(default=True, description="Gzip JSONL files when they are rotated")
+    error_aggregation_window_seconds: float = Field(
+        default=0.0,
+        description="Repeats of the same error within this window are counted, not logged, e.g. 300 (0 disables)"
+    )
+    
+    # Event retention
+    event_retention_days: int = Field(default=0, description="Archive events older than this many days (0 disables)")
+    event_archive_dir: str = Field(default="archive", description="Directory for compressed event archive segments")
+    event_retention_interval_seconds: float = Field(default=3600.0, description="Seconds between retention runs")
+    
+    # Analytics export (python -m app.storage.export)
+    export_dir: str = Field(default="exports", description="Directory for partitioned Parquet exports")
+    export_chunk_size: int = Field(default=5000, description="Rows read and written per export step (bounds memory use)")
+    
+    # Database stats
+    stats_reconcile_interval_seconds: float = Field(default=3600.0, description="Seconds between row counter reconciliations (0 disables)")
+    
+    # Event loop monitoring
+    loop_lag_report_interval_seconds: float = Field(default=60.0, description="Seconds between event loop lag summaries (0 disables)")
+    loop_lag_stall_ms: float = Field(default=50.0, description="Loop wake-up lag above this many milliseconds counts as a stall")
+    
+    # Scheduler
+    scheduler_horizon_minutes: float = Field(default=60.0, description="One-shot tasks due within this many minutes are held in memory; later ones wait in the database")
+    scheduler_refill_interval_seconds: float = Field(default=300.0, description="Seconds between loads of newly in-horizon tasks (kept below the horizon)")
+    scheduler_journal_flush_interval_seconds: float = Field(default=0.5, description="Seconds between write-behind flushes of scheduler status and run-time updates")
+    scheduler_durable_creates: bool = Field(default=True, description="Commit each new one-shot task on its own instead of with the next journal flush")
+    scheduler_max_concurrency: int = Field(default=16, description="Task runs the scheduler executes at once, across all handler types")
+    scheduler_handler_concurrency: int = Field(default=4, description="Concurrent runs allowed per handler type (or periodic task)")
+    scheduler_handler_limits: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Per-handler_type overrides of the concurrent run limit (e.g. {\"bsky_schedule_post\": 1})"
+    )
+    scheduler_worker_threads: int = Field(default=4, description="Threads running sync task handlers and periodic functions")
+    
     def __repr__(self) -> str:
         """Safe representation that never prints secrets."""
         return (
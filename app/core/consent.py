@@ -6,8 +6,9 @@ from typing import List
 from sqlalchemy.orm import Session
 
 from app.core.logger import log_event
-from app.storage.db import get_db_sync
+from app.storage.db import get_db_sync, unit_of_work
 from app.storage.models import ConsentLedger
+from app.storage.stats import bump_table_counter
 
 
 # Default consent expiration (10 minutes)
@@ -113,88 +114,69 @@ def arm_consent(
         allowed_modes: List of allowed modes/topics (default: ["device"])
         db: Optional database session
     """
-    close_db = False
-    if db is None:
-        db = get_db_sync()
-        close_db = True
-    
     try:
-        if allowed_modes is None:
-            allowed_modes = ["device"]
-        
-        armed_until = datetime.now(timezone.utc) + duration
-        
-        entry = ConsentLedger(
-            ts=datetime.now(timezone.utc),
-            consent_active=True,
-            allowed_modes_json=json.dumps(allowed_modes),
-            revoked_topics_json="[]",
-            armed_until_ts=armed_until
-        )
-        
-        db.add(entry)
-        db.commit()
-        
-        log_event(
-            source="consent",
-            event_type="armed",
-            payload={
-                "armed_until": armed_until.isoformat(),
-                "allowed_modes": allowed_modes
-            },
-            db=db
-        )
+        # The ledger entry and its event commit together
+        with unit_of_work(db) as db:
+            if allowed_modes is None:
+                allowed_modes = ["device"]
+            
+            armed_until = datetime.now(timezone.utc) + duration
+            
+            entry = ConsentLedger(
+                ts=datetime.now(timezone.utc),
+                consent_active=True,
+                allowed_modes_json=json.dumps(allowed_modes),
+                revoked_topics_json="[]",
+                armed_until_ts=armed_until
+            )
+            
+            db.add(entry)
+            bump_table_counter(db, "consent_ledger")
+            
+            log_event(
+                source="consent",
+                event_type="armed",
+                payload={
+                    "armed_until": armed_until.isoformat(),
+                    "allowed_modes": allowed_modes
+                }
+            )
     except Exception as e:
-        db.rollback()
         log_event(
             source="consent",
             event_type="arm_error",
-            payload={"error": str(e)},
-            db=db
+            payload={"error": str(e)}
         )
         raise
-    finally:
-        if close_db:
-            db.close()
 
 
 def disarm_consent(db: Session | None = None) -> None:
     """Disarm consent (set consent_active to false)."""
-    close_db = False
-    if db is None:
-        db = get_db_sync()
-        close_db = True
-    
     try:
-        entry = ConsentLedger(
-            ts=datetime.now(timezone.utc),
-            consent_active=False,
-            allowed_modes_json="[]",
-            revoked_topics_json="[]",
-            armed_until_ts=None
-        )
-        
-        db.add(entry)
-        db.commit()
-        
-        log_event(
-            source="consent",
-            event_type="disarmed",
-            payload={},
-            db=db
-        )
+        with unit_of_work(db) as db:
+            entry = ConsentLedger(
+                ts=datetime.now(timezone.utc),
+                consent_active=False,
+                allowed_modes_json="[]",
+                revoked_topics_json="[]",
+                armed_until_ts=None
+            )
+            
+            db.add(entry)
+            bump_table_counter(db, "consent_ledger")
+            
+            log_event(
+                source="consent",
+                event_type="disarmed",
+                payload={}
+            )
     except Exception as e:
-        db.rollback()
         log_event(
             source="consent",
             event_type="disarm_error",
-            payload={"error": str(e)},
-            db=db
+            payload={"error": str(e)}
         )
         raise
-    finally:
-        if close_db:
-            db.close()
 
 
 def safe_mode(db: Session | None = None) -> None:
@@ -208,39 +190,28 @@ def safe_mode(db: Session | None = None) -> None:
     
     Note: Scheduler cancellation must be handled by the caller.
     """
-    close_db = False
-    if db is None:
-        db = get_db_sync()
-        close_db = True
-    
     try:
-        entry = ConsentLedger(
-            ts=datetime.now(timezone.utc),
-            consent_active=False,
-            allowed_modes_json="[]",
-            revoked_topics_json="[]",
-            armed_until_ts=None
-        )
-        
-        db.add(entry)
-        db.commit()
-        
-        log_event(
-            source="consent",
-            event_type="safe_mode",
-            payload={"message": "SAFE MODE activated - all consent disabled"},
-            db=db
-        )
+        with unit_of_work(db) as db:
+            entry = ConsentLedger(
+                ts=datetime.now(timezone.utc),
+                consent_active=False,
+                allowed_modes_json="[]",
+                revoked_topics_json="[]",
+                armed_until_ts=None
+            )
+            
+            db.add(entry)
+            bump_table_counter(db, "consent_ledger")
+            
+            log_event(
+                source="consent",
+                event_type="safe_mode",
+                payload={"message": "SAFE MODE activated - all consent disabled"}
+            )
     except Exception as e:
-        db.rollback()
         log_event(
             source="consent",
             event_type="safe_mode_error",
-            payload={"error": str(e)},
-            db=db
+            payload={"error": str(e)}
         )
         raise
-    finally:
-        if close_db:
-            db.close()
-
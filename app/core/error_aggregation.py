@@ -0,0 +1,124 @@
+"""Fingerprinting and windowed de-duplication of repeated errors."""
+import hashlib
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from app.core.redaction import redact_text
+
+
+MAX_MESSAGE_LENGTH = 500
+
+# Volatile parts of error messages (ids, counts, addresses, timestamps)
+# that shouldn't split otherwise identical errors into separate groups
+_VOLATILE_RE = re.compile(r"0x[0-9a-fA-F]+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}|\d+")
+
+
+def normalize_message(message: str) -> str:
+    """Redact, truncate and strip volatile tokens from an error message."""
+    return _VOLATILE_RE.sub("#", redact_text(message)[:MAX_MESSAGE_LENGTH])
+
+
+def error_fingerprint(source: str, error_type: str, message: str) -> str:
+    """Stable fingerprint for errors that are 'the same' (source, type, normalized message)."""
+    key = f"{source}\x00{error_type}\x00{normalize_message(message)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class _Window:
+    """Occurrences of one fingerprint inside the current aggregation window."""
+
+    __slots__ = ("fingerprint", "source", "error_type", "message", "sample_payload",
+                 "window_start", "opened", "first_seen", "last_seen", "pending")
+
+    def __init__(self, fingerprint: str, source: str, error_type: str, message: str,
+                 sample_payload: Dict[str, Any], now: float, now_utc: datetime):
+        self.fingerprint = fingerprint
+        self.source = source
+        self.error_type = error_type
+        self.message = message
+        self.sample_payload = sample_payload
+        self.window_start = now_utc
+        self.opened = now
+        self.first_seen = now_utc
+        self.last_seen = now_utc
+        self.pending = 1
+
+
+class ErrorAggregator:
+    """
+    Collapses repeats of the same error within a window.
+
+    The first occurrence in a window should be logged in full; repeats are
+    only counted. Counts are handed out in batches by take_pending() and
+    upserted into one aggregate row per (fingerprint, window_start).
+    """
+
+    def __init__(self, window_seconds: float, flush_interval: float = 5.0):
+        self._window_seconds = window_seconds
+        self._flush_interval = flush_interval
+        self._windows: Dict[str, _Window] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def observe(self, source: str, error_type: str, message: str, payload: Dict[str, Any]) -> bool:
+        """
+        Record one error occurrence.
+
+        Returns:
+            True if this opens a new window (log the error in full), False
+            for a repeat that has only been counted
+        """
+        fingerprint = error_fingerprint(source, error_type, message)
+        now = time.monotonic()
+        now_utc = datetime.now(timezone.utc)
+        with self._lock:
+            window = self._windows.get(fingerprint)
+            if window is not None and now - window.opened < self._window_seconds:
+                window.pending += 1
+                window.last_seen = now_utc
+                return False
+            # Keep an expired window's unpersisted count under its own key
+            # until take_pending() hands it out
+            if window is not None and window.pending:
+                self._windows[f"{fingerprint}:{window.opened}"] = window
+            self._windows[fingerprint] = _Window(
+                fingerprint, source, error_type, redact_text(message)[:MAX_MESSAGE_LENGTH], payload, now, now_utc
+            )
+            return True
+
+    def take_pending(self, force: bool = False) -> List[Dict[str, Any]]:
+        """
+        Collect counts not yet persisted, once per flush interval (or now, if forced).
+
+        Returns:
+            One dict per (fingerprint, window) with new occurrences
+        """
+        now = time.monotonic()
+        if not force and now - self._last_flush < self._flush_interval:
+            return []
+        with self._lock:
+            self._last_flush = now
+            pending = []
+            expired: List[str] = []
+            for key, window in self._windows.items():
+                if window.pending:
+                    pending.append({
+                        "fingerprint": window.fingerprint,
+                        "source": window.source,
+                        "error_type": window.error_type,
+                        "message": window.message,
+                        "sample_payload": window.sample_payload,
+                        "window_start": window.window_start,
+                        "first_seen": window.first_seen,
+                        "last_seen": window.last_seen,
+                        "count": window.pending,
+                    })
+                    window.pending = 0
+                if key != window.fingerprint or now - window.opened >= self._window_seconds:
+                    expired.append(key)
+            for key in expired:
+                del self._windows[key]
+            return pending
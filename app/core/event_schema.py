@@ -0,0 +1,93 @@
+"""Event schema registry: payload fields promoted to indexed event columns.
+
+Every event gets the promoted columns filled from top-level payload keys of
+the same name. Event types that keep a field somewhere else register its
+path, so e.g. the tool name of a dom_bot error (payload "tool") still lands
+in Event.tool_name.
+"""
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+
+# Promoted columns and the Python type their values are coerced to
+PROMOTED_FIELDS: Dict[str, type] = {
+    "task_id": str,
+    "tool_name": str,
+    "handler_type": str,
+    "status_code": int,
+    "error_type": str,
+}
+
+MAX_FIELD_LENGTH = 255
+
+FieldPath = Tuple[str, ...]
+
+# (source, event_type) -> {column: payload path}; either side may be "*"
+_SCHEMAS: Dict[Tuple[str, str], Dict[str, FieldPath]] = {}
+
+
+def register_event_schema(source: str, event_type: str, **fields: Union[str, Sequence[str]]) -> None:
+    """
+    Declare where an event type keeps promoted fields.
+
+    Args:
+        source: Event source, or "*" for any
+        event_type: Event type, or "*" for any
+        **fields: Column name -> payload key, or a sequence of keys for a
+            nested value (e.g. task_id=("result", "task_id"))
+
+    Raises:
+        ValueError: If a field is not a promoted column
+    """
+    schema = _SCHEMAS.setdefault((source, event_type), {})
+    for column, path in fields.items():
+        if column not in PROMOTED_FIELDS:
+            raise ValueError(f"'{column}' is not a promoted event field")
+        schema[column] = (path,) if isinstance(path, str) else tuple(path)
+
+
+def _lookup(payload: Dict[str, Any], path: FieldPath) -> Any:
+    value: Any = payload
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _coerce(column: str, value: Any) -> Optional[Any]:
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    if PROMOTED_FIELDS[column] is int:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    return str(value)[:MAX_FIELD_LENGTH]
+
+
+def extract_promoted_fields(source: str, event_type: str, payload: Any) -> Dict[str, Any]:
+    """
+    Extract the promoted column values for one event.
+
+    Returns:
+        Dictionary with every promoted column (None where absent)
+    """
+    fields: Dict[str, Any] = dict.fromkeys(PROMOTED_FIELDS)
+    if not isinstance(payload, dict):
+        return fields
+
+    paths: Dict[str, FieldPath] = {column: (column,) for column in PROMOTED_FIELDS}
+    for key in (("*", "*"), (source, "*"), ("*", event_type), (source, event_type)):
+        schema = _SCHEMAS.get(key)
+        if schema:
+            paths.update(schema)
+
+    for column, path in paths.items():
+        fields[column] = _coerce(column, _lookup(payload, path))
+    return fields
+
+
+# Built-in schemas for events that keep promoted fields under other names
+register_event_schema("dom_bot", "error", tool_name="tool")
+register_event_schema("dom_bot", "tool_call", task_id=("result", "task_id"))
+register_event_schema("scheduler", "persistence_error", task_id="task_name")
@@ -1,99 +1,256 @@
 """Event logging system - logs all external interactions to database."""
+import atexit
+import gzip
 import json
-import re
+import os
+import queue
+import shutil
+import threading
+from abc import ABC, abstractmethod
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
+from sqlalchemy import insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from app.config.settings import get_settings
-from app.storage.db import get_db_sync
-from app.storage.models import Event
+from app.core.error_aggregation import ErrorAggregator
+from app.core.event_schema import extract_promoted_fields
+from app.core.redaction import redact_and_serialize, redact_text, serialize_redacted
+from app.core.sampling import EventSampler
+from app.storage.async_db import drain_db_executors, get_db_executor, in_event_loop
+from app.storage.codec import FORMAT_COMPACT, compact_available, encode_row
+from app.storage.db import ambient_session, get_db_sync
+from app.storage.models import ErrorAggregate, Event
+from app.storage.routing import EVENTS
+from app.storage.search import index_compact_events
+from app.storage.stats import bump_event_counters, count_event_rows
 
 
-# Secrets to redact from logs
-SECRET_PATTERNS = [
-    r'token["\s:=]+([^\s"\'\),]+)',
-    r'password["\s:=]+([^\s"\'\),]+)',
-    r'secret["\s:=]+([^\s"\'\),]+)',
-    r'api[_-]?key["\s:=]+([^\s"\'\),]+)',
-    r'authorization["\s:=]+([^\s"\'\),]+)',
-]
+def redact_secrets(text: str) -> str:
+    """Redact secrets from free text."""
+    return redact_text(text)
 
 
-def redact_secrets(text: str) -> str:
-    """Redact secrets from text."""
-    result = text
-    for pattern in SECRET_PATTERNS:
-        result = re.sub(pattern, r'\1***REDACTED***', result, flags=re.IGNORECASE)
-    return result
+class BufferedEventWriter:
+    """
+    Buffered event writer that group-commits queued events.
+    
+    Events are placed on a bounded in-memory queue and written by a background
+    flusher thread in a single transaction, either every ``flush_interval``
+    seconds or as soon as ``batch_size`` events are waiting.
+    """
+    
+    def __init__(self, max_size: int = 10000, batch_size: int = 200, flush_interval: float = 0.5):
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max(1, max_size))
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = max(0.01, flush_interval)
+        self._wake = threading.Event()
+        self._write_lock = threading.Lock()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        self._thread.start()
+    
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """
+        Queue an event row for writing.
+        
+        Returns:
+            False if the queue is full or the writer is stopped (caller should write inline)
+        """
+        if self._stopped:
+            return False
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            return False
+        if self._queue.qsize() >= self._batch_size:
+            self._wake.set()
+        return True
+    
+    def _run(self) -> None:
+        """Flusher loop: wake on interval or batch size, then drain the queue."""
+        while not self._stopped:
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            self.flush()
+    
+    def _drain(self) -> List[Dict[str, Any]]:
+        """Take up to one batch of rows off the queue."""
+        rows = []
+        while len(rows) < self._batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+    
+    def flush(self) -> int:
+        """
+        Write every queued event to the database.
+        
+        Returns:
+            Number of events written
+        """
+        written = 0
+        with self._write_lock:
+            while True:
+                rows = self._drain()
+                if not rows:
+                    break
+                _write_rows(rows)
+                written += len(rows)
+        return written
+    
+    def stop(self) -> None:
+        """Stop the flusher thread after writing all queued events."""
+        self._stopped = True
+        self._wake.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self.flush()
+    
+    def pending(self) -> int:
+        """Approximate number of events waiting to be written."""
+        return self._queue.qsize()
 
 
-def log_event(
-    source: str,
-    event_type: str,
-    payload: Dict[str, Any] | None = None,
-    db: Session | None = None
-) -> None:
+_writer: Optional[BufferedEventWriter] = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer(for_loop: bool = False) -> Optional[BufferedEventWriter]:
     """
-    Log an event to the database (if enabled), otherwise prints to console.
+    Get the buffered writer if buffered mode is enabled (created on first use).
     
-    Args:
-        source: Source of the event (e.g., 'discord', 'lovense', 'bluesky')
-        event_type: Type of event (e.g., 'api_request', 'message_sent', 'device_connected')
-        payload: Event payload (will be JSON serialized and redacted)
-        db: Optional database session (creates new if not provided)
+    With for_loop, it is created in sync mode too: events logged on an event
+    loop are always group-committed rather than committed one by one.
     """
-    # Check if database is enabled
+    global _writer
     try:
         settings = get_settings()
-        if not settings.enable_database:
-            # Fallback to console logging
-            payload_str = json.dumps(payload or {}, default=str)
-            print(f"[{source}] {event_type}: {payload_str}")
-            return
     except Exception:
-        # If settings can't be loaded, continue with database attempt
-        pass
+        return None
+    if settings.event_writer_mode != "buffered" and not for_loop:
+        return None
+    if _writer is not None:
+        return _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BufferedEventWriter(
+                max_size=settings.event_buffer_size,
+                batch_size=settings.event_batch_size,
+                flush_interval=settings.event_flush_interval,
+            )
+            atexit.register(_writer.stop)
+    return _writer
+
+
+def flush_events() -> int:
+    """
+    Write pending sampling summaries and error counts, and flush buffered
+    events out to their sinks.
+    
+    Call on shutdown and before anything that must observe every logged event
+    (e.g. SAFE MODE).
+    
+    Returns:
+        Number of buffered events written
+    """
+    _emit_sampling_summaries(force=True)
+    _persist_error_aggregates(force=True)
+    written = 0
+    for sink in list(_sinks.values()):
+        try:
+            written += sink.flush()
+        except Exception:
+            pass
+    return written
+
+
+_compact_encoding: Optional[bool] = None
+
+
+def _use_compact_encoding() -> bool:
+    """Whether new events are stored compact (setting enabled and msgpack/zstandard installed)."""
+    global _compact_encoding
+    if _compact_encoding is None:
+        try:
+            _compact_encoding = get_settings().event_payload_encoding == "compact" and compact_available()
+        except Exception:
+            _compact_encoding = False
+    return _compact_encoding
+
+
+def _print_rows(rows: List[Dict[str, Any]], suffix: str = "") -> None:
+    """Fallback console output for rows that could not be written."""
+    for row in rows:
+        print(f"[{row['source']}] {row['type']}{suffix}: {row['payload_json']}")
+
+
+def insert_event_rows(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert prepared event rows (ts, source, type, payload_json and the
+    promoted field columns) in the caller's transaction.
     
+    Applies the configured payload encoding and maintains the FTS index and
+    event counters; the caller commits.
+    """
+    if _use_compact_encoding():
+        # Compact rows aren't indexed by the FTS triggers; index their text here
+        # (rows encode_row left as JSON text are, by the triggers)
+        texts = [row["payload_json"] for row in rows]
+        encoded = [encode_row(dict(row)) for row in rows]
+        ids = db.execute(
+            insert(Event).returning(Event.id, sort_by_parameter_order=True), encoded
+        ).scalars().all()
+        index_compact_events(db, [
+            (event_id, text)
+            for event_id, text, row in zip(ids, texts, encoded)
+            if row["payload_format"] == FORMAT_COMPACT
+        ])
+    elif len(rows) == 1:
+        db.add(Event(**rows[0]))
+    else:
+        db.execute(insert(Event), rows)
+    bump_event_counters(db, count_event_rows(rows))
+
+
+def _write_rows(rows: List[Dict[str, Any]], db: Session | None = None) -> None:
+    """Insert prepared event rows in a single transaction."""
     close_db = False
+    if db is None:
+        db = ambient_session()
     if db is None:
         try:
             db = get_db_sync()
             close_db = True
         except Exception:
             # Database not available, fallback to console
-            payload_str = json.dumps(payload or {}, default=str)
-            print(f"[{source}] {event_type}: {payload_str}")
+            _print_rows(rows)
             return
     
     try:
-        # Prepare payload
-        if payload is None:
-            payload = {}
-        
-        # Serialize and redact
-        payload_str = json.dumps(payload, default=str)
-        payload_str = redact_secrets(payload_str)
-        
-        # Create event
-        event = Event(
-            ts=datetime.now(timezone.utc),
-            source=source,
-            type=event_type,
-            payload_json=payload_str
-        )
-        
-        db.add(event)
+        if close_db:
+            insert_event_rows(db, rows)
+        else:
+            # The caller's session (or unit of work): a failed insert only
+            # rolls back to this savepoint, not the caller's own writes
+            try:
+                with db.begin_nested():
+                    insert_event_rows(db, rows)
+            except Exception:
+                _print_rows(rows, " (DB failed)")
+                return
         db.commit()
-    except Exception as e:
+    except Exception:
         try:
             db.rollback()
         except Exception:
             pass
         # Fallback to console logging on error
-        payload_str = json.dumps(payload or {}, default=str)
-        print(f"[{source}] {event_type} (DB failed): {payload_str}")
+        _print_rows(rows, " (DB failed)")
     finally:
         if close_db and db:
             try:
@@ -102,6 +259,279 @@ def log_event(
                 pass
 
 
+class EventSink(ABC):
+    """Destination for prepared (redacted) event rows."""
+    
+    @abstractmethod
+    def write(self, row: Dict[str, Any], db: Session | None = None) -> None:
+        """Write one row (in the caller's session, if given and the sink uses one)."""
+    
+    def flush(self) -> int:
+        """Push out anything buffered. Returns the number of events written."""
+        return 0
+
+
+class DatabaseSink(EventSink):
+    """Writes events to the SQLite events table (buffered or inline)."""
+    
+    def write(self, row: Dict[str, Any], db: Session | None = None) -> None:
+        try:
+            if not get_settings().enable_database:
+                _print_rows([row])
+                return
+        except Exception:
+            # If settings can't be loaded, continue with database attempt
+            pass
+        
+        if db is None:
+            # Don't stall an event loop on a commit per event: loop callers go
+            # through the bounded writer queue, which group-commits in order
+            writer = _get_writer(for_loop=in_event_loop())
+            if writer is not None and writer.submit(row):
+                return
+        _write_rows([row], db)
+    
+    def flush(self) -> int:
+        # Error counts handed to the DB writer threads by event-loop callers
+        drain_db_executors(timeout=10)
+        if _writer is None:
+            return 0
+        return _writer.flush()
+
+
+class ConsoleSink(EventSink):
+    """Prints events (the fallback when no database is available)."""
+    
+    def write(self, row: Dict[str, Any], db: Session | None = None) -> None:
+        _print_rows([row])
+
+
+JSONL_ACTIVE_FILE = "events.jsonl"
+JSONL_ROTATED_PREFIX = "events-"
+
+
+class JsonlFileSink(EventSink):
+    """
+    Append-only JSON-lines event file, rotated by size.
+    
+    Each line is one event in the archive record layout (ts, source, type,
+    payload_json). When the active file reaches max_bytes it is renamed to
+    events-<UTC timestamp>.jsonl and, optionally, gzip-compressed in the
+    background. Rotated files can be bulk-loaded back into the events table
+    with app.storage.event_files.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int = 50 * 1024 * 1024, compress: bool = True):
+        self.directory = directory
+        self._max_bytes = max(1024, max_bytes)
+        self._compress = compress
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+    
+    @property
+    def active_path(self) -> str:
+        return os.path.join(self.directory, JSONL_ACTIVE_FILE)
+    
+    def _open(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._file = open(self.active_path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+    
+    def write(self, row: Dict[str, Any], db: Session | None = None) -> None:
+        ts = row["ts"]
+        line = json.dumps({
+            "ts": ts.isoformat() if isinstance(ts, datetime) else ts,
+            "source": row["source"],
+            "type": row["type"],
+            "payload_json": row["payload_json"],
+        }) + "\n"
+        try:
+            with self._lock:
+                if self._file is None:
+                    self._open()
+                self._file.write(line)
+                # Hand the line to the OS so a process crash doesn't lose it
+                self._file.flush()
+                self._size += len(line.encode("utf-8"))
+                if self._size >= self._max_bytes:
+                    self._rotate()
+        except OSError:
+            _print_rows([row], " (file sink failed)")
+    
+    def _rotate(self) -> None:
+        """Close the active file and move it aside (caller holds the lock)."""
+        self._file.close()
+        self._file = None
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        rotated = os.path.join(self.directory, f"{JSONL_ROTATED_PREFIX}{stamp}.jsonl")
+        os.replace(self.active_path, rotated)
+        if self._compress:
+            threading.Thread(target=_gzip_file, args=(rotated,), name="event-file-compress", daemon=True).start()
+    
+    def flush(self) -> int:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+        return 0
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _gzip_file(path: str) -> None:
+    """Compress a rotated file to path.gz (written under a temp name, then renamed)."""
+    tmp_path = path + ".gz.tmp"
+    try:
+        with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, path + ".gz")
+        os.remove(path)
+    except OSError as e:
+        print(f"[logger] Failed to compress {path}: {e}")
+
+
+_sinks: Dict[str, EventSink] = {}
+_sink_routes: Optional[Dict[str, str]] = None
+_sinks_lock = threading.Lock()
+
+
+def _create_sink(name: str) -> EventSink:
+    if name == "file":
+        settings = get_settings()
+        sink = JsonlFileSink(
+            settings.event_file_sink_dir,
+            max_bytes=settings.event_file_sink_max_bytes,
+            compress=settings.event_file_sink_compress,
+        )
+        atexit.register(sink.close)
+        return sink
+    if name == "console":
+        return ConsoleSink()
+    return DatabaseSink()
+
+
+def _get_sink(source: str) -> EventSink:
+    """Sink for a source: EVENT_SINKS[source], else EVENT_SINKS['*'], else the database."""
+    global _sink_routes
+    if _sink_routes is None:
+        try:
+            routes = dict(get_settings().event_sinks)
+        except Exception:
+            routes = {}
+        for key, name in list(routes.items()):
+            if name not in ("database", "file", "console"):
+                print(f"[logger] Ignoring unknown event sink '{name}' for '{key}'")
+                del routes[key]
+        _sink_routes = routes
+    
+    name = _sink_routes.get(source) or _sink_routes.get("*") or "database"
+    sink = _sinks.get(name)
+    if sink is None:
+        with _sinks_lock:
+            sink = _sinks.get(name)
+            if sink is None:
+                sink = _sinks[name] = _create_sink(name)
+    return sink
+
+
+_sampler: Optional[EventSampler] = None
+_sampler_loaded = False
+
+
+def _get_sampler() -> Optional[EventSampler]:
+    """Get the event sampler if any sampling rules are configured."""
+    global _sampler, _sampler_loaded
+    if _sampler_loaded:
+        return _sampler
+    try:
+        settings = get_settings()
+        if settings.event_sampling_rules:
+            _sampler = EventSampler(
+                settings.event_sampling_rules,
+                summary_interval=settings.event_sampling_summary_interval,
+            )
+    except ValueError as e:
+        print(f"[logger] Ignoring invalid EVENT_SAMPLING_RULES: {e}")
+    except Exception:
+        pass
+    _sampler_loaded = True
+    return _sampler
+
+
+def _emit_sampling_summaries(force: bool = False) -> None:
+    """Write a summary event for every stream that had events suppressed."""
+    sampler = _get_sampler()
+    if sampler is None:
+        return
+    for summary in sampler.take_summaries(force=force):
+        _record_event(summary["source"], "sampling_summary", summary)
+
+
+def log_event(
+    source: str,
+    event_type: str,
+    payload: Dict[str, Any] | None = None,
+    db: Session | None = None
+) -> None:
+    """
+    Log an event to the database (if enabled), otherwise prints to console.
+    
+    In buffered mode (EVENT_WRITER_MODE=buffered), and for events logged on
+    an event loop in either mode, the event is queued and group-committed by
+    a background thread; use flush_events() to force it out.
+    Events logged with an explicit session are always written inline, as
+    are events logged inside a unit_of_work(), which join its session.
+    
+    Streams matched by EVENT_SAMPLING_RULES may be sampled or rate limited;
+    suppressed counts are written periodically as 'sampling_summary' events.
+    
+    Args:
+        source: Source of the event (e.g., 'discord', 'lovense', 'bluesky')
+        event_type: Type of event (e.g., 'api_request', 'message_sent', 'device_connected')
+        payload: Event payload (will be redacted and JSON serialized)
+        db: Optional database session (the unit of work's, or a new one, if not provided)
+    """
+    sampler = _get_sampler()
+    if sampler is not None:
+        allowed = sampler.allow(source, event_type)
+        _emit_sampling_summaries()
+        if not allowed:
+            return
+    if db is None:
+        db = ambient_session()
+    if db is None:
+        # Not with a caller's session, which may hold the write lock
+        _persist_error_aggregates()
+    
+    _record_event(source, event_type, payload, db)
+
+
+def _record_event(
+    source: str,
+    event_type: str,
+    payload: Dict[str, Any] | None = None,
+    db: Session | None = None
+) -> None:
+    """Write one event (no sampling) to the sink configured for its source."""
+    # Redact (structurally, before serialization) and serialize; promoted
+    # fields come from the redacted payload so no secret reaches a column
+    payload, payload_str = redact_and_serialize(payload or {})
+    
+    row = {
+        "ts": datetime.now(timezone.utc),
+        "source": source,
+        "type": event_type,
+        "payload_json": payload_str,
+    }
+    row.update(extract_promoted_fields(source, event_type, payload))
+    
+    _get_sink(source).write(row, db)
+
+
 def log_api_request(source: str, method: str, url: str, status_code: int | None = None) -> None:
     """Log an API request."""
     log_event(
@@ -149,8 +579,83 @@ def log_message_sent(channel: str, recipient: str, message_preview: str | None =
     )
 
 
+_error_aggregator: Optional[ErrorAggregator] = None
+_error_aggregator_loaded = False
+
+
+def _get_error_aggregator() -> Optional[ErrorAggregator]:
+    """Get the error aggregator if an aggregation window is configured."""
+    global _error_aggregator, _error_aggregator_loaded
+    if _error_aggregator_loaded:
+        return _error_aggregator
+    try:
+        settings = get_settings()
+        if settings.enable_database and settings.error_aggregation_window_seconds > 0:
+            _error_aggregator = ErrorAggregator(settings.error_aggregation_window_seconds)
+    except Exception:
+        pass
+    _error_aggregator_loaded = True
+    return _error_aggregator
+
+
+def _persist_error_aggregates(force: bool = False) -> None:
+    """Upsert counted error occurrences into error_aggregates."""
+    aggregator = _get_error_aggregator()
+    if aggregator is None:
+        return
+    pending = aggregator.take_pending(force=force)
+    if not pending:
+        return
+    if in_event_loop():
+        get_db_executor(EVENTS).submit(_write_error_aggregates, pending)
+    else:
+        _write_error_aggregates(pending)
+
+
+def _write_error_aggregates(pending: List[Dict[str, Any]]) -> None:
+    try:
+        db = get_db_sync()
+    except Exception:
+        return
+    try:
+        for entry in pending:
+            stmt = sqlite_insert(ErrorAggregate).values(
+                fingerprint=entry["fingerprint"],
+                source=entry["source"],
+                error_type=entry["error_type"],
+                message=entry["message"],
+                sample_payload_json=serialize_redacted(entry["sample_payload"]),
+                window_start=entry["window_start"],
+                first_seen=entry["first_seen"],
+                last_seen=entry["last_seen"],
+                count=entry["count"],
+            )
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[ErrorAggregate.fingerprint, ErrorAggregate.window_start],
+                set_={
+                    "count": ErrorAggregate.count + stmt.excluded.count,
+                    "last_seen": stmt.excluded.last_seen,
+                },
+            ))
+        db.commit()
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        print(f"[logger] Failed to persist error aggregates: {e}")
+    finally:
+        db.close()
+
+
 def log_error(source: str, error: Exception | str, context: Dict[str, Any] | None = None) -> None:
-    """Log an error."""
+    """
+    Log an error.
+    
+    Errors are fingerprinted by source, error type and (normalized) message.
+    Within ERROR_AGGREGATION_WINDOW_SECONDS only the first occurrence is
+    written as an event; repeats are counted in error_aggregates.
+    """
     payload = {
         "error": str(error),
         "error_type": type(error).__name__ if isinstance(error, Exception) else "string"
@@ -158,9 +663,18 @@ def log_error(source: str, error: Exception | str, context: Dict[str, Any] | Non
     if context:
         payload.update(context)
     
+    aggregator = _get_error_aggregator()
+    if aggregator is not None:
+        first = aggregator.observe(source, payload["error_type"], payload["error"], payload)
+        if ambient_session() is None:
+            # Inside a unit of work the counts wait for the next write outside
+            # one: a failed upsert would roll back the caller's unit
+            _persist_error_aggregates()
+        if not first:
+            return
+    
     log_event(
         source=source,
         event_type="error",
         payload=payload
     )
-
@@ -0,0 +1,83 @@
+"""Event loop lag monitoring.
+
+A small coroutine on each event loop repeatedly sleeps for a short interval
+and measures how late it wakes up. Any lateness is time some other callback
+held the loop (a blocking database call, CPU-bound work), so the reported
+lag is a direct measure of loop blocking per turn.
+"""
+import asyncio
+from typing import Optional
+
+from app.config.settings import get_settings
+from app.core.logger import log_event
+from app.storage.async_db import db_executor_stats
+
+
+SAMPLE_INTERVAL = 0.1
+
+
+async def monitor_loop_lag(name: str, report_interval: float, stall_ms: float) -> None:
+    """
+    Sample this loop's wake-up lag and log a 'loop_lag' summary every report_interval.
+
+    Args:
+        name: Loop name used in the event payload (e.g. "main", "scheduler")
+        report_interval: Seconds between summaries
+        stall_ms: Lag above this many milliseconds counts as a stall
+    """
+    loop = asyncio.get_running_loop()
+    samples = 0
+    total_lag = 0.0
+    max_lag = 0.0
+    stalls = 0
+    last_report = loop.time()
+
+    while True:
+        expected = loop.time() + SAMPLE_INTERVAL
+        await asyncio.sleep(SAMPLE_INTERVAL)
+        now = loop.time()
+        lag = max(0.0, now - expected)
+        samples += 1
+        total_lag += lag
+        max_lag = max(max_lag, lag)
+        if lag * 1000 > stall_ms:
+            stalls += 1
+
+        if now - last_report >= report_interval:
+            log_event(
+                source="loop_monitor",
+                event_type="loop_lag",
+                payload={
+                    "loop": name,
+                    "samples": samples,
+                    "avg_ms": round(total_lag / samples * 1000, 2),
+                    "max_ms": round(max_lag * 1000, 2),
+                    "blocked_ms": round(total_lag * 1000, 2),
+                    "stalls": stalls,
+                    "stall_ms": stall_ms,
+                    "db_writers": db_executor_stats(),
+                },
+            )
+            samples = 0
+            total_lag = 0.0
+            max_lag = 0.0
+            stalls = 0
+            last_report = now
+
+
+def start_loop_monitor(name: str, loop: Optional[asyncio.AbstractEventLoop] = None) -> bool:
+    """
+    Start lag monitoring on a loop (the running one, or another thread's loop).
+
+    Returns:
+        False if monitoring is disabled (LOOP_LAG_REPORT_INTERVAL_SECONDS=0)
+    """
+    settings = get_settings()
+    if settings.loop_lag_report_interval_seconds <= 0:
+        return False
+    coro = monitor_loop_lag(name, settings.loop_lag_report_interval_seconds, settings.loop_lag_stall_ms)
+    if loop is None:
+        asyncio.get_running_loop().create_task(coro)
+    else:
+        asyncio.run_coroutine_threadsafe(coro, loop)
+    return True
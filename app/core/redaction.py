@@ -0,0 +1,113 @@
+"""Secret redaction for logged payloads.
+
+Payloads are redacted structurally before serialization: values stored under
+secret-looking keys are replaced outright, and only free-text string values
+are scanned with a single combined regex. All patterns are compiled once.
+"""
+import json
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Tuple
+
+
+REDACTED = "***REDACTED***"
+
+# Secret keywords (regex fragments), matched case-insensitively
+SECRET_KEYWORDS = (
+    r"token",
+    r"password",
+    r"secret",
+    r"api[_-]?key",
+    r"authorization",
+)
+
+_KEYWORD_ALT = "|".join(SECRET_KEYWORDS)
+
+# Literal substrings every keyword match must contain (cheap prefilter,
+# applied to lowercased text)
+_KEYWORD_LITERALS = ("token", "password", "secret", "api", "authorization")
+
+# A key is secret when a keyword ends it or is followed by a separator
+# (same boundary the legacy text patterns used: `token"`, `token:`, `token=`)
+_SECRET_KEY_RE = re.compile(rf"(?:{_KEYWORD_ALT})(?:$|[\"\s:=])", re.IGNORECASE)
+
+# Free-text fallback: keyword, separator, then the secret value itself
+_SECRET_TEXT_RE = re.compile(
+    rf"(?P<prefix>(?:{_KEYWORD_ALT})[\"\s:=]+)(?P<value>[^\s\"'\),]+)",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=4096)
+def is_secret_key(key: str) -> bool:
+    """Check whether a payload key names a secret (cached per key)."""
+    return _SECRET_KEY_RE.search(key) is not None
+
+
+def _may_contain_secret(text: str) -> bool:
+    """Prefilter: True if any secret keyword occurs in the text."""
+    lowered = text.lower()
+    return any(literal in lowered for literal in _KEYWORD_LITERALS)
+
+
+def _redact_match(match: re.Match) -> str:
+    return match.group("prefix") + REDACTED
+
+
+def redact_text(text: str) -> str:
+    """Redact `keyword: value` style secrets from free text in a single pass."""
+    if not _may_contain_secret(text):
+        return text
+    return _SECRET_TEXT_RE.sub(_redact_match, text)
+
+
+def redact_payload(value: Any) -> Any:
+    """
+    Return a redacted copy of a payload, ready for JSON serialization.
+
+    Values under secret keys are replaced with the redaction marker, strings
+    are scanned with redact_text(), and objects JSON can't encode are
+    converted with str() first so they are scanned as well.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return redact_text(value)
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if isinstance(key, str) and is_secret_key(key):
+                result[key] = REDACTED if item is not None else None
+            else:
+                result[key] = redact_payload(item)
+        return result
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [redact_payload(item) for item in value]
+    if isinstance(value, (datetime, date)):
+        return str(value)
+    return redact_text(str(value))
+
+
+def serialize_redacted(payload: Any) -> str:
+    """
+    Serialize a payload to JSON with secrets redacted.
+
+    The payload is serialized once up front; if no secret keyword appears
+    anywhere in the output (keys or values), that text is returned as-is and
+    the structural walk is skipped entirely.
+    """
+    return redact_and_serialize(payload)[1]
+
+
+def redact_and_serialize(payload: Any) -> Tuple[Any, str]:
+    """
+    Like serialize_redacted(), but also return the redacted payload (the
+    payload itself when nothing needed redacting) for callers that read
+    fields from it.
+    """
+    text = json.dumps(payload, default=str)
+    if not _may_contain_secret(text):
+        return payload, text
+    redacted = redact_payload(payload)
+    return redacted, json.dumps(redacted, default=str)
@@ -0,0 +1,146 @@
+"""Per-(source, event_type) sampling and rate limiting for the event logger."""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class SamplingRule:
+    """
+    A parsed sampling rule.
+
+    Spec formats (comma-separated key=value pairs):
+        sample=0.1              keep a fixed fraction of events (deterministic)
+        rate=5,burst=20         token bucket: 5 events/second, bursts of up to 20
+        first=100,window=60     keep the first 100 events per 60s window
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        params: Dict[str, float] = {}
+        for part in spec.split(","):
+            if not part.strip():
+                continue
+            key, sep, value = part.partition("=")
+            if not sep:
+                raise ValueError(f"Invalid sampling rule '{spec}': expected key=value")
+            params[key.strip().lower()] = float(value)
+
+        if "sample" in params:
+            self.mode = "sample"
+            self.fraction = min(max(params["sample"], 0.0), 1.0)
+        elif "rate" in params:
+            self.mode = "rate"
+            self.rate = max(params["rate"], 0.0)
+            self.burst = max(params.get("burst", params["rate"]), 1.0)
+        elif "first" in params:
+            self.mode = "first"
+            self.first = int(params["first"])
+            self.window = max(params.get("window", 60.0), 1.0)
+        else:
+            raise ValueError(f"Invalid sampling rule '{spec}': expected sample, rate or first")
+
+
+class _StreamState:
+    """Mutable state for one (source, event_type) stream."""
+
+    __slots__ = ("accumulator", "tokens", "last_refill", "window_start", "window_count", "suppressed")
+
+    def __init__(self, now: float, burst: float = 0.0):
+        self.accumulator = 0.0
+        self.tokens = burst
+        self.last_refill = now
+        self.window_start = now
+        self.window_count = 0
+        self.suppressed = 0
+
+
+class EventSampler:
+    """
+    Decides which events are written, and tracks what was suppressed.
+
+    Rules are keyed "source:event_type"; either side may be "*". The most
+    specific rule wins (exact, then source:*, then *:event_type). Streams
+    without a rule are never sampled.
+    """
+
+    def __init__(self, rules: Dict[str, str], summary_interval: float = 60.0):
+        self._rules: Dict[Tuple[str, str], SamplingRule] = {}
+        for key, spec in rules.items():
+            source, sep, event_type = key.partition(":")
+            if not sep:
+                raise ValueError(f"Invalid sampling rule key '{key}': expected source:event_type")
+            self._rules[(source.strip(), event_type.strip())] = SamplingRule(spec)
+        self._summary_interval = max(summary_interval, 1.0)
+        self._states: Dict[Tuple[str, str], _StreamState] = {}
+        self._lock = threading.Lock()
+        self._last_summary = time.monotonic()
+
+    def _rule_for(self, source: str, event_type: str) -> Optional[SamplingRule]:
+        return (
+            self._rules.get((source, event_type))
+            or self._rules.get((source, "*"))
+            or self._rules.get(("*", event_type))
+        )
+
+    def allow(self, source: str, event_type: str) -> bool:
+        """Return True if this event should be written."""
+        if not self._rules:
+            return True
+        rule = self._rule_for(source, event_type)
+        if rule is None:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            key = (source, event_type)
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _StreamState(now, getattr(rule, "burst", 0.0))
+
+            if rule.mode == "sample":
+                state.accumulator += rule.fraction
+                allowed = state.accumulator >= 1.0
+                if allowed:
+                    state.accumulator -= 1.0
+            elif rule.mode == "rate":
+                state.tokens = min(rule.burst, state.tokens + (now - state.last_refill) * rule.rate)
+                state.last_refill = now
+                allowed = state.tokens >= 1.0
+                if allowed:
+                    state.tokens -= 1.0
+            else:
+                if now - state.window_start >= rule.window:
+                    state.window_start = now
+                    state.window_count = 0
+                state.window_count += 1
+                allowed = state.window_count <= rule.first
+
+            if not allowed:
+                state.suppressed += 1
+            return allowed
+
+    def take_summaries(self, force: bool = False) -> List[Dict[str, object]]:
+        """
+        Collect suppressed counts once per summary interval (or now, if forced).
+
+        Returns:
+            One summary dict per stream that suppressed events since the last summary
+        """
+        now = time.monotonic()
+        if not force and now - self._last_summary < self._summary_interval:
+            return []
+        with self._lock:
+            elapsed = now - self._last_summary
+            self._last_summary = now
+            summaries = []
+            for (source, event_type), state in self._states.items():
+                if state.suppressed:
+                    summaries.append({
+                        "source": source,
+                        "event_type": event_type,
+                        "suppressed": state.suppressed,
+                        "rule": self._rule_for(source, event_type).spec,
+                        "window_seconds": round(elapsed, 3),
+                    })
+                    state.suppressed = 0
+            return summaries
@@ -1,29 +1,277 @@
 """Lightweight task scheduler for periodic tasks."""
 import asyncio
+import atexit
 import json
 import threading
 import uuid
-from datetime import datetime, timezone
-from typing import Callable, Dict, Optional, Coroutine, Any
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Coroutine, Any, Tuple
 
-from app.core.logger import log_event
-from app.storage.db import get_db_sync
+from sqlalchemy import insert, tuple_
+
+from app.config.settings import get_settings
+from app.core.logger import log_error, log_event
+from app.core.task_runner import TaskRunner
+from app.core.timer_queue import TimerQueue
+from app.storage.async_db import db_write, get_db_executor, in_event_loop, run_db, run_db_read
+from app.storage.db import ambient_session, get_db_sync, get_read_db, unit_of_work
 from app.storage.models import SchedulerTask
+from app.storage.stats import bump_table_counter
+
+
+# Pending one-shot rows read per refill query
+REFILL_PAGE_SIZE = 1000
+# Task ids per IN (...) query for batched updates and cancels
+TASK_ID_CHUNK = 500
+# Consecutive failed flushes after which the journal drops what it holds
+JOURNAL_MAX_FAILURES = 5
+
+
+def _insert_task_rows(db, rows: List[Dict[str, Any]]) -> None:
+    """Bulk-insert scheduler_tasks rows (all with the same columns) and count them."""
+    db.execute(insert(SchedulerTask), rows)
+    bump_table_counter(db, "scheduler_tasks", len(rows))
+
+
+def _write_journal(inserts: Dict[str, Dict[str, Any]], updates: Dict[str, Dict[str, Any]]) -> None:
+    """Apply one journal batch (new one-shot rows, then column updates) in one transaction."""
+    with unit_of_work() as db:
+        if inserts:
+            _insert_task_rows(db, list(inserts.values()))
+        task_ids = list(updates)
+        for start in range(0, len(task_ids), TASK_ID_CHUNK):
+            chunk = task_ids[start:start + TASK_ID_CHUNK]
+            for task in db.query(SchedulerTask).filter(SchedulerTask.task_id.in_(chunk)):
+                for column, value in updates[task.task_id].items():
+                    setattr(task, column, value)
+
+
+class SchedulerJournal:
+    """
+    Write-behind journal for scheduler task state.
+    
+    Status changes and cron run times are queued per task_id and coalesced
+    (a later value for a column replaces the earlier one), and new one-shot
+    rows can be queued as inserts, which absorb later updates to the same
+    task. A flusher thread writes everything queued in one transaction every
+    flush interval, on the control DB writer thread so it stays ordered with
+    the scheduler's direct writes.
+    """
+    
+    def __init__(self):
+        self._inserts: Dict[str, Dict[str, Any]] = {}
+        self._updates: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._failures = 0
+    
+    def insert(self, row: Dict[str, Any]) -> None:
+        """Queue a new scheduler_tasks row (keyed by its task_id)."""
+        with self._lock:
+            self._inserts[row["task_id"]] = row
+        self._ensure_thread()
+    
+    def update(self, task_id: str, values: Dict[str, Any]) -> None:
+        """Queue column updates for a task, merged with any already queued."""
+        with self._lock:
+            target = self._inserts.get(task_id)
+            if target is None:
+                target = self._updates.setdefault(task_id, {})
+            target.update(values)
+        self._ensure_thread()
+    
+    def discard(self, task_id: str) -> None:
+        """Drop queued updates for a task whose row is about to be rewritten directly."""
+        with self._lock:
+            self._updates.pop(task_id, None)
+    
+    def wake(self) -> None:
+        """Have the flusher thread write what is queued now instead of at the next interval."""
+        self._ensure_thread()
+        self._wake.set()
+    
+    def pending(self) -> int:
+        """Tasks with queued inserts or updates."""
+        with self._lock:
+            return len(self._inserts) + len(self._updates)
+    
+    def flush(self) -> int:
+        """
+        Write everything queued now.
+        
+        Returns:
+            Number of tasks written
+        """
+        executor = get_db_executor()
+        with self._lock:
+            inserts, updates = self._inserts, self._updates
+            if not inserts and not updates:
+                return 0
+            self._inserts, self._updates = {}, {}
+            if executor.on_executor_thread():
+                future = None
+            else:
+                # Submitted under the lock, so batches reach the writer in order
+                future = executor.submit(_write_journal, inserts, updates)
+        try:
+            if future is None:
+                _write_journal(inserts, updates)
+            else:
+                future.result()
+        except Exception as e:
+            self._failures += 1
+            dropped = self._failures >= JOURNAL_MAX_FAILURES
+            log_error("scheduler", e, {
+                "action": "journal_flush",
+                "inserts": len(inserts),
+                "updates": len(updates),
+                "failures": self._failures,
+                "dropped": dropped,
+            })
+            if dropped:
+                self._failures = 0
+            else:
+                self._requeue(inserts, updates)
+            return 0
+        self._failures = 0
+        return len(inserts) + len(updates)
+    
+    def _requeue(self, inserts: Dict[str, Dict[str, Any]], updates: Dict[str, Dict[str, Any]]) -> None:
+        """Put a failed batch back for the next flush, under anything queued since."""
+        with self._lock:
+            for task_id, row in inserts.items():
+                # Updates queued since the swap went to _updates (the insert was gone)
+                row.update(self._updates.pop(task_id, {}))
+                self._inserts[task_id] = row
+            for task_id, values in updates.items():
+                values.update(self._updates.get(task_id, {}))
+                self._updates[task_id] = values
+    
+    def stop(self) -> None:
+        """Stop the flusher thread after writing everything queued."""
+        self._stopped = True
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+        self.flush()
+    
+    def _ensure_thread(self) -> None:
+        if self._thread is not None or self._stopped:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="scheduler-journal", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+    
+    def _run(self) -> None:
+        interval = max(0.01, get_settings().scheduler_journal_flush_interval_seconds)
+        while not self._stopped:
+            self._wake.wait(interval)
+            self._wake.clear()
+            self.flush()
+
+
+class _OneShotJob:
+    """
+    A pending one-shot task (a timer heap record until it falls due).
+    
+    Holds either the caller's coroutine or, for restored tasks, the
+    handler_type and parameters to run the handler with when it falls due
+    (handler_type also picks the runner's concurrency limit).
+    """
+    __slots__ = ("task_id", "when", "coro", "name", "handler_type", "parameters", "cancelled", "task")
+    
+    def __init__(
+        self,
+        task_id: str,
+        when: datetime,
+        coro: Optional[Coroutine[Any, Any, None]],
+        name: Optional[str],
+        handler_type: Optional[str] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+    ):
+        self.task_id = task_id
+        self.when = when
+        self.coro = coro
+        self.name = name
+        self.handler_type = handler_type
+        self.parameters = parameters
+        self.cancelled = False
+        # The asyncio Task running it, once due
+        self.task: Optional[asyncio.Task] = None
+
+
+class _CronJob:
+    """A cron task, queued in the timer heap at its next occurrence."""
+    __slots__ = (
+        "task_id", "cron_expression", "timezone_name", "handler_type", "parameters", "name",
+        "next_utc", "cancelled", "task",
+    )
+    
+    def __init__(
+        self,
+        task_id: str,
+        cron_expression: str,
+        timezone_name: str,
+        handler_type: str,
+        parameters: Dict[str, Any],
+        name: Optional[str],
+    ):
+        self.task_id = task_id
+        self.cron_expression = cron_expression
+        self.timezone_name = timezone_name
+        self.handler_type = handler_type
+        self.parameters = parameters
+        self.name = name
+        self.next_utc: Optional[datetime] = None
+        self.cancelled = False
+        self.task: Optional[asyncio.Task] = None
 
 
 class Scheduler:
-    """Simple task scheduler that can be cancelled."""
+    """
+    Simple task scheduler that can be cancelled.
+    
+    Periodic tasks each run in their own loop task. One-shot and cron tasks
+    wait in a single timer heap (see app.core.timer_queue) and only get an
+    asyncio Task once they fall due. Every run then goes through a
+    TaskRunner (see app.core.task_runner), which bounds concurrency per
+    handler type and overall and keeps sync handlers off the loop.
+    
+    With persistence, only one-shot tasks due within SCHEDULER_HORIZON_MINUTES
+    are held in memory. Later ones (restored, or scheduled with a registered
+    handler_type) stay in the database, and a refill loop pages them in as
+    they come within the horizon; their coroutines are built when they fire.
+    """
     
     def __init__(self, enable_persistence: bool = True):
         self._tasks: Dict[str, asyncio.Task] = {}
-        self._one_shot_tasks: Dict[str, asyncio.Task] = {}
-        self._cron_tasks: Dict[str, asyncio.Task] = {}
+        self._one_shot_tasks: Dict[str, _OneShotJob] = {}
+        self._cron_tasks: Dict[str, _CronJob] = {}
+        self._timers = TimerQueue(self._on_timer_due, lambda job: not job.cancelled)
+        settings = get_settings()
+        self._runner = TaskRunner(
+            settings.scheduler_max_concurrency,
+            settings.scheduler_handler_concurrency,
+            settings.scheduler_handler_limits,
+            settings.scheduler_worker_threads,
+        )
         self._cancelled = False
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._thread: Optional[threading.Thread] = None
         self._enable_persistence = enable_persistence
         # Registry for task restoration handlers
         self._restore_handlers: Dict[str, Callable] = {}
+        # Horizon refill loop (started by restore_pending_tasks)
+        self._refill_future: Optional[Any] = None
+        # Ids cancelled in the database while not in memory, so an in-flight refill skips them
+        self._cancelled_ids: set = set()
+        # Status and run-time updates (and, without durable creates, new one-shot rows)
+        self._journal = SchedulerJournal()
     
     def start(self) -> None:
         """Start the scheduler in a background thread."""
@@ -38,8 +286,24 @@ class Scheduler:
         """Run the asyncio event loop in this thread."""
         self._loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self._loop)
+        self._runner.start(self._loop)
+        self._timers.start(self._loop)
         self._loop.run_forever()
     
+    async def run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking call on the scheduler's worker threads.
+        
+        For async handlers that have to use a sync client, so the call
+        doesn't stall the scheduler loop.
+        """
+        return await self._runner.run_blocking(func, *args)
+    
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The scheduler's event loop (started if needed)."""
+        return self._ensure_loop()
+    
     def _ensure_loop(self) -> asyncio.AbstractEventLoop:
         """Ensure the event loop is running."""
         if self._loop is None or not self._loop.is_running():
@@ -49,6 +313,7 @@ class Scheduler:
             time.sleep(0.1)
         return self._loop
     
+    @db_write
     def _save_periodic_task(
         self,
         name: str,
@@ -89,6 +354,7 @@ class Scheduler:
                         parameters_json=json.dumps(parameters) if parameters else None
                     )
                     db.add(task)
+                    bump_table_counter(db, "scheduler_tasks")
                 
                 db.commit()
             except Exception as e:
@@ -115,56 +381,87 @@ class Scheduler:
                 }
             )
     
-    def _save_one_shot_task(
-        self,
-        task_id: str,
-        when_dt_utc: datetime,
-        name: Optional[str] = None,
-        handler_type: Optional[str] = None,
-        parameters: Optional[Dict[str, Any]] = None
-    ) -> None:
-        """Save a one-shot task to the database."""
-        if not self._enable_persistence:
+    def _save_one_shot_tasks(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Save one-shot task rows: committed together with SCHEDULER_DURABLE_CREATES,
+        otherwise with the next journal flush.
+        
+        Durable saves wait for the commit and raise if it fails, so the task
+        is never scheduled without its row. On an event loop that wait would
+        stall the loop, so there the rows go to the journal with an immediate
+        flush instead; loop callers wanting the durable create await
+        _save_one_shot_tasks_async.
+        """
+        if not self._enable_persistence or not rows:
             return
         
+        if get_settings().scheduler_durable_creates:
+            if ambient_session() is not None:
+                self._insert_one_shot_tasks(rows)
+                return
+            if not in_event_loop():
+                get_db_executor().call(self._insert_one_shot_tasks, rows)
+                return
+        
+        for row in rows:
+            self._journal.insert(row)
+        if get_settings().scheduler_durable_creates:
+            self._journal.wake()
+    
+    async def _save_one_shot_tasks_async(self, rows: List[Dict[str, Any]]) -> None:
+        """Save one-shot task rows, awaiting a durable create on the control writer."""
+        if (
+            self._enable_persistence and rows
+            and get_settings().scheduler_durable_creates
+            and ambient_session() is None
+        ):
+            await run_db(self._insert_one_shot_tasks, rows)
+            return
+        self._save_one_shot_tasks(rows)
+    
+    @staticmethod
+    def _one_shot_row(
+        task_id: str,
+        when_dt_utc: datetime,
+        name: Optional[str],
+        handler_type: Optional[str],
+        parameters: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """A new one-shot scheduler_tasks row, as bulk-inserted."""
+        return {
+            "task_id": task_id,
+            "task_type": "one_shot",
+            "name": name,
+            "status": "scheduled",
+            "scheduled_for": when_dt_utc,
+            "handler_type": handler_type,
+            "parameters_json": json.dumps(parameters) if parameters else None,
+            # Every column a journal update can set, so batched rows share one shape
+            "updated_at": datetime.now(timezone.utc),
+            "completed_at": None,
+            "next_run_at": None,
+            "last_run_at": None,
+        }
+    
+    def _insert_one_shot_tasks(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert and commit one-shot task rows in one transaction (on the control writer)."""
         try:
-            db = get_db_sync()
-            try:
-                task = SchedulerTask(
-                    task_id=task_id,
-                    task_type="one_shot",
-                    name=name,
-                    status="scheduled",
-                    scheduled_for=when_dt_utc,
-                    handler_type=handler_type,
-                    parameters_json=json.dumps(parameters) if parameters else None
-                )
-                db.add(task)
-                db.commit()
-            except Exception as e:
-                db.rollback()
-                log_event(
-                    source="scheduler",
-                    event_type="persistence_error",
-                    payload={
-                        "action": "save_one_shot_task",
-                        "task_id": task_id,
-                        "error": str(e)
-                    }
-                )
-            finally:
-                db.close()
+            with unit_of_work() as db:
+                _insert_task_rows(db, rows)
         except Exception as e:
             log_event(
                 source="scheduler",
                 event_type="persistence_error",
                 payload={
                     "action": "save_one_shot_task",
-                    "task_id": task_id,
+                    "task_id": rows[0]["task_id"],
+                    "count": len(rows),
                     "error": str(e)
                 }
             )
+            raise
 
+    @db_write
     def _save_cron_task(
         self,
         task_id: str,
@@ -220,6 +517,7 @@ class Scheduler:
                     if hasattr(task, "next_run_at"):
                         task.next_run_at = next_run_at_utc
                     db.add(task)
+                    bump_table_counter(db, "scheduler_tasks")
 
                 db.commit()
             except Exception as e:
@@ -252,55 +550,44 @@ class Scheduler:
         status: str,
         completed_at: Optional[datetime] = None
     ) -> None:
-        """Update task status in the database."""
+        """Queue a task status update (written behind, with the next journal flush)."""
         if not self._enable_persistence:
             return
         
-        try:
-            db = get_db_sync()
-            try:
-                task = db.query(SchedulerTask).filter(
-                    SchedulerTask.task_id == task_id
-                ).first()
-                
-                if task:
-                    task.status = status
-                    task.updated_at = datetime.now(timezone.utc)
-                    if completed_at:
-                        task.completed_at = completed_at
-                    db.commit()
-            except Exception as e:
-                db.rollback()
-                log_event(
-                    source="scheduler",
-                    event_type="persistence_error",
-                    payload={
-                        "action": "update_task_status",
-                        "task_id": task_id,
-                        "error": str(e)
-                    }
-                )
-            finally:
-                db.close()
-        except Exception as e:
-            log_event(
-                source="scheduler",
-                event_type="persistence_error",
-                payload={
-                    "action": "update_task_status",
-                    "task_id": task_id,
-                    "error": str(e)
-                }
-            )
+        values: Dict[str, Any] = {"status": status, "updated_at": datetime.now(timezone.utc)}
+        if completed_at:
+            values["completed_at"] = completed_at
+        self._journal.update(task_id, values)
+    
+    def _update_task_statuses(self, task_ids: List[str], status: str) -> None:
+        """Queue the same status for several tasks (written in one journal flush)."""
+        for task_id in task_ids:
+            self._update_task_status(task_id, status)
+    
+    def _update_cron_run(
+        self,
+        task_id: str,
+        next_run_at: Optional[datetime] = None,
+        last_run_at: Optional[datetime] = None
+    ) -> None:
+        """Queue a cron task's next/last run time (best-effort, for observability)."""
+        if not self._enable_persistence:
+            return
+        
+        values: Dict[str, Any] = {"updated_at": datetime.now(timezone.utc)}
+        if next_run_at is not None:
+            values["next_run_at"] = next_run_at
+        if last_run_at is not None:
+            values["last_run_at"] = last_run_at
+        self._journal.update(task_id, values)
     
     async def _periodic_task(self, name: str, func: Callable, interval: float) -> None:
         """Run a periodic task."""
         while not self._cancelled:
             try:
-                if asyncio.iscoroutinefunction(func):
-                    await func()
-                else:
-                    func()
+                # Sync jobs (retention, reconciliation, snapshots) are
+                # database-heavy; the runner keeps them off the timer loop
+                await self._runner.run(name, func)
             except Exception as e:
                 log_event(
                     source="scheduler",
@@ -339,13 +626,13 @@ class Scheduler:
         # Cancel existing task with same name
         if name in self._tasks:
             self._tasks[name].cancel()
-            self._update_task_status(name, "cancelled")
         
         # Create new task
         task = loop.create_task(self._periodic_task(name, func, interval))
         self._tasks[name] = task
         
-        # Save to database
+        # Save to database (rewrites the row, superseding queued updates)
+        self._journal.discard(name)
         self._save_periodic_task(name, interval, handler_type, parameters)
         
         log_event(
@@ -369,60 +656,44 @@ class Scheduler:
                 payload={"task_name": name}
             )
     
-    async def _one_shot_task(
-        self,
-        task_id: str,
-        when_dt_utc: datetime,
-        coro_fn: Coroutine[Any, Any, None],
-        name: Optional[str] = None
-    ) -> None:
-        """Run a one-shot task at a specific time."""
-        now = datetime.now(timezone.utc)
-        if when_dt_utc < now:
-            log_event(
-                source="scheduler",
-                event_type="one_shot_rejected_past",
-                payload={
-                    "task_id": task_id,
-                    "when": when_dt_utc.isoformat(),
-                    "now": now.isoformat()
-                }
-            )
+    def _on_timer_due(self, job: Any) -> None:
+        """Dispatcher callback: start the due job's run on the scheduler loop."""
+        if job.cancelled:
+            # Discarded after the heap popped it; _release_job closes its coroutine
             return
-        
-        # Calculate delay
-        delay = (when_dt_utc - now).total_seconds()
-        
-        log_event(
-            source="scheduler",
-            event_type="one_shot_scheduled",
-            payload={
-                "task_id": task_id,
-                "name": name,
-                "when": when_dt_utc.isoformat(),
-                "delay_seconds": delay
-            }
-        )
-        
+        if isinstance(job, _OneShotJob):
+            job.task = self._loop.create_task(self._run_one_shot(job))
+        else:
+            job.task = self._loop.create_task(self._run_cron(job))
+    
+    async def _run_one_shot(self, job: "_OneShotJob") -> None:
+        """Run a one-shot task that has fallen due."""
+        task_id, name = job.task_id, job.name
         try:
-            await asyncio.sleep(delay)
-            
-            # Check if cancelled
-            if task_id not in self._one_shot_tasks:
-                log_event(
-                    source="scheduler",
-                    event_type="one_shot_cancelled_before_run",
-                    payload={"task_id": task_id}
-                )
-                return
+            coro = job.coro
+            handler = None
+            if coro is None:
+                # Restored task: run its handler now rather than at restore time
+                handler = self._restore_handlers.get(job.handler_type)
+                if handler is None:
+                    log_event(
+                        source="scheduler",
+                        event_type="one_shot_task_restore_skipped",
+                        payload={"task_id": task_id, "reason": f"handler_not_registered: {job.handler_type}"}
+                    )
+                    return
             
-            # Execute the coroutine
+            # Execute the task once the runner has a slot for it
             log_event(
                 source="scheduler",
                 event_type="one_shot_executing",
                 payload={"task_id": task_id, "name": name}
             )
-            await coro_fn
+            key = job.handler_type or "one_shot"
+            if handler is None:
+                await self._runner.run_coroutine(key, coro)
+            else:
+                await self._runner.run(key, handler, job.parameters or {})
             
             log_event(
                 source="scheduler",
@@ -448,10 +719,10 @@ class Scheduler:
                     "error": str(e)
                 }
             )
-            raise
         finally:
             # Remove from tracking
-            self._one_shot_tasks.pop(task_id, None)
+            if self._one_shot_tasks.get(task_id) is job:
+                del self._one_shot_tasks[task_id]
     
     def schedule_at(
         self,
@@ -464,6 +735,17 @@ class Scheduler:
         """
         Schedule a one-shot task to run at a specific UTC datetime.
         
+        Off an event loop this waits for a durable create to commit; on a
+        loop the row is journaled instead (see _save_one_shot_tasks), so
+        coroutines should await schedule_at_async for the durable create.
+        
+        A task due beyond SCHEDULER_HORIZON_MINUTES whose handler_type has a
+        registered restore handler waits in the database: coro_fn is closed
+        right away and, when the task is paged back in, the handler runs with
+        parameters in its place, so both must do the same thing. Without a
+        registered handler the task stays in memory (a one_shot_not_deferred
+        warning is logged) and does not survive a restart.
+        
         Args:
             when_dt_utc: UTC datetime when the task should run
             coro_fn: Coroutine function to execute
@@ -474,23 +756,174 @@ class Scheduler:
         Returns:
             Task ID (string) that can be used to cancel the task
         """
-        loop = self._ensure_loop()
-        
-        # Generate unique task ID
-        task_id = str(uuid.uuid4())
+        row = self._new_one_shot_row(when_dt_utc, name, handler_type, parameters)
+        self._save_one_shot_tasks([row])
+        self._place_one_shot(row["task_id"], when_dt_utc, coro_fn, name, handler_type)
+        return row["task_id"]
+    
+    async def schedule_at_async(
+        self,
+        when_dt_utc: datetime,
+        coro_fn: Coroutine[Any, Any, None],
+        name: Optional[str] = None,
+        handler_type: Optional[str] = None,
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """schedule_at for coroutines: awaits the durable create instead of blocking the loop."""
+        row = self._new_one_shot_row(when_dt_utc, name, handler_type, parameters)
+        await self._save_one_shot_tasks_async([row])
+        self._place_one_shot(row["task_id"], when_dt_utc, coro_fn, name, handler_type)
+        return row["task_id"]
+    
+    def _new_one_shot_row(
+        self,
+        when_dt_utc: datetime,
+        name: Optional[str],
+        handler_type: Optional[str],
+        parameters: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Validate a new one-shot task and build its row (with a fresh task ID)."""
+        self._ensure_loop()
         
         # Validate time is in the future
         now = datetime.now(timezone.utc)
         if when_dt_utc < now:
             raise ValueError(f"Cannot schedule task in the past: {when_dt_utc} < {now}")
+        return self._one_shot_row(str(uuid.uuid4()), when_dt_utc, name, handler_type, parameters)
+    
+    def _place_one_shot(
+        self,
+        task_id: str,
+        when_dt_utc: datetime,
+        coro_fn: Coroutine[Any, Any, None],
+        name: Optional[str],
+        handler_type: Optional[str]
+    ) -> None:
+        """Put a saved one-shot task on the timer heap, or leave it to a refill."""
+        if self._past_horizon(when_dt_utc):
+            if handler_type in self._restore_handlers:
+                # A refill will page it in (and rebuild the coroutine from its handler)
+                coro_fn.close()
+                log_event(
+                    source="scheduler",
+                    event_type="one_shot_scheduled",
+                    payload={
+                        "task_id": task_id,
+                        "name": name,
+                        "when": when_dt_utc.isoformat(),
+                        "delay_seconds": (when_dt_utc - datetime.now(timezone.utc)).total_seconds(),
+                        "deferred": True,
+                        "replaced_by_handler": handler_type
+                    }
+                )
+                return
+            # Held in memory for its whole wait, and lost on restart
+            log_event(
+                source="scheduler",
+                event_type="one_shot_not_deferred",
+                payload={
+                    "task_id": task_id,
+                    "name": name,
+                    "when": when_dt_utc.isoformat(),
+                    "handler_type": handler_type,
+                    "warning": "no restore handler registered; kept in memory past the horizon"
+                }
+            )
         
         # Create and schedule the task
-        self._schedule_one_shot_in_memory(task_id, when_dt_utc, coro_fn, name, loop=loop)
-        
-        # Save to database
-        self._save_one_shot_task(task_id, when_dt_utc, name, handler_type, parameters)
-        
-        return task_id
+        self._schedule_one_shot_in_memory(
+            task_id, when_dt_utc, coro_fn, name, loop=self._ensure_loop(), handler_type=handler_type
+        )
+
+    def schedule_many(
+        self,
+        entries: List[Tuple[datetime, str, Dict[str, Any]]],
+        name: Optional[str] = None
+    ) -> List[str]:
+        """
+        Schedule several one-shot tasks at once.
+
+        Each task runs through the registered restore handler for its
+        handler_type, like a restored task. All rows are saved together and
+        the ones within the horizon go onto the timer heap in one call.
+        Durable creates block like schedule_at's; coroutines should await
+        schedule_many_async.
+
+        Args:
+            entries: (UTC datetime, handler_type, parameters) per task
+            name: Optional name for the tasks (for logging)
+
+        Returns:
+            Task IDs, in entry order
+
+        Raises:
+            ValueError: If any entry is in the past or its handler_type has no
+                registered handler (nothing is scheduled)
+        """
+        rows = self._new_batch_rows(entries, name)
+        self._save_one_shot_tasks(rows)
+        return self._place_batch(rows, entries, name)
+
+    async def schedule_many_async(
+        self,
+        entries: List[Tuple[datetime, str, Dict[str, Any]]],
+        name: Optional[str] = None
+    ) -> List[str]:
+        """schedule_many for coroutines: awaits the durable create instead of blocking the loop."""
+        rows = self._new_batch_rows(entries, name)
+        await self._save_one_shot_tasks_async(rows)
+        return self._place_batch(rows, entries, name)
+
+    def _new_batch_rows(
+        self,
+        entries: List[Tuple[datetime, str, Dict[str, Any]]],
+        name: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Validate a schedule_many batch and build its rows."""
+        self._ensure_loop()
+
+        now = datetime.now(timezone.utc)
+        for when_dt_utc, handler_type, _ in entries:
+            if when_dt_utc < now:
+                raise ValueError(f"Cannot schedule task in the past: {when_dt_utc} < {now}")
+            if handler_type not in self._restore_handlers:
+                raise ValueError(f"No restore handler registered for '{handler_type}'")
+
+        return [
+            self._one_shot_row(str(uuid.uuid4()), when_dt_utc, name, handler_type, parameters)
+            for when_dt_utc, handler_type, parameters in entries
+        ]
+
+    def _place_batch(
+        self,
+        rows: List[Dict[str, Any]],
+        entries: List[Tuple[datetime, str, Dict[str, Any]]],
+        name: Optional[str]
+    ) -> List[str]:
+        """Put a saved batch's tasks within the horizon on the timer heap."""
+        task_ids = [row["task_id"] for row in rows]
+        jobs = []
+        for task_id, (when_dt_utc, handler_type, parameters) in zip(task_ids, entries):
+            if self._beyond_horizon(when_dt_utc, handler_type):
+                # A refill will page it in
+                continue
+            job = _OneShotJob(task_id, when_dt_utc, None, name, handler_type, parameters or {})
+            self._one_shot_tasks[task_id] = job
+            jobs.append(job)
+        self._timers.push_many((job.when.timestamp(), job) for job in jobs)
+
+        log_event(
+            source="scheduler",
+            event_type="one_shot_batch_scheduled",
+            payload={
+                "name": name,
+                "count": len(task_ids),
+                "deferred": len(task_ids) - len(jobs),
+                "first": min(entry[0] for entry in entries).isoformat() if entries else None,
+                "last": max(entry[0] for entry in entries).isoformat() if entries else None
+            }
+        )
+        return task_ids
 
     def _schedule_one_shot_in_memory(
         self,
@@ -499,13 +932,46 @@ class Scheduler:
         coro_fn: Coroutine[Any, Any, None],
         name: Optional[str],
         loop: Optional[asyncio.AbstractEventLoop] = None,
+        handler_type: Optional[str] = None,
+        parameters: Optional[Dict[str, Any]] = None,
     ) -> None:
-        """Schedule a one-shot task in-memory without touching persistence."""
-        loop = loop or self._ensure_loop()
-        task = loop.create_task(
-            self._one_shot_task(task_id, when_dt_utc, coro_fn, name)
+        """
+        Schedule a one-shot task in-memory without touching persistence.
+        
+        coro_fn may be None for a restored task, whose coroutine is built
+        from handler_type and parameters when it fires.
+        """
+        now = datetime.now(timezone.utc)
+        if when_dt_utc < now:
+            if coro_fn is not None:
+                coro_fn.close()
+            log_event(
+                source="scheduler",
+                event_type="one_shot_rejected_past",
+                payload={
+                    "task_id": task_id,
+                    "when": when_dt_utc.isoformat(),
+                    "now": now.isoformat()
+                }
+            )
+            return
+        
+        if loop is None:
+            self._ensure_loop()
+        job = _OneShotJob(task_id, when_dt_utc, coro_fn, name, handler_type, parameters)
+        self._one_shot_tasks[task_id] = job
+        self._timers.push(when_dt_utc.timestamp(), job)
+        
+        log_event(
+            source="scheduler",
+            event_type="one_shot_scheduled",
+            payload={
+                "task_id": task_id,
+                "name": name,
+                "when": when_dt_utc.isoformat(),
+                "delay_seconds": (when_dt_utc - now).total_seconds()
+            }
         )
-        self._one_shot_tasks[task_id] = task
 
     def restore_one_shot_in_memory(
         self,
@@ -517,110 +983,85 @@ class Scheduler:
         """Restore a persisted one-shot task into the in-memory scheduler (no DB insert)."""
         # Avoid duplicating if already scheduled in-memory
         if task_id in self._one_shot_tasks:
+            coro_fn.close()
             return
         self._schedule_one_shot_in_memory(task_id, when_dt_utc, coro_fn, name)
 
-    async def _cron_loop(
-        self,
-        task_id: str,
-        cron_expression: str,
-        timezone_name: str,
-        handler_type: str,
-        parameters: Dict[str, Any],
-        name: Optional[str] = None,
-    ) -> None:
-        """Run a cron-based recurring task: compute next occurrence, sleep, execute, repeat."""
+    @staticmethod
+    def _next_cron_run(cron_expression: str, timezone_name: str) -> datetime:
+        """Next occurrence of a cron expression after now, in UTC."""
         # Local imports to keep optional deps localized
         from croniter import croniter
         from zoneinfo import ZoneInfo
 
         tz = ZoneInfo(timezone_name)
+        next_local = croniter(cron_expression, datetime.now(tz)).get_next(datetime)
+        # Ensure tz-aware
+        if next_local.tzinfo is None:
+            next_local = next_local.replace(tzinfo=tz)
+        return next_local.astimezone(timezone.utc)
 
-        while not self._cancelled:
-            now_local = datetime.now(tz)
-            itr = croniter(cron_expression, now_local)
-            next_local = itr.get_next(datetime)
-            # Ensure tz-aware
-            if next_local.tzinfo is None:
-                next_local = next_local.replace(tzinfo=tz)
-            next_utc = next_local.astimezone(timezone.utc)
+    def _push_cron(self, job: "_CronJob") -> None:
+        """Queue a cron job's next occurrence (and persist it for observability)."""
+        try:
+            job.next_utc = self._next_cron_run(job.cron_expression, job.timezone_name)
+        except Exception as e:
+            log_event(
+                source="scheduler",
+                event_type="cron_error",
+                payload={"task_id": job.task_id, "name": job.name, "error": str(e)},
+            )
+            return
+        self._update_cron_run(job.task_id, next_run_at=job.next_utc)
+        self._timers.push(job.next_utc.timestamp(), job)
 
-            # Persist next_run_at for observability (best-effort)
-            try:
-                if self._enable_persistence:
-                    db = get_db_sync()
-                    try:
-                        task = db.query(SchedulerTask).filter(SchedulerTask.task_id == task_id).first()
-                        if task and hasattr(task, "next_run_at"):
-                            task.next_run_at = next_utc
-                            task.updated_at = datetime.now(timezone.utc)
-                            db.commit()
-                    finally:
-                        db.close()
-            except Exception:
-                pass
+    async def _run_cron(self, job: "_CronJob") -> None:
+        """Run one occurrence of a cron task, then queue the next."""
+        task_id, name, handler_type = job.task_id, job.name, job.handler_type
+        if self._cancelled:
+            return
 
-            delay = (next_utc - datetime.now(timezone.utc)).total_seconds()
-            if delay > 0:
-                try:
-                    await asyncio.sleep(delay)
-                except asyncio.CancelledError:
-                    break
+        # Execute via registered handler
+        if handler_type not in self._restore_handlers:
+            log_event(
+                source="scheduler",
+                event_type="cron_handler_missing",
+                payload={"task_id": task_id, "handler_type": handler_type, "name": name},
+            )
+        else:
+            try:
+                log_event(
+                    source="scheduler",
+                    event_type="cron_executing",
+                    payload={
+                        "task_id": task_id,
+                        "name": name,
+                        "handler_type": handler_type,
+                        "scheduled_for": job.next_utc.isoformat(),
+                    },
+                )
+                await self._runner.run(handler_type, self._restore_handlers[handler_type], job.parameters)
 
-            if self._cancelled:
-                break
+                # Update last_run_at (best-effort)
+                self._update_cron_run(task_id, last_run_at=datetime.now(timezone.utc))
 
-            # Execute via registered handler
-            if handler_type not in self._restore_handlers:
                 log_event(
                     source="scheduler",
-                    event_type="cron_handler_missing",
-                    payload={"task_id": task_id, "handler_type": handler_type, "name": name},
+                    event_type="cron_completed",
+                    payload={"task_id": task_id, "name": name},
+                )
+            except asyncio.CancelledError:
+                return
+            except Exception as e:
+                log_event(
+                    source="scheduler",
+                    event_type="cron_error",
+                    payload={"task_id": task_id, "name": name, "error": str(e)},
                 )
-            else:
-                try:
-                    log_event(
-                        source="scheduler",
-                        event_type="cron_executing",
-                        payload={
-                            "task_id": task_id,
-                            "name": name,
-                            "handler_type": handler_type,
-                            "scheduled_for": next_utc.isoformat(),
-                        },
-                    )
-                    coro = self._restore_handlers[handler_type](parameters)
-                    await coro
-
-                    # Update last_run_at (best-effort)
-                    try:
-                        if self._enable_persistence:
-                            db = get_db_sync()
-                            try:
-                                task = db.query(SchedulerTask).filter(SchedulerTask.task_id == task_id).first()
-                                if task:
-                                    if hasattr(task, "last_run_at"):
-                                        task.last_run_at = datetime.now(timezone.utc)
-                                    task.updated_at = datetime.now(timezone.utc)
-                                    db.commit()
-                            finally:
-                                db.close()
-                    except Exception:
-                        pass
 
-                    log_event(
-                        source="scheduler",
-                        event_type="cron_completed",
-                        payload={"task_id": task_id, "name": name},
-                    )
-                except asyncio.CancelledError:
-                    break
-                except Exception as e:
-                    log_event(
-                        source="scheduler",
-                        event_type="cron_error",
-                        payload={"task_id": task_id, "name": name, "error": str(e)},
-                    )
+        job.task = None
+        if not job.cancelled and not self._cancelled:
+            self._push_cron(job)
 
     def schedule_cron(
         self,
@@ -633,26 +1074,20 @@ class Scheduler:
         persist: bool = True,
     ) -> None:
         """Schedule a cron-based recurring task (Option A)."""
-        loop = self._ensure_loop()
+        self._ensure_loop()
 
         # Cancel existing cron task with same id
-        if task_id in self._cron_tasks:
-            self._cron_tasks[task_id].cancel()
-            del self._cron_tasks[task_id]
+        existing = self._cron_tasks.pop(task_id, None)
+        if existing is not None:
+            self._discard_job(existing)
             if persist:
                 self._update_task_status(task_id, "cancelled")
+                # The save below rewrites the row, superseding queued updates
+                self._journal.discard(task_id)
 
         # Compute next run for persistence/UI visibility (best-effort)
-        next_run_utc = None
         try:
-            from croniter import croniter
-            from zoneinfo import ZoneInfo
-            tz = ZoneInfo(timezone_name)
-            now_local = datetime.now(tz)
-            next_local = croniter(cron_expression, now_local).get_next(datetime)
-            if next_local.tzinfo is None:
-                next_local = next_local.replace(tzinfo=tz)
-            next_run_utc = next_local.astimezone(timezone.utc)
+            next_run_utc = self._next_cron_run(cron_expression, timezone_name)
         except Exception:
             next_run_utc = None
 
@@ -667,10 +1102,9 @@ class Scheduler:
                 next_run_at_utc=next_run_utc,
             )
 
-        task = loop.create_task(
-            self._cron_loop(task_id, cron_expression, timezone_name, handler_type, parameters, name=name)
-        )
-        self._cron_tasks[task_id] = task
+        job = _CronJob(task_id, cron_expression, timezone_name, handler_type, parameters, name)
+        self._cron_tasks[task_id] = job
+        self._push_cron(job)
 
         log_event(
             source="scheduler",
@@ -684,6 +1118,35 @@ class Scheduler:
             },
         )
     
+    def _discard_job(self, job: Any) -> None:
+        """Tombstone a pending job's timer entry and cancel its run if one is in progress."""
+        job.cancelled = True
+        if job.task is None:
+            self._timers.discard()
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            self._release_job(job)
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._release_job(job)
+        else:
+            # On the loop, so it is ordered with _on_timer_due starting the job
+            loop.call_soon_threadsafe(self._release_job, job)
+    
+    @staticmethod
+    def _release_job(job: Any) -> None:
+        """Close a discarded job's never-started coroutine, or cancel its run."""
+        if job.task is None:
+            if isinstance(job, _OneShotJob) and job.coro is not None:
+                # Never started: close it so it isn't reported as un-awaited
+                job.coro.close()
+        elif not job.task.done():
+            job.task.cancel()
+    
     def cancel_one_shot_task(self, task_id: str) -> bool:
         """
         Cancel a scheduled one-shot task.
@@ -694,22 +1157,119 @@ class Scheduler:
         Returns:
             True if task was found and cancelled, False otherwise
         """
-        if task_id in self._one_shot_tasks:
-            task = self._one_shot_tasks[task_id]
-            task.cancel()
-            del self._one_shot_tasks[task_id]
+        job = self._one_shot_tasks.pop(task_id, None)
+        if job is not None:
+            self._discard_job(job)
             self._update_task_status(task_id, "cancelled")
+        elif task_id not in self._cancel_stored_one_shots([task_id]):
+            return False
+        log_event(
+            source="scheduler",
+            event_type="one_shot_cancelled",
+            payload={"task_id": task_id}
+        )
+        return True
+    
+    def cancel_many(self, task_ids: List[str]) -> List[str]:
+        """
+        Cancel several tasks at once.
+        
+        One-shot tasks in memory are marked cancelled in one journal flush and
+        ones only in the database in one update; periodic and cron ids are
+        cancelled one by one, as by cancel_task.
+        
+        Args:
+            task_ids: Task IDs (or periodic task names)
+            
+        Returns:
+            IDs that were found and cancelled, in request order
+        """
+        found = set()
+        one_shot = []
+        stored = []
+        for task_id in task_ids:
+            job = self._one_shot_tasks.pop(task_id, None)
+            if job is not None:
+                self._discard_job(job)
+                one_shot.append(task_id)
+                found.add(task_id)
+            elif task_id in self._tasks:
+                self.cancel_periodic_task(task_id)
+                found.add(task_id)
+            elif self.cancel_cron_task(task_id):
+                found.add(task_id)
+            else:
+                stored.append(task_id)
+        self._update_task_statuses(one_shot, "cancelled")
+        found.update(self._cancel_stored_one_shots(stored))
+        
+        cancelled = [task_id for task_id in task_ids if task_id in found]
+        log_event(
+            source="scheduler",
+            event_type="one_shot_batch_cancelled",
+            payload={"requested": len(task_ids), "cancelled": len(cancelled)}
+        )
+        return cancelled
+    
+    def _cancel_stored_one_shots(self, task_ids: List[str]) -> set:
+        """
+        Cancel pending one-shot tasks that are beyond the horizon (only in the database).
+        
+        Returns:
+            The task_ids that were found and cancelled
+        """
+        if not self._enable_persistence or not task_ids:
+            return set()
+        # Before the update: a refill that already read the rows must skip them
+        self._cancelled_ids.update(task_ids)
+        # The rows may still be queued journal inserts
+        self._journal.flush()
+        
+        def _cancel() -> set:
+            db = get_db_sync()
+            try:
+                cancelled = set()
+                for start in range(0, len(task_ids), TASK_ID_CHUNK):
+                    chunk = task_ids[start:start + TASK_ID_CHUNK]
+                    pending = [
+                        row[0] for row in db.query(SchedulerTask.task_id).filter(
+                            SchedulerTask.task_id.in_(chunk),
+                            SchedulerTask.task_type == "one_shot",
+                            SchedulerTask.status == "scheduled"
+                        )
+                    ]
+                    if pending:
+                        db.query(SchedulerTask).filter(SchedulerTask.task_id.in_(pending)).update(
+                            {"status": "cancelled", "updated_at": datetime.now(timezone.utc)},
+                            synchronize_session=False
+                        )
+                        cancelled.update(pending)
+                db.commit()
+                return cancelled
+            finally:
+                db.close()
+        
+        try:
+            # Through the writer, so still-queued saves of these tasks land first
+            found = get_db_executor().call(_cancel)
+        except Exception as e:
             log_event(
                 source="scheduler",
-                event_type="one_shot_cancelled",
-                payload={"task_id": task_id}
+                event_type="persistence_error",
+                payload={"action": "cancel_stored_one_shot", "task_ids": task_ids[:20], "error": str(e)}
             )
-            return True
-        return False
+            return set()
+        # Paged in between the memory check and the update
+        for task_id in task_ids:
+            job = self._one_shot_tasks.pop(task_id, None)
+            if job is not None:
+                self._discard_job(job)
+                found.add(task_id)
+        return found
     
     def cancel_task(self, task_id: str) -> bool:
         """
-        Cancel a task (tries one-shot first, then periodic).
+        Cancel a task (tries one-shot first, then periodic, then cron).
         
         Args:
             task_id: Task ID or periodic task name
@@ -724,30 +1284,48 @@ class Scheduler:
         if task_id in self._tasks:
             self.cancel_periodic_task(task_id)
             return True
-        return False
+        return self.cancel_cron_task(task_id)
+    
+    def cancel_cron_task(self, task_id: str) -> bool:
+        """
+        Cancel a cron task and mark it cancelled in the database.
+        
+        Returns:
+            True if task was found and cancelled, False otherwise
+        """
+        job = self._cron_tasks.pop(task_id, None)
+        if job is None:
+            return False
+        self._discard_job(job)
+        self._update_task_status(task_id, "cancelled")
+        log_event(
+            source="scheduler",
+            event_type="cron_cancelled",
+            payload={"task_id": task_id}
+        )
+        return True
     
     def cancel_all(self, persist_db: bool = True) -> None:
         """Cancel all tasks and enter safe mode (optionally persists cancellation to DB)."""
         self._cancelled = True
+        cancelled = []
         for name, task in list(self._tasks.items()):
             task.cancel()
-            if persist_db:
-                self._update_task_status(name, "cancelled")
+            cancelled.append(name)
         self._tasks.clear()
         
-        # Cancel all one-shot tasks
-        for task_id, task in list(self._one_shot_tasks.items()):
-            task.cancel()
-            if persist_db:
-                self._update_task_status(task_id, "cancelled")
-        self._one_shot_tasks.clear()
-
-        # Cancel all cron tasks
-        for task_id, task in list(self._cron_tasks.items()):
-            task.cancel()
-            if persist_db:
-                self._update_task_status(task_id, "cancelled")
-        self._cron_tasks.clear()
+        # Cancel all one-shot and cron tasks
+        for jobs in (self._one_shot_tasks, self._cron_tasks):
+            for task_id, job in list(jobs.items()):
+                self._discard_job(job)
+                cancelled.append(task_id)
+            jobs.clear()
+        self._timers.clear()
+        
+        if persist_db:
+            self._update_task_statuses(cancelled, "cancelled")
+            # Including one-shot tasks beyond the horizon, which are only in the database
+            self.cancel_stored_tasks()
         
         log_event(
             source="scheduler",
@@ -755,25 +1333,69 @@ class Scheduler:
             payload={"persist_db": persist_db}
         )
     
+    @db_write
+    def cancel_stored_tasks(self) -> None:
+        """
+        Mark every task still scheduled in the database cancelled.
+        
+        Tasks in memory keep running; see cancel_all. Inside a unit_of_work()
+        the update joins the unit (a failure only undoes the update).
+        """
+        if not self._enable_persistence:
+            return
+        # Queued journal inserts first, so they are cancelled too (inline on the writer)
+        self._journal.flush()
+        try:
+            with unit_of_work() as db:
+                db.query(SchedulerTask).filter(SchedulerTask.status == "scheduled").update(
+                    {"status": "cancelled", "updated_at": datetime.now(timezone.utc)},
+                    synchronize_session=False
+                )
+        except Exception as e:
+            log_event(
+                source="scheduler",
+                event_type="persistence_error",
+                payload={"action": "cancel_stored_tasks", "error": str(e)}
+            )
+    
     def stop(self, persist_db: bool = False) -> None:
         """Stop the scheduler (by default, cancels in-memory tasks without marking DB as cancelled)."""
         self.cancel_all(persist_db=persist_db)
-        if self._loop is not None:
-            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._journal.flush()
+        self._runner.shutdown()
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            if threading.current_thread() is not self._thread:
+                # Dispatcher, refill loop and any runs still pending end before the loop stops
+                try:
+                    asyncio.run_coroutine_threadsafe(self._cancel_loop_tasks(), loop).result(timeout=1.0)
+                except Exception:
+                    pass
+            loop.call_soon_threadsafe(loop.stop)
+        self._refill_future = None
         if self._thread is not None:
             self._thread.join(timeout=1.0)
     
+    @staticmethod
+    async def _cancel_loop_tasks() -> None:
+        """Cancel every other task on the running loop and wait for them to finish."""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
     def register_restore_handler(
         self,
         handler_type: str,
-        handler_func: Callable[[Dict[str, Any]], Coroutine[Any, Any, None]]
+        handler_func: Callable[[Dict[str, Any]], Any]
     ) -> None:
         """
         Register a handler function for restoring tasks of a specific type.
         
         Args:
             handler_type: Handler type identifier (e.g., 'discord_schedule_message')
-            handler_func: Async function that takes parameters dict and returns a coroutine
+            handler_func: Function that takes a parameters dict: async, or sync
+                (run on the scheduler's worker threads)
         """
         self._restore_handlers[handler_type] = handler_func
     
@@ -781,10 +1403,13 @@ class Scheduler:
         """
         Restore pending tasks from the database using registered handlers.
         
+        Only one-shot tasks due within the horizon are loaded; this also
+        starts the refill loop that pages in later ones.
+        
         Returns:
             Dictionary with restoration results
         """
-        pending = self.load_pending_tasks()
+        pending = self.load_pending_tasks(horizon=self._horizon_end())
         restored = {"periodic": 0, "one_shot": 0, "failed": 0, "errors": []}
         
         # Restore periodic tasks
@@ -817,12 +1442,7 @@ class Scheduler:
                     )
                     continue
                 
-                # Get the handler and create the coroutine
-                handler_func = self._restore_handlers[handler_type]
-                parameters = task.get("parameters") or {}
-                coro = handler_func(parameters)
-                
-                # Reschedule the task
+                # Reschedule the task (its coroutine is built when it fires)
                 when_dt = task["scheduled_for"]
                 if isinstance(when_dt, str):
                     when_dt = datetime.fromisoformat(when_dt.replace("Z", "+00:00"))
@@ -837,12 +1457,15 @@ class Scheduler:
                 now = datetime.now(timezone.utc)
                 if when_dt > now:
                     # Restore in-memory WITHOUT inserting a new DB row (use original task_id)
-                    self.restore_one_shot_in_memory(
-                        task_id=task["task_id"],
-                        when_dt_utc=when_dt,
-                        coro_fn=coro,
-                        name=task.get("name"),
-                    )
+                    if task["task_id"] not in self._one_shot_tasks:
+                        self._schedule_one_shot_in_memory(
+                            task["task_id"],
+                            when_dt,
+                            None,
+                            task.get("name"),
+                            handler_type=handler_type,
+                            parameters=task.get("parameters") or {},
+                        )
                     restored["one_shot"] += 1
                     log_event(
                         source="scheduler",
@@ -929,18 +1552,135 @@ class Scheduler:
             payload=restored
         )
         
+        self._start_refill()
         return restored
     
-    def load_pending_tasks(self) -> Dict[str, Any]:
+    def _horizon_end(self) -> datetime:
+        """Latest due time of the one-shot tasks held in memory."""
+        return datetime.now(timezone.utc) + timedelta(minutes=get_settings().scheduler_horizon_minutes)
+    
+    def _beyond_horizon(self, when_dt_utc: datetime, handler_type: Optional[str]) -> bool:
+        """Whether a new one-shot task can wait in the database for a refill."""
+        return handler_type in self._restore_handlers and self._past_horizon(when_dt_utc)
+    
+    def _past_horizon(self, when_dt_utc: datetime) -> bool:
+        """Whether a new one-shot task falls due after the tasks the refill loop holds in memory."""
+        # After cancel_all the refill loop is paused, so tasks scheduled since stay in memory
+        return (
+            self._refill_future is not None
+            and not self._cancelled
+            and when_dt_utc > self._horizon_end()
+        )
+    
+    def _start_refill(self) -> None:
+        """Start the horizon refill loop on the scheduler loop (once)."""
+        if not self._enable_persistence or self._refill_future is not None:
+            return
+        self._refill_future = asyncio.run_coroutine_threadsafe(self._refill_loop(), self._ensure_loop())
+    
+    async def _refill_loop(self) -> None:
+        """Page in one-shot tasks as they come within the horizon."""
+        settings = get_settings()
+        # A refill must happen before anything beyond the horizon falls due
+        interval = min(settings.scheduler_refill_interval_seconds, settings.scheduler_horizon_minutes * 30)
+        while True:
+            await asyncio.sleep(max(1.0, interval))
+            if self._cancelled:
+                # SAFE MODE: stored tasks were cancelled and new ones aren't deferred
+                continue
+            try:
+                await self._refill()
+            except Exception as e:
+                log_event(
+                    source="scheduler",
+                    event_type="persistence_error",
+                    payload={"action": "refill", "error": str(e)}
+                )
+    
+    async def _refill(self) -> int:
+        """
+        Load pending one-shot tasks due before the horizon that aren't in memory.
+        
+        Returns:
+            Number of tasks added
+        """
+        horizon = self._horizon_end()
+        after = None
+        added = 0
+        while True:
+            rows = await run_db_read(self._load_one_shot_page, horizon, after)
+            for row in rows:
+                task_id = row["task_id"]
+                if task_id in self._one_shot_tasks or task_id in self._cancelled_ids:
+                    continue
+                when_dt = row["scheduled_for"].replace(tzinfo=timezone.utc)
+                self._schedule_one_shot_in_memory(
+                    task_id,
+                    when_dt,
+                    None,
+                    row["name"],
+                    handler_type=row["handler_type"],
+                    parameters=row["parameters"],
+                )
+                added += 1
+            if len(rows) < REFILL_PAGE_SIZE:
+                break
+            after = (rows[-1]["scheduled_for"], rows[-1]["id"])
+        # Anything cancelled before these queries is no longer 'scheduled' in the database
+        self._cancelled_ids.clear()
+        if added:
+            log_event(
+                source="scheduler",
+                event_type="one_shot_tasks_refilled",
+                payload={"count": added, "horizon": horizon.isoformat()}
+            )
+        return added
+    
+    @staticmethod
+    def _load_one_shot_page(horizon: datetime, after: Optional[tuple]) -> List[Dict[str, Any]]:
+        """One page of pending one-shot tasks due between now and the horizon, by due time."""
+        db = get_read_db(allow_snapshot=False)
+        try:
+            q = db.query(SchedulerTask).filter(
+                SchedulerTask.task_type == "one_shot",
+                SchedulerTask.status == "scheduled",
+                SchedulerTask.scheduled_for > datetime.now(timezone.utc),
+                SchedulerTask.scheduled_for <= horizon
+            )
+            if after is not None:
+                q = q.filter(tuple_(SchedulerTask.scheduled_for, SchedulerTask.id) > tuple_(*after))
+            tasks = q.order_by(SchedulerTask.scheduled_for, SchedulerTask.id).limit(REFILL_PAGE_SIZE).all()
+            return [
+                {
+                    "id": t.id,
+                    "task_id": t.task_id,
+                    "name": t.name,
+                    "scheduled_for": t.scheduled_for,
+                    "handler_type": t.handler_type,
+                    "parameters": json.loads(t.parameters_json) if t.parameters_json else None
+                }
+                for t in tasks
+            ]
+        finally:
+            db.close()
+    
+    def load_pending_tasks(self, horizon: Optional[datetime] = None) -> Dict[str, Any]:
         """
         Load pending tasks from the database.
         
+        Args:
+            horizon: Only load one-shot tasks due by this time
+        
         Returns:
             Dictionary with 'periodic' and 'one_shot' lists of task records
         """
         if not self._enable_persistence:
             return {"periodic": [], "one_shot": []}
         
+        # Read after any persistence still queued in the journal or on the DB writer thread
+        self._journal.flush()
+        get_db_executor().drain()
+        
         try:
             db = get_db_sync()
             try:
@@ -952,11 +1692,14 @@ class Scheduler:
                 
                 # Load pending one-shot tasks (only future ones)
                 now = datetime.now(timezone.utc)
-                one_shot_tasks = db.query(SchedulerTask).filter(
+                one_shot_query = db.query(SchedulerTask).filter(
                     SchedulerTask.task_type == "one_shot",
                     SchedulerTask.status == "scheduled",
                     SchedulerTask.scheduled_for > now
-                ).all()
+                )
+                if horizon is not None:
+                    one_shot_query = one_shot_query.filter(SchedulerTask.scheduled_for <= horizon)
+                one_shot_tasks = one_shot_query.all()
                 
                 # Optional cron tasks (status scheduled)
                 cron_tasks = db.query(SchedulerTask).filter(
@@ -1049,12 +1792,13 @@ class Scheduler:
             })
         
         one_shot_tasks = []
-        for task_id, task in self._one_shot_tasks.items():
+        for task_id, job in list(self._one_shot_tasks.items()):
             one_shot_tasks.append({
                 "task_id": task_id,
-                "status": "scheduled" if not task.done() else "done",
-                "cancelled": task.cancelled(),
-                "exception": str(task.exception()) if task.done() and task.exception() else None
+                "status": "scheduled" if job.task is None else "running",
+                "when": job.when.isoformat(),
+                "cancelled": job.cancelled,
+                "exception": None
             })
         
         return {
@@ -1063,7 +1807,10 @@ class Scheduler:
             "periodic_tasks": periodic_tasks,
             "one_shot_tasks": one_shot_tasks,
             "periodic_count": len(periodic_tasks),
-            "one_shot_count": len(one_shot_tasks)
+            "one_shot_count": len(one_shot_tasks),
+            "cron_count": len(self._cron_tasks),
+            "timer_heap_size": len(self._timers),
+            "runner": self._runner.stats()
         }
 
 
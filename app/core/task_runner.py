@@ -0,0 +1,172 @@
+"""Bounded execution of scheduler task runs.
+
+The timer heap (app.core.timer_queue) only decides when a task is due;
+running it goes through a TaskRunner, which bounds how much runs at once
+independently of dispatch:
+
+- a global cap on concurrent runs (SCHEDULER_MAX_CONCURRENCY);
+- a cap per handler_type (SCHEDULER_HANDLER_CONCURRENCY, overridable per
+  type with SCHEDULER_HANDLER_LIMITS), so a burst of one kind of task
+  can't take every slot;
+- sync handlers and periodic functions run on a dedicated thread pool
+  (SCHEDULER_WORKER_THREADS), never on the scheduler loop.
+
+A due task waiting for a slot is a suspended coroutine, so the dispatcher
+keeps firing other timers on time however many runs are queued.
+"""
+import asyncio
+import contextlib
+import functools
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+WORKER_THREAD_PREFIX = "scheduler-worker"
+
+
+class TaskRunner:
+    """
+    Global and per-key concurrency limits plus a worker thread pool.
+
+    Keys are handler types (or periodic task names). Semaphores belong to
+    the loop passed to start(); slot() and run() must be awaited on it.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        handler_concurrency: int,
+        handler_limits: Optional[Dict[str, int]] = None,
+        worker_threads: int = 4,
+    ):
+        self._max_concurrency = max(1, max_concurrency)
+        self._handler_concurrency = max(1, handler_concurrency)
+        self._handler_limits = {key: max(1, limit) for key, limit in (handler_limits or {}).items()}
+        self._worker_threads = max(1, worker_threads)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._global: Optional[asyncio.Semaphore] = None
+        self._per_key: Dict[str, asyncio.Semaphore] = {}
+        # Counters (only touched on the loop thread)
+        self._running: Dict[str, int] = {}
+        self._waiting: Dict[str, int] = {}
+        self._completed = 0
+        self._max_wait = 0.0
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Create fresh limits for a (new) scheduler loop; call from that loop's thread."""
+        self._global = asyncio.Semaphore(self._max_concurrency)
+        self._per_key = {}
+        self._running = {}
+        self._waiting = {}
+
+    def limit_for(self, key: str) -> int:
+        """Concurrent runs allowed for one key."""
+        return self._handler_limits.get(key, self._handler_concurrency)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, key: str) -> AsyncIterator[None]:
+        """
+        Hold one of the key's slots and one global slot for the body.
+
+        The key's slot is taken first, so a run that is only waiting on its
+        own handler's limit doesn't hold a global slot meanwhile.
+        """
+        if self._global is None:
+            self.start(asyncio.get_running_loop())
+        semaphore = self._per_key.get(key)
+        if semaphore is None:
+            semaphore = self._per_key[key] = asyncio.Semaphore(self.limit_for(key))
+        queued = time.monotonic()
+        self._waiting[key] = self._waiting.get(key, 0) + 1
+        try:
+            await semaphore.acquire()
+            try:
+                await self._global.acquire()
+            except BaseException:
+                semaphore.release()
+                raise
+        finally:
+            self._waiting[key] -= 1
+        self._max_wait = max(self._max_wait, time.monotonic() - queued)
+        self._running[key] = self._running.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            self._running[key] -= 1
+            self._completed += 1
+            self._global.release()
+            semaphore.release()
+
+    async def run(self, key: str, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a handler within the key's limits.
+
+        Coroutine functions are awaited on the loop; anything else runs on
+        the worker pool (and if it returns an awaitable, that is awaited).
+        """
+        async with self.slot(key):
+            if asyncio.iscoroutinefunction(func):
+                return await func(*args)
+            result = await self.run_blocking(func, *args)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+    async def run_coroutine(self, key: str, coro: Awaitable[T]) -> T:
+        """Await an already-created coroutine within the key's limits."""
+        started = False
+        try:
+            async with self.slot(key):
+                started = True
+                return await coro
+        finally:
+            if not started and inspect.iscoroutine(coro):
+                # Cancelled while waiting for a slot
+                coro.close()
+
+    async def run_blocking(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a sync call on the worker pool (no slot; for blocking work inside a running handler)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor(), functools.partial(func, *args))
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self._worker_threads, thread_name_prefix=WORKER_THREAD_PREFIX
+                    )
+        return self._pool
+
+    def shutdown(self) -> None:
+        """Stop the worker pool without waiting (a later run starts a new one)."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        keys = sorted(set(self._running) | set(self._waiting))
+        return {
+            "max_concurrency": self._max_concurrency,
+            "worker_threads": self._worker_threads,
+            "running": sum(self._running.values()),
+            "waiting": sum(self._waiting.values()),
+            "completed": self._completed,
+            "max_wait_ms": round(self._max_wait * 1000, 2),
+            "handlers": {
+                key: {
+                    "running": self._running.get(key, 0),
+                    "waiting": self._waiting.get(key, 0),
+                    "limit": self.limit_for(key),
+                }
+                for key in keys
+                if self._running.get(key) or self._waiting.get(key)
+            },
+        }
@@ -0,0 +1,171 @@
+"""Heap-based timer dispatch for the scheduler.
+
+Instead of one sleeping asyncio Task per pending job, pending jobs are
+entries in a min-heap keyed by due time, and a single dispatcher coroutine
+sleeps until the earliest one. A pending job costs a heap tuple plus the
+caller's record, so hundreds of thousands can wait without a coroutine,
+frame or loop timer each.
+
+Cancellation is lazy: the owner marks its record dead and the heap entry
+(a tombstone) is dropped when it reaches the top, or earlier when
+tombstones make up most of the heap.
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from app.core.logger import log_error
+
+
+# Longest single sleep, so wall-clock adjustments are noticed
+MAX_SLEEP_SECONDS = 60.0
+# Rebuild the heap when at least this many entries are tombstones (and they're the majority)
+COMPACT_MIN_TOMBSTONES = 1024
+
+
+class TimerQueue:
+    """
+    Min-heap of (due timestamp, sequence, item) drained by one coroutine.
+
+    Items are opaque to the queue. When an item falls due, the dispatcher
+    calls on_due(item) on its loop if is_live(item) is still true; on_due
+    must not block (start a task for the actual work). Entries with equal
+    due times fire in push order.
+
+    push() and discard() may be called from any thread.
+    """
+
+    def __init__(self, on_due: Callable[[Any], None], is_live: Callable[[Any], bool]):
+        self._on_due = on_due
+        self._is_live = is_live
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._tombstones = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        """Heap entries, including tombstones not yet dropped."""
+        return len(self._heap)
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the dispatcher coroutine (call from the loop's own thread)."""
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._dispatch())
+
+    def push(self, due: float, item: Any) -> None:
+        """Add an item due at a UNIX timestamp."""
+        with self._lock:
+            heapq.heappush(self._heap, (due, next(self._seq), item))
+            earliest = self._heap[0][2] is item
+        if earliest:
+            self._wake()
+
+    def push_many(self, entries: Iterable[Tuple[float, Any]]) -> None:
+        """
+        Add several (due timestamp, item) entries under one lock and one wake-up.
+
+        A batch that is large next to the heap is appended and the heap
+        rebuilt (O(n)) rather than pushed entry by entry (O(k log n)).
+        """
+        with self._lock:
+            before = self._heap[0] if self._heap else None
+            added = [(due, next(self._seq), item) for due, item in entries]
+            if len(added) > len(self._heap) // 4:
+                self._heap.extend(added)
+                heapq.heapify(self._heap)
+            else:
+                for entry in added:
+                    heapq.heappush(self._heap, entry)
+            earliest = bool(self._heap) and self._heap[0] is not before
+        if earliest:
+            self._wake()
+
+    def discard(self) -> None:
+        """
+        Note that one pushed item is no longer live.
+
+        The caller has already marked the item dead (is_live returns False);
+        this only tracks tombstones so the heap can be compacted.
+        """
+        with self._lock:
+            self._tombstones += 1
+            if self._tombstones >= COMPACT_MIN_TOMBSTONES and self._tombstones * 2 > len(self._heap):
+                self._heap = [entry for entry in self._heap if self._is_live(entry[2])]
+                heapq.heapify(self._heap)
+                self._tombstones = 0
+
+    def clear(self) -> None:
+        """Drop every entry (live or not)."""
+        with self._lock:
+            self._heap.clear()
+            self._tombstones = 0
+
+    def next_due(self) -> Optional[float]:
+        """Due timestamp of the earliest live entry, if any."""
+        with self._lock:
+            self._drop_dead_top()
+            return self._heap[0][0] if self._heap else None
+
+    def items(self) -> Iterable[Any]:
+        """Live items, in no particular order."""
+        with self._lock:
+            return [entry[2] for entry in self._heap if self._is_live(entry[2])]
+
+    def _drop_dead_top(self) -> None:
+        # Caller holds the lock
+        while self._heap and not self._is_live(self._heap[0][2]):
+            heapq.heappop(self._heap)
+            self._tombstones = max(0, self._tombstones - 1)
+
+    def _pop_due(self, now: float) -> List[Any]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, item = heapq.heappop(self._heap)
+                if self._is_live(item):
+                    due.append(item)
+                else:
+                    self._tombstones = max(0, self._tombstones - 1)
+        return due
+
+    def _wake(self) -> None:
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wakeup.set()
+        else:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def _dispatch(self) -> None:
+        wakeup = self._wakeup
+        while True:
+            # Cleared before draining: a push after this point sets it again
+            wakeup.clear()
+            for item in self._pop_due(time.time()):
+                try:
+                    self._on_due(item)
+                except Exception as e:
+                    log_error("scheduler", e, {"action": "timer_dispatch"})
+
+            next_due = self.next_due()
+            delay = MAX_SLEEP_SECONDS if next_due is None else min(MAX_SLEEP_SECONDS, next_due - time.time())
+            if delay <= 0:
+                # Let the tasks just started run before draining again
+                await asyncio.sleep(0)
+                continue
+            try:
+                await asyncio.wait_for(wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
@@ -8,13 +8,17 @@ from typing import Optional, Dict, Literal, Tuple
 import httpx
 
 from app.config.settings import get_settings
-from app.core.logger import log_event, log_error
+from app.core.logger import log_event, log_error, flush_events
+from app.core.loop_monitor import start_loop_monitor
 from app.core.scheduler import get_scheduler
 from app.ingest.bluesky_client import BlueskyClient
 from app.ingest.lovense_client import LovenseClient
 from app.outputs.discord_client import DiscordBot
-from app.storage.db import init_db, get_db_sync
+from app.storage.archive import run_event_retention
+from app.storage.db import init_db, get_db_sync, refresh_read_snapshot
+from app.storage.maintenance import register_maintenance_handler, schedule_db_maintenance
 from app.storage.models import Run
+from app.storage.stats import bump_table_counter, run_counter_reconciliation
 from app.ai.dom_bot import DomBot
 from app.ai.tool_handlers import register_scheduler_restore_handlers
 
@@ -61,6 +65,7 @@ class HiveLordApp:
                     notes="Wiring phase - initial setup"
                 )
                 db.add(run)
+                bump_table_counter(db, "runs")
                 db.commit()
                 self.run_id = run.id
                 self.module_status["database"] = "active"
@@ -406,6 +411,34 @@ class HiveLordApp:
             self.module_status["scheduler"] = "active"
             log_event(source="main", event_type="scheduler_started", payload={})
             
+            # 9.1. Event retention job (moves old events into archive segments)
+            if self.settings.enable_database and self.settings.event_retention_days > 0:
+                self.scheduler.schedule_periodic(
+                    "event_retention",
+                    run_event_retention,
+                    interval=self.settings.event_retention_interval_seconds
+                )
+            
+            # 9.2. Row counter reconciliation (repairs stats counter drift)
+            if self.settings.enable_database and self.settings.stats_reconcile_interval_seconds > 0:
+                self.scheduler.schedule_periodic(
+                    "stats_reconcile",
+                    run_counter_reconciliation,
+                    interval=self.settings.stats_reconcile_interval_seconds
+                )
+            
+            # 9.3. Read snapshot refresh (dashboard reads from a periodic copy)
+            if self.settings.enable_database and self.settings.db_read_snapshot_path:
+                self.scheduler.schedule_periodic(
+                    "read_snapshot_refresh",
+                    refresh_read_snapshot,
+                    interval=self.settings.db_read_snapshot_interval_seconds
+                )
+            
+            # 9.4. Event loop lag monitoring (main loop runs Discord and Dom Bot)
+            start_loop_monitor("main")
+            start_loop_monitor("scheduler", self.scheduler.loop)
+            
             # 9.5. Register restoration handlers and restore pending tasks
             try:
                 register_scheduler_restore_handlers(
@@ -413,6 +446,8 @@ class HiveLordApp:
                     discord_bot=self.discord_bot,
                     bluesky_client=self.bluesky_client
                 )
+                if self.settings.enable_database:
+                    register_maintenance_handler(self.scheduler)
                 
                 # Restore pending tasks from database
                 restore_result = self.scheduler.restore_pending_tasks()
@@ -421,6 +456,10 @@ class HiveLordApp:
                     event_type="scheduler_tasks_restored",
                     payload=restore_result
                 )
+                
+                # 9.6. Database maintenance cron task (replaces a restored one)
+                if self.settings.enable_database:
+                    schedule_db_maintenance(self.scheduler)
             except Exception as e:
                 log_error("main", e, {"action": "restore_scheduler_tasks"})
                 log_event(
@@ -499,6 +538,9 @@ class HiveLordApp:
                 log_error("main", e, {"action": "end_run"})
         
         log_event(source="main", event_type="shutdown_complete", payload={})
+        
+        # Write out any buffered events before the process exits
+        flush_events()
     
     async def run(self) -> None:
         """Run the application - startup failures don't crash the app."""
@@ -7,8 +7,17 @@ from discord.ext import commands
 
 from app.config.settings import get_settings, is_dom_mode_enabled
 from app.core.consent import arm_consent, disarm_consent, safe_mode
-from app.core.logger import log_event, log_message_sent, log_error
+from app.core.logger import log_event, log_message_sent, log_error, flush_events
 from app.core.scheduler import get_scheduler
+from app.storage.async_db import run_db
+from app.storage.db import unit_of_work
+
+
+def _persist_safe_mode(scheduler) -> None:
+    """SAFE MODE's database side: the consent entry, its event and every stored task cancelled, in one commit."""
+    with unit_of_work():
+        safe_mode()
+        scheduler.cancel_stored_tasks()
 
 
 class DiscordBot:
@@ -153,7 +162,7 @@ class DiscordBot:
         # Handle system commands (always available)
         if content_upper == "ARM":
             try:
-                arm_consent()
+                await run_db(arm_consent)
                 await message.channel.send("✅ Consent ARMED (10 minutes)")
             except Exception as e:
                 log_error("discord", e, {"command": "ARM"})
@@ -162,7 +171,7 @@ class DiscordBot:
         
         elif content_upper == "DISARM":
             try:
-                disarm_consent()
+                await run_db(disarm_consent)
                 await message.channel.send("✅ Consent DISARMED")
             except Exception as e:
                 log_error("discord", e, {"command": "DISARM"})
@@ -171,11 +180,14 @@ class DiscordBot:
         
         elif content_upper == "SAFE MODE":
             try:
-                safe_mode()
-                # Cancel all scheduled tasks
                 scheduler = get_scheduler()
-                # SAFE MODE is an explicit cancellation: persist cancellation to DB.
-                scheduler.cancel_all(persist_db=True)
+                # SAFE MODE is an explicit cancellation: the stored tasks are
+                # cancelled in the same unit as the consent entry
+                await run_db(_persist_safe_mode, scheduler)
+                # Then the tasks in memory (their rows are already cancelled)
+                scheduler.cancel_all(persist_db=False)
+                # Make sure the SAFE MODE audit trail is on disk before confirming
+                await asyncio.to_thread(flush_events)
                 await message.channel.send("🔒 SAFE MODE ACTIVATED - All consent disabled, tasks cancelled")
             except Exception as e:
                 log_error("discord", e, {"command": "SAFE MODE"})
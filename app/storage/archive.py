@@ -0,0 +1,271 @@
+"""Time-based event retention with compressed per-day archive segments."""
+import gzip
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.config.settings import get_settings
+from app.core.logger import log_event, log_error
+from app.storage.codec import FORMAT_COMPACT, event_payload_text
+from app.storage.db import get_db_sync
+from app.storage.models import Event
+from app.storage.search import unindex_compact_events
+from app.storage.stats import bump_event_counters, count_event_rows
+
+
+SEGMENT_PREFIX = "events-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+# Lowest and highest event id in each segment, keyed by day
+SEGMENT_INDEX_FILE = "_segment_ids.json"
+
+
+def _to_naive_utc(dt: datetime) -> datetime:
+    """Normalize a datetime to naive UTC (the form stored in SQLite)."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def segment_path(archive_dir: str, day: date) -> str:
+    """Path of the archive segment holding events for one UTC day."""
+    return os.path.join(archive_dir, f"{SEGMENT_PREFIX}{day.isoformat()}{SEGMENT_SUFFIX}")
+
+
+def list_segments(archive_dir: str) -> List[date]:
+    """List the days that have an archive segment, oldest first."""
+    if not os.path.isdir(archive_dir):
+        return []
+    days = []
+    for filename in os.listdir(archive_dir):
+        if filename.startswith(SEGMENT_PREFIX) and filename.endswith(SEGMENT_SUFFIX):
+            try:
+                days.append(date.fromisoformat(filename[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+            except ValueError:
+                continue
+    return sorted(days)
+
+
+def load_segment_index(archive_dir: str) -> Dict[date, Tuple[int, int]]:
+    """
+    Id range (lowest, highest) per segment day.
+
+    Segments archived before the index existed have no entry.
+    """
+    try:
+        with open(os.path.join(archive_dir, SEGMENT_INDEX_FILE), encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {date.fromisoformat(day): (int(low), int(high)) for day, (low, high) in index.items()}
+
+
+def _widen_segment_index(archive_dir: str, ranges: Dict[date, Tuple[int, int]]) -> None:
+    """Merge id ranges into the index (written atomically, before the rows are appended)."""
+    index = load_segment_index(archive_dir)
+    for day, (low, high) in ranges.items():
+        if day in index:
+            low, high = min(low, index[day][0]), max(high, index[day][1])
+        index[day] = (low, high)
+    path = os.path.join(archive_dir, SEGMENT_INDEX_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({day.isoformat(): list(ids) for day, ids in sorted(index.items())}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _row_to_record(event: Event, payload_text: str) -> Dict[str, Any]:
+    # Segments always hold JSON text, whatever the row's storage format
+    return {
+        "id": event.id,
+        "ts": event.ts.isoformat() if event.ts else None,
+        "source": event.source,
+        "type": event.type,
+        "payload_json": payload_text,
+    }
+
+
+def _record_to_event(record: Dict[str, Any]) -> Event:
+    """Build a detached Event from an archive record."""
+    return Event(
+        id=record["id"],
+        ts=datetime.fromisoformat(record["ts"]) if record.get("ts") else None,
+        source=record["source"],
+        type=record["type"],
+        payload_json=record["payload_json"],
+    )
+
+
+def archive_events(
+    older_than: timedelta,
+    archive_dir: Optional[str] = None,
+    batch_size: int = 5000,
+) -> Dict[str, Any]:
+    """
+    Move events older than a cutoff out of the events table into per-day segments.
+
+    Each batch is appended to its day segments (as a new gzip member) and
+    flushed to disk before the rows are deleted, so a crash can only leave
+    duplicates in the archive, never lose events. Readers de-duplicate by id.
+
+    Args:
+        older_than: Age after which events are archived
+        archive_dir: Segment directory (default: settings.event_archive_dir)
+        batch_size: Events moved per transaction
+
+    Returns:
+        Dictionary with 'archived' count, 'segments' touched and 'cutoff'
+    """
+    archive_dir = archive_dir or get_settings().event_archive_dir
+    cutoff = _to_naive_utc(datetime.now(timezone.utc) - older_than)
+    os.makedirs(archive_dir, exist_ok=True)
+
+    archived = 0
+    segments = set()
+    db = get_db_sync()
+    try:
+        while True:
+            events = (
+                db.query(Event)
+                .filter(Event.ts < cutoff)
+                .order_by(Event.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not events:
+                break
+
+            by_day: Dict[date, List[Dict[str, Any]]] = {}
+            compact = []
+            for event in events:
+                payload_text = event_payload_text(event)
+                if event.payload_format == FORMAT_COMPACT:
+                    compact.append((event.id, payload_text))
+                by_day.setdefault(event.ts.date(), []).append(_row_to_record(event, payload_text))
+
+            # Recorded first, so the index never understates what a segment holds
+            _widen_segment_index(archive_dir, {
+                day: (min(record["id"] for record in records), max(record["id"] for record in records))
+                for day, records in by_day.items()
+            })
+            for day, records in by_day.items():
+                path = segment_path(archive_dir, day)
+                with open(path, "ab") as raw:
+                    with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+                        for record in records:
+                            gz.write(json.dumps(record).encode("utf-8") + b"\n")
+                    raw.flush()
+                    os.fsync(raw.fileno())
+                segments.add(day.isoformat())
+
+            ids = [event.id for event in events]
+            # FTS triggers only cover JSON rows; drop compact rows' entries here
+            unindex_compact_events(db, compact)
+            db.query(Event).filter(Event.id.in_(ids)).delete(synchronize_session=False)
+            bump_event_counters(db, count_event_rows(events, sign=-1))
+            db.commit()
+            db.expunge_all()
+            archived += len(ids)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    return {"archived": archived, "segments": sorted(segments), "cutoff": cutoff.isoformat()}
+
+
+def _read_segment(archive_dir: str, day: date) -> List[Dict[str, Any]]:
+    records = []
+    with gzip.open(segment_path(archive_dir, day), "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    return records
+
+
+def archived_event_ids(archive_dir: Optional[str] = None, after_id: int = 0) -> List[Tuple[int, date]]:
+    """
+    (id, segment day) of every archived event with id > after_id, sorted by id.
+
+    Segments whose indexed id range is entirely at or below after_id are
+    not opened.
+    """
+    archive_dir = archive_dir or get_settings().event_archive_dir
+    index = load_segment_index(archive_dir)
+    ids: Dict[int, date] = {}
+    for day in list_segments(archive_dir):
+        if day in index and index[day][1] <= after_id:
+            continue
+        for record in _read_segment(archive_dir, day):
+            if record["id"] > after_id:
+                ids[record["id"]] = day
+    return sorted(ids.items())
+
+
+def load_segment_events(day: date, archive_dir: Optional[str] = None) -> Dict[int, Event]:
+    """Every event in one day's segment, by id (duplicates collapse), as detached Events."""
+    archive_dir = archive_dir or get_settings().event_archive_dir
+    return {record["id"]: _record_to_event(record) for record in _read_segment(archive_dir, day)}
+
+
+def iter_archived_events(
+    archive_dir: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    newest_first: bool = False,
+) -> Iterator[Event]:
+    """
+    Iterate archived events, opening only the segments inside the time range.
+
+    Events are yielded oldest first (or newest first with newest_first) as
+    detached Event objects not bound to any session.
+    """
+    archive_dir = archive_dir or get_settings().event_archive_dir
+    since = _to_naive_utc(since) if since else None
+    until = _to_naive_utc(until) if until else None
+
+    days = [
+        day for day in list_segments(archive_dir)
+        if not (since and day < since.date()) and not (until and day > until.date())
+    ]
+    if newest_first:
+        days.reverse()
+
+    for day in days:
+        records = _read_segment(archive_dir, day)
+        records.sort(key=lambda record: (record["ts"] or "", record["id"]), reverse=newest_first)
+        previous_id = None
+        for record in records:
+            # A batch archived twice (crash before its delete) repeats its ids in
+            # the same day's segment, where sorting puts the copies side by side
+            if record["id"] == previous_id:
+                continue
+            previous_id = record["id"]
+            event = _record_to_event(record)
+            if event.ts is None:
+                # An undated event can't be placed inside a time range
+                if since or until:
+                    continue
+            elif (since and event.ts < since) or (until and event.ts > until):
+                continue
+            yield event
+
+
+def run_event_retention() -> Dict[str, Any]:
+    """Scheduler job: archive events past the configured retention age."""
+    settings = get_settings()
+    if settings.event_retention_days <= 0:
+        return {"archived": 0, "segments": []}
+
+    try:
+        result = archive_events(timedelta(days=settings.event_retention_days))
+    except Exception as e:
+        log_error("storage", e, {"action": "event_retention"})
+        return {"archived": 0, "segments": [], "error": str(e)}
+
+    if result["archived"]:
+        log_event(source="storage", event_type="events_archived", payload=result)
+    return result
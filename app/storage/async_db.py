@@ -0,0 +1,227 @@
+"""Awaitable database access for code running on asyncio event loops.
+
+SQLAlchemy and sqlite3 are synchronous, so a commit made directly from a
+coroutine stalls every other task on that loop (Discord message handling,
+scheduler timers) until SQLite returns. Instead, event-loop code hands its
+database work to dedicated threads:
+
+- one writer thread per database file (the events and control table
+  groups share one when they share a file; see app.storage.routing), so
+  each file's writes from all loops are applied in the order they were
+  submitted, and with split files consent/scheduler writes never queue
+  behind a burst of event logging;
+- a small pool of reader threads for read-only queries, so a slow search
+  doesn't queue behind event logging.
+
+    result = await run_db(upsert_memory, key, value)
+    events = await run_db_read(search, query)
+
+Sync code that may be called from a loop (scheduler persistence) can use
+the @db_write decorator: on a loop the call is queued on the writer thread
+and returns immediately; elsewhere it runs on the writer thread and waits,
+which keeps both kinds of callers in one ordering. Inside a unit_of_work()
+it runs inline, in the unit's transaction.
+"""
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.config.settings import get_settings
+from app.storage.db import ambient_session
+from app.storage.routing import CONTROL, EVENTS, group_files
+
+
+T = TypeVar("T")
+
+WRITER_THREAD_PREFIX = "db-writer"
+
+
+def in_event_loop() -> bool:
+    """Whether the current thread is running an asyncio event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class DatabaseExecutor:
+    """
+    Thread pool for database calls, with queue/latency counters.
+
+    Counters are cumulative since start: submitted and completed calls,
+    the deepest the queue has been, and the longest a call waited for a
+    thread (queue_wait) and ran (run time).
+    """
+
+    def __init__(self, name: str, max_workers: int = 1):
+        self.name = name
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._max_depth = 0
+        self._max_wait = 0.0
+        self._max_run = 0.0
+        self._total_run = 0.0
+
+    def on_executor_thread(self) -> bool:
+        return threading.current_thread().name.startswith(self.name)
+
+    def submit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        """Queue a call; returns a concurrent.futures.Future with its result."""
+        queued_at = time.monotonic()
+
+        def _call() -> T:
+            started = time.monotonic()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                with self._lock:
+                    self._failed += 1
+                raise
+            finally:
+                finished = time.monotonic()
+                with self._lock:
+                    self._completed += 1
+                    self._max_wait = max(self._max_wait, started - queued_at)
+                    self._max_run = max(self._max_run, finished - started)
+                    self._total_run += finished - started
+
+        with self._lock:
+            self._submitted += 1
+            self._max_depth = max(self._max_depth, self._submitted - self._completed)
+        return self._pool.submit(_call)
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a call on the executor and await its result."""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a call on the executor and block for its result (inline if already on it)."""
+        if self.on_executor_thread():
+            return func(*args, **kwargs)
+        return self.submit(func, *args, **kwargs).result()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything queued so far has run.
+
+        Returns:
+            False if the timeout expired first
+        """
+        if self.on_executor_thread():
+            return True
+        try:
+            self.submit(lambda: None).result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "queue_depth": self._submitted - self._completed,
+                "max_queue_depth": self._max_depth,
+                "max_wait_ms": round(self._max_wait * 1000, 2),
+                "max_run_ms": round(self._max_run * 1000, 2),
+                "total_run_ms": round(self._total_run * 1000, 2),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+_writers: Dict[str, DatabaseExecutor] = {}
+_reader: Optional[DatabaseExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor(group: str = CONTROL) -> DatabaseExecutor:
+    """The single-threaded executor event-loop writes to one table group's file go through."""
+    writer = _writers.get(group)
+    if writer is None:
+        with _executor_lock:
+            writer = _writers.get(group)
+            if writer is None:
+                db_file = group_files()[group]
+                # Groups in the same file share its writer (one thread per write lock)
+                for other, executor in _writers.items():
+                    if group_files()[other] == db_file:
+                        writer = executor
+                        break
+                else:
+                    writer = DatabaseExecutor(f"{WRITER_THREAD_PREFIX}-{group}", max_workers=1)
+                _writers[group] = writer
+    return writer
+
+
+def drain_db_executors(timeout: Optional[float] = None) -> bool:
+    """Wait for every writer's queued work; False if any timed out."""
+    writers = {id(writer): writer for writer in (get_db_executor(EVENTS), get_db_executor(CONTROL))}
+    return all([writer.drain(timeout) for writer in writers.values()])
+
+
+def db_executor_stats() -> Dict[str, Dict[str, Any]]:
+    """Queue and latency counters per writer (keyed by its thread name prefix)."""
+    return {writer.name: writer.stats() for writer in list(_writers.values())}
+
+
+def get_db_read_executor() -> DatabaseExecutor:
+    """Executor for read-only queries (sized like the read engine's pool)."""
+    global _reader
+    if _reader is None:
+        with _executor_lock:
+            if _reader is None:
+                try:
+                    workers = get_settings().db_read_pool_size
+                except Exception:
+                    workers = 4
+                _reader = DatabaseExecutor("db-reader", max_workers=workers)
+    return _reader
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await a control-table write (or read-your-writes call) on the control writer thread."""
+    return await get_db_executor(CONTROL).run(func, *args, **kwargs)
+
+
+async def run_db_read(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await a read-only database call on a reader thread."""
+    return await get_db_read_executor().run(func, *args, **kwargs)
+
+
+def _log_failure(future: Future) -> None:
+    error = future.exception()
+    if error is not None:
+        print(f"[db] Background database write failed: {error!r}")
+
+
+def db_write(func: Callable[..., None]) -> Callable[..., None]:
+    """
+    Route a sync, best-effort control-table write through the control writer thread.
+
+    Called from an event loop, the write is queued and the call returns
+    None immediately (so the wrapped function must handle its own errors
+    and its return value is discarded). Called from any other thread, it
+    waits for the write to finish. Called inside a unit_of_work(), it runs
+    inline and joins the unit.
+    """
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> None:
+        executor = get_db_executor()
+        if executor.on_executor_thread() or ambient_session() is not None:
+            func(*args, **kwargs)
+        elif in_event_loop():
+            executor.submit(func, *args, **kwargs).add_done_callback(_log_failure)
+        else:
+            executor.call(func, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,275 @@
+"""Compact event payload encoding (msgpack + zstd with a trained dictionary).
+
+Rows carry a format marker (Event.payload_format), so JSON text rows and
+compact rows can live side by side. Readers should go through
+event_payload_text() / event_payload() rather than Event.payload_json.
+
+msgpack and zstandard are optional dependencies; without them every row is
+written as JSON text and compact rows cannot be decoded.
+"""
+import json
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+from app.storage.db import get_db_sync
+from app.storage.models import Event, PayloadDictionary
+from app.storage.search import index_compact_events
+
+
+FORMAT_JSON = 0
+FORMAT_COMPACT = 1
+
+COMPRESSION_LEVEL = 3
+
+_dictionaries: Dict[int, Any] = {}
+_current_dict_id: Optional[int] = None
+_dictionaries_loaded = False
+# Unknown dictionary ids already reloaded for (each costs one reload at most)
+_reloaded_for: Set[int] = set()
+_dict_lock = threading.Lock()
+_local = threading.local()
+
+
+def compact_available() -> bool:
+    """Check whether the optional msgpack/zstandard dependencies are installed."""
+    try:
+        import msgpack  # noqa: F401
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _load_dictionaries(reload: bool = False) -> None:
+    """
+    Load trained dictionaries from the database (once per process, unless reload).
+
+    A reload picks up dictionaries another process trained since, and makes
+    the newest one current for encoding.
+    """
+    global _current_dict_id, _dictionaries_loaded
+    if _dictionaries_loaded and not reload:
+        return
+    import zstandard
+
+    with _dict_lock:
+        if _dictionaries_loaded and not reload:
+            return
+        db = get_db_sync()
+        try:
+            for entry in db.query(PayloadDictionary).order_by(PayloadDictionary.created_at).all():
+                if entry.id not in _dictionaries:
+                    _dictionaries[entry.id] = zstandard.ZstdCompressionDict(entry.data)
+                _current_dict_id = entry.id
+        except Exception:
+            # Table missing (init_db not run yet) - encode without a dictionary
+            pass
+        finally:
+            db.close()
+        _dictionaries_loaded = True
+
+
+def _compressor():
+    """Per-thread compressor bound to the current dictionary (zstd objects aren't thread-safe)."""
+    import zstandard
+
+    _load_dictionaries()
+    cached = getattr(_local, "compressor", None)
+    if cached is None or cached[0] != _current_dict_id:
+        dict_data = _dictionaries.get(_current_dict_id) if _current_dict_id else None
+        cached = (_current_dict_id, zstandard.ZstdCompressor(level=COMPRESSION_LEVEL, dict_data=dict_data))
+        _local.compressor = cached
+    return cached[1]
+
+
+def _decompressor(dict_id: int):
+    """Per-thread decompressor for a given dictionary id (0 = none)."""
+    import zstandard
+
+    decompressors = getattr(_local, "decompressors", None)
+    if decompressors is None:
+        decompressors = _local.decompressors = {}
+    if dict_id not in decompressors:
+        dict_data = None
+        if dict_id:
+            _load_dictionaries()
+            dict_data = _dictionaries.get(dict_id)
+            if dict_data is None and dict_id not in _reloaded_for:
+                # Trained (by python -m app.storage.codec train) after this process loaded them
+                _reloaded_for.add(dict_id)
+                _load_dictionaries(reload=True)
+                dict_data = _dictionaries.get(dict_id)
+            if dict_data is None:
+                raise ValueError(f"Unknown payload dictionary id: {dict_id}")
+        decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dict_data)
+    return decompressors[dict_id]
+
+
+def encode_payload(payload_text: str) -> bytes:
+    """Encode a JSON payload string as msgpack + zstd."""
+    import msgpack
+
+    packed = msgpack.packb(json.loads(payload_text), use_bin_type=True)
+    return _compressor().compress(packed)
+
+
+def decode_payload(blob: bytes) -> Any:
+    """Decode a msgpack + zstd payload back to Python objects."""
+    import msgpack
+    import zstandard
+
+    dict_id = zstandard.get_frame_parameters(blob).dict_id
+    packed = _decompressor(dict_id).decompress(blob)
+    return msgpack.unpackb(packed, raw=False, strict_map_key=False)
+
+
+def encode_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a prepared event row (payload_json text) to compact storage in place.
+
+    A payload msgpack can't represent (e.g. an integer of 2**64 or more)
+    stays JSON text, so one odd row doesn't fail the batch it's written in.
+    """
+    try:
+        blob = encode_payload(row["payload_json"])
+    except (OverflowError, TypeError, ValueError):
+        row["payload_blob"] = None
+        row["payload_format"] = FORMAT_JSON
+        return row
+    row["payload_blob"] = blob
+    row["payload_format"] = FORMAT_COMPACT
+    row["payload_json"] = ""
+    return row
+
+
+def event_payload_text(event: Event) -> str:
+    """Get an event's payload as JSON text regardless of storage format."""
+    if getattr(event, "payload_format", FORMAT_JSON) == FORMAT_COMPACT and event.payload_blob is not None:
+        return json.dumps(decode_payload(event.payload_blob))
+    return event.payload_json
+
+
+def event_payload(event: Event) -> Any:
+    """Get an event's payload as Python objects regardless of storage format."""
+    if getattr(event, "payload_format", FORMAT_JSON) == FORMAT_COMPACT and event.payload_blob is not None:
+        return decode_payload(event.payload_blob)
+    return json.loads(event.payload_json) if event.payload_json else {}
+
+
+def train_dictionary(sample_limit: int = 5000, dict_size: int = 64 * 1024) -> Optional[int]:
+    """
+    Train a zstd dictionary from recent JSON-text event payloads and store it.
+
+    New compact rows use the newest dictionary; older rows keep decoding with
+    the dictionary id embedded in their zstd frame.
+
+    Returns:
+        The new dictionary id, or None if there were too few samples
+    """
+    global _current_dict_id
+    import msgpack
+    import zstandard
+
+    db = get_db_sync()
+    try:
+        rows = (
+            db.query(Event.payload_json)
+            .filter(Event.payload_format == FORMAT_JSON)
+            .order_by(Event.id.desc())
+            .limit(sample_limit)
+            .all()
+        )
+        samples = []
+        for (payload_json,) in rows:
+            try:
+                samples.append(msgpack.packb(json.loads(payload_json), use_bin_type=True))
+            except (ValueError, TypeError):
+                continue
+        if len(samples) < 100:
+            return None
+
+        trained = zstandard.train_dictionary(dict_size, samples)
+        dict_id = trained.dict_id()
+        if db.get(PayloadDictionary, dict_id) is None:
+            db.add(PayloadDictionary(id=dict_id, sample_count=len(samples), data=trained.as_bytes()))
+            db.commit()
+    finally:
+        db.close()
+
+    with _dict_lock:
+        _dictionaries[dict_id] = trained
+        _current_dict_id = dict_id
+    return dict_id
+
+
+def convert_events(batch_size: int = 1000, limit: Optional[int] = None) -> int:
+    """
+    Rewrite existing JSON-text events in compact form, batch by batch.
+
+    Full-text index entries are removed with the original text before each
+    row changes format, so the FTS index stays consistent.
+
+    Returns:
+        Number of rows converted
+    """
+    converted = 0
+    last_id = 0
+    db = get_db_sync()
+    try:
+        while limit is None or converted < limit:
+            size = batch_size if limit is None else min(batch_size, limit - converted)
+            events = (
+                db.query(Event)
+                .filter(Event.payload_format == FORMAT_JSON, Event.id > last_id)
+                .order_by(Event.id)
+                .limit(size)
+                .all()
+            )
+            if not events:
+                break
+            last_id = events[-1].id
+            indexed = []
+            for event in events:
+                try:
+                    blob = encode_payload(event.payload_json)
+                except (OverflowError, TypeError, ValueError):
+                    # Not valid JSON, or not representable in msgpack - leave the row as text
+                    continue
+                indexed.append((event.id, event.payload_json))
+                event.payload_blob = blob
+                event.payload_format = FORMAT_COMPACT
+                event.payload_json = ""
+            db.flush()
+            index_compact_events(db, indexed)
+            db.commit()
+            db.expunge_all()
+            converted += len(indexed)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return converted
+
+
+def main(argv: List[str]) -> int:
+    """CLI: python -m app.storage.codec [train | convert [limit]]"""
+    if not compact_available():
+        print("msgpack and zstandard are required: pip install msgpack zstandard")
+        return 1
+    command = argv[0] if argv else ""
+    if command == "train":
+        dict_id = train_dictionary()
+        print(f"Trained dictionary {dict_id}" if dict_id else "Not enough JSON events to train a dictionary")
+        return 0
+    if command == "convert":
+        limit = int(argv[1]) if len(argv) > 1 else None
+        print(f"Converted {convert_events(limit=limit)} events")
+        return 0
+    print("Usage: python -m app.storage.codec [train | convert [limit]]")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
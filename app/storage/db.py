@@ -1,50 +1,135 @@
 """Database initialization and session management."""
-from sqlalchemy import text
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 
+from app.config.settings import Settings, get_settings
+from app.storage.migrations import migrate, relocate_tables
 from app.storage.models import Base
+from app.storage.routing import DB_FILE, database_files, table_file
+from app.storage.stats import ensure_counters
 
 
-# SQLite database file
-DB_FILE = "local.db"
-ENGINE = create_engine(f"sqlite:///{DB_FILE}", echo=False)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=ENGINE)
+def _choice(value: str, allowed: tuple, default: str) -> str:
+    """Validate a pragma keyword (pragmas can't take bound parameters)."""
+    value = (value or "").lower()
+    if value not in allowed:
+        print(f"[db] Ignoring invalid pragma value '{value}', using '{default}'")
+        return default
+    return value
 
 
-def init_db() -> None:
-    """Initialize database tables. May raise exceptions on failure."""
-    try:
-        Base.metadata.create_all(bind=ENGINE)
-        _migrate_scheduler_tasks()
-    except Exception:
-        # Re-raise to allow caller to handle
-        raise
+def sqlite_pragmas(settings: Settings) -> List[str]:
+    """PRAGMA statements applied to every new connection, from the engine profile settings."""
+    journal_mode = _choice(settings.db_journal_mode, ("wal", "delete", "truncate", "persist", "memory", "off"), "wal")
+    synchronous = _choice(settings.db_synchronous, ("off", "normal", "full", "extra"), "normal")
+    temp_store = _choice(settings.db_temp_store, ("default", "file", "memory"), "memory")
+    auto_vacuum = _choice(settings.db_auto_vacuum, ("none", "full", "incremental"), "incremental")
+    return [
+        # Only takes effect on a new (empty) database, so it goes first
+        f"PRAGMA auto_vacuum={auto_vacuum}",
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA busy_timeout={int(settings.db_busy_timeout_ms)}",
+        f"PRAGMA mmap_size={int(settings.db_mmap_size)}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size={-abs(int(settings.db_cache_size_kib))}",
+        f"PRAGMA temp_store={temp_store}",
+    ]
 
 
-def _migrate_scheduler_tasks() -> None:
+def create_db_engine(db_file: str = DB_FILE) -> Engine:
     """
-    Lightweight SQLite migration for added scheduler_tasks columns.
-    SQLite can't ALTER COLUMN easily, but it can ADD COLUMN.
+    Create the read-write engine with the tuned connection profile.
+    
+    WAL lets readers (including the UI process) proceed while a writer
+    commits, and busy_timeout makes writers wait for the lock instead of
+    failing with "database is locked". Connections are shared across the
+    main loop, scheduler and client threads through a QueuePool.
     """
-    with ENGINE.begin() as conn:
-        # If table doesn't exist yet, nothing to migrate (create_all will create it with full schema)
-        tables = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='scheduler_tasks'")).fetchall()
-        if not tables:
-            return
+    settings = get_settings()
+    pragmas = sqlite_pragmas(settings)
+    engine = create_engine(
+        f"sqlite:///{db_file}",
+        echo=False,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": settings.db_busy_timeout_ms / 1000,
+        },
+    )
+    
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+    
+    return engine
+
+
+# Read-write engines, keyed by database file
+_engines: Dict[str, Engine] = {}
+_engine_lock = threading.Lock()
+
+
+def get_engine(db_file: str = DB_FILE) -> Engine:
+    """The read-write engine for one database file (created on first use)."""
+    engine = _engines.get(db_file)
+    if engine is None:
+        with _engine_lock:
+            engine = _engines.get(db_file)
+            if engine is None:
+                engine = _engines[db_file] = create_db_engine(db_file)
+    return engine
+
 
-        existing_cols = conn.execute(text("PRAGMA table_info(scheduler_tasks)")).fetchall()
-        col_names = {row[1] for row in existing_cols}  # row[1] = name
+def engine_for_table(table_name: str) -> Engine:
+    """The read-write engine of the database file a table is routed to."""
+    return get_engine(table_file(table_name))
 
-        # New cron-related columns
-        if "cron_expression" not in col_names:
-            conn.execute(text("ALTER TABLE scheduler_tasks ADD COLUMN cron_expression TEXT"))
-        if "timezone_name" not in col_names:
-            conn.execute(text("ALTER TABLE scheduler_tasks ADD COLUMN timezone_name VARCHAR(100)"))
-        if "last_run_at" not in col_names:
-            conn.execute(text("ALTER TABLE scheduler_tasks ADD COLUMN last_run_at DATETIME"))
-        if "next_run_at" not in col_names:
-            conn.execute(text("ALTER TABLE scheduler_tasks ADD COLUMN next_run_at DATETIME"))
+
+ENGINE = get_engine(DB_FILE)
+# Each table's statements go to its own file's engine (see app.storage.routing);
+# statements without a mapped table (e.g. text()) use the main engine
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=ENGINE,
+    binds={table: engine_for_table(table.name) for table in Base.metadata.sorted_tables},
+)
+
+
+def init_db() -> None:
+    """
+    Create or upgrade every database file's schema. May raise exceptions on failure.
+    
+    A current database is detected with one PRAGMA user_version read per
+    file; see app.storage.migrations for the versioned steps. Tables still
+    in the main file after routing changed are moved to their new file.
+    """
+    for db_file in database_files():
+        migrate(get_engine(db_file), db_file)
+    relocate_tables(DB_FILE)
+    db = SessionLocal()
+    try:
+        ensure_counters(db)
+    finally:
+        db.close()
 
 
 def get_db() -> Session:
@@ -57,6 +142,285 @@ def get_db() -> Session:
 
 
 def get_db_sync() -> Session:
-    """Get a database session (synchronous, callers must close)."""
-    return SessionLocal()
+    """
+    Get a database session (synchronous, callers must close).
+
+    Inside a unit_of_work() on this thread, this is the unit's session
+    instead of a new one (see JoinedSession).
+    """
+    return ambient_session() or SessionLocal()
+
+
+class _UnitOfWork:
+    def __init__(self, session: Session):
+        self.session = session
+        self.thread_id = threading.get_ident()
+        self.rollback_only = False
+
+
+# Per task/thread; asyncio.to_thread copies it, so the unit also records its thread
+_current_unit: ContextVar[Optional[_UnitOfWork]] = ContextVar("db_unit_of_work", default=None)
+
+
+class JoinedSession:
+    """
+    A unit of work's session as handed to nested storage calls.
+
+    Nested code keeps its usual open/commit/close pattern: commit() only
+    flushes (the unit commits once, at its end), close() leaves the session
+    open, and rollback() rolls back and marks the whole unit failed.
+    """
+
+    def __init__(self, unit: _UnitOfWork):
+        self._unit = unit
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._unit.session, name)
+
+    def commit(self) -> None:
+        self._unit.session.flush()
+
+    def rollback(self) -> None:
+        self._unit.rollback_only = True
+        self._unit.session.rollback()
+
+    def close(self) -> None:
+        pass
+
 
+def _active_unit() -> Optional[_UnitOfWork]:
+    unit = _current_unit.get()
+    if unit is None or unit.rollback_only or unit.thread_id != threading.get_ident():
+        return None
+    return unit
+
+
+def ambient_session() -> Optional[Session]:
+    """The active unit of work's session for nested callers, or None outside a unit."""
+    unit = _active_unit()
+    return JoinedSession(unit) if unit is not None else None
+
+
+@contextmanager
+def unit_of_work(db: Session | None = None) -> Iterator[Session]:
+    """
+    Run a block of storage calls in one session with a single commit.
+
+    get_db_sync(), log_event(), the consent functions and @db_write
+    functions called inside the block on this thread join its session
+    instead of opening (and committing) their own. A unit opened inside
+    another joins the outer one in a savepoint, so a nested block that
+    raises only undoes its own writes. The unit commits when the block
+    exits and rolls back if it raises; if a nested call rolled back the
+    session itself, the unit is discarded and exiting raises RuntimeError,
+    and later calls in the block fall back to their own sessions.
+
+    The session belongs to the opening thread; don't hold a unit across an
+    await.
+
+    Args:
+        db: Use this session (committed but not closed) instead of a new one
+    """
+    if db is None:
+        unit = _active_unit()
+        if unit is not None:
+            # A unit inside another runs in a savepoint: if its block raises,
+            # only its own writes are undone and the outer unit carries on
+            savepoint = unit.session.begin_nested()
+            try:
+                yield JoinedSession(unit)
+            except Exception:
+                if savepoint.is_active:
+                    savepoint.rollback()
+                raise
+            if savepoint.is_active:
+                savepoint.commit()
+            return
+
+    session = db if db is not None else SessionLocal()
+    unit = _UnitOfWork(session)
+    token = _current_unit.set(unit)
+    try:
+        yield session
+        if unit.rollback_only:
+            raise RuntimeError("Unit of work rolled back by a nested call")
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        _current_unit.reset(token)
+        if db is None:
+            session.close()
+
+
+# Read-only engines for dashboards and analytics, keyed by database file, and
+# routed session factories keyed by snapshot path (None for the live files)
+_read_engines: Dict[str, Engine] = {}
+_read_sessionmakers: Dict[Optional[str], sessionmaker] = {}
+_read_lock = threading.RLock()
+_snapshot_mtime: Optional[float] = None
+
+
+def create_read_engine(db_file: str = DB_FILE) -> Engine:
+    """
+    Create a read-only engine (mode=ro plus query_only) with its own pool.
+    
+    Statements running longer than DB_READ_STATEMENT_TIMEOUT_MS are
+    interrupted through SQLite's progress handler, so a heavy dashboard
+    query can't hold a read snapshot (and WAL growth) indefinitely.
+    """
+    settings = get_settings()
+    timeout = settings.db_read_statement_timeout_ms / 1000
+    engine = create_engine(
+        f"sqlite:///file:{db_file}?mode=ro&uri=true",
+        echo=False,
+        pool_size=settings.db_read_pool_size,
+        max_overflow=settings.db_read_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": settings.db_busy_timeout_ms / 1000,
+        },
+    )
+    
+    @event.listens_for(engine, "connect")
+    def _apply_read_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA query_only=ON")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.db_busy_timeout_ms)}")
+            cursor.execute(f"PRAGMA mmap_size={int(settings.db_mmap_size)}")
+            cursor.execute(f"PRAGMA cache_size={-abs(int(settings.db_cache_size_kib))}")
+        finally:
+            cursor.close()
+        
+        if timeout > 0:
+            state = connection_record.info
+            state["deadline"] = None
+            
+            def _check_deadline() -> int:
+                deadline = state["deadline"]
+                # Non-zero aborts the running statement ("interrupted")
+                return 1 if deadline is not None and time.monotonic() > deadline else 0
+            
+            dbapi_connection.set_progress_handler(_check_deadline, 10000)
+    
+    if timeout > 0:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _start_deadline(conn, cursor, statement, parameters, context, executemany):
+            # Rows are fetched after execute returns, so the deadline stays
+            # armed until the next statement or until the connection is returned
+            conn.info["deadline"] = time.monotonic() + timeout
+        
+        @event.listens_for(engine, "checkin")
+        def _clear_deadline(dbapi_connection, connection_record):
+            connection_record.info["deadline"] = None
+    
+    return engine
+
+
+def _read_engine(db_file: str) -> Engine:
+    engine = _read_engines.get(db_file)
+    if engine is None:
+        with _read_lock:
+            engine = _read_engines.get(db_file)
+            if engine is None:
+                engine = _read_engines[db_file] = create_read_engine(db_file)
+    return engine
+
+
+def _read_sessionmaker(snapshot: Optional[str]) -> sessionmaker:
+    """Read-only sessions routed like SessionLocal, to the live files or to a snapshot set."""
+    factory = _read_sessionmakers.get(snapshot)
+    if factory is None:
+        def resolve(db_file: str) -> Engine:
+            return _read_engine(snapshot_file(snapshot, db_file) if snapshot else db_file)
+        
+        with _read_lock:
+            factory = _read_sessionmakers.get(snapshot)
+            if factory is None:
+                factory = sessionmaker(
+                    autocommit=False,
+                    autoflush=False,
+                    bind=resolve(DB_FILE),
+                    binds={table: resolve(table_file(table.name)) for table in Base.metadata.sorted_tables},
+                )
+                _read_sessionmakers[snapshot] = factory
+    return factory
+
+
+def snapshot_file(snapshot_path: str, db_file: str) -> str:
+    """Snapshot copy of one database file: the main file's at snapshot_path, others beside it."""
+    if db_file == DB_FILE:
+        return snapshot_path
+    root, ext = os.path.splitext(snapshot_path)
+    return f"{root}.{os.path.splitext(os.path.basename(db_file))[0]}{ext}"
+
+
+def _current_snapshot() -> Optional[str]:
+    """Path of the read snapshot if one is configured and present, disposing stale pools."""
+    global _snapshot_mtime
+    path = get_settings().db_read_snapshot_path
+    if not path:
+        return None
+    try:
+        # The main file's snapshot is replaced last, so its mtime marks a new set
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    if _snapshot_mtime is not None and mtime != _snapshot_mtime:
+        # The snapshot was replaced; pooled connections still see the old files
+        for db_file in database_files():
+            engine = _read_engines.get(snapshot_file(path, db_file))
+            if engine is not None:
+                engine.dispose()
+    _snapshot_mtime = mtime
+    return path
+
+
+def get_read_db(allow_snapshot: bool = True) -> Session:
+    """
+    Get a read-only session (callers must close).
+    
+    Uses separate engines and pools from the writers, so dashboard and
+    analytics reads never queue behind event logging or scheduler
+    persistence. Like SessionLocal, each table is read from the file it
+    is routed to, so one session can serve queries across all of them.
+    With DB_READ_SNAPSHOT_PATH set, reads go to the periodic snapshot copies
+    unless allow_snapshot is False (for callers that need the latest rows).
+    """
+    snapshot = _current_snapshot() if allow_snapshot else None
+    return _read_sessionmaker(snapshot)()
+
+
+def refresh_read_snapshot() -> Optional[str]:
+    """
+    Copy every database file to its snapshot with SQLite's online backup.
+    
+    Each copy is written to a temp file and renamed into place, so readers
+    never see a partial snapshot.
+    
+    Returns:
+        The main snapshot path, or None if no snapshot is configured
+    """
+    path = get_settings().db_read_snapshot_path
+    if not path:
+        return None
+    # Main file last: its mtime is what readers watch for
+    for db_file in reversed(database_files()):
+        target_path = snapshot_file(path, db_file)
+        tmp_path = f"{target_path}.tmp"
+        source = sqlite3.connect(db_file)
+        try:
+            target = sqlite3.connect(tmp_path)
+            try:
+                source.backup(target)
+                # A standalone copy: no -wal/-shm files to carry around
+                target.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                target.close()
+        finally:
+            source.close()
+        os.replace(tmp_path, target_path)
+    return path
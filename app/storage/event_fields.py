@@ -0,0 +1,98 @@
+"""Maintenance for promoted event fields: backfill and task lifecycle lookup."""
+import json
+import sys
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.event_schema import PROMOTED_FIELDS, extract_promoted_fields
+from app.storage.codec import event_payload
+from app.storage.db import get_db_sync
+from app.storage.models import Event
+from app.storage.queries import task_lifecycle
+
+
+def backfill_promoted_fields(
+    batch_size: int = 1000, limit: Optional[int] = None, db: Optional[Session] = None
+) -> int:
+    """
+    Fill promoted field columns for events written before they existed.
+
+    Walks the table by id in batches, one transaction per batch, so it can
+    run against a live database and be interrupted safely. Migration 3 runs
+    it with a session joined to its own transaction, where the per-batch
+    commits only flush.
+
+    Returns:
+        Number of events updated
+    """
+    updated = 0
+    scanned = 0
+    last_id = 0
+    close_db = db is None
+    if db is None:
+        db = get_db_sync()
+    try:
+        while limit is None or scanned < limit:
+            size = batch_size if limit is None else min(batch_size, limit - scanned)
+            events = (
+                db.query(Event)
+                .filter(Event.id > last_id)
+                .order_by(Event.id)
+                .limit(size)
+                .all()
+            )
+            if not events:
+                break
+            last_id = events[-1].id
+            scanned += len(events)
+            for event in events:
+                if any(getattr(event, column) is not None for column in PROMOTED_FIELDS):
+                    continue
+                try:
+                    payload = event_payload(event)
+                except (ValueError, TypeError):
+                    continue
+                fields = extract_promoted_fields(event.source, event.type, payload)
+                if any(value is not None for value in fields.values()):
+                    for column, value in fields.items():
+                        setattr(event, column, value)
+                    updated += 1
+            db.commit()
+            db.expunge_all()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if close_db:
+            db.close()
+    return updated
+
+
+def main(argv: List[str]) -> int:
+    """CLI: python -m app.storage.event_fields [backfill [limit] | task <task_id>]"""
+    command = argv[0] if argv else ""
+    if command == "backfill":
+        limit = int(argv[1]) if len(argv) > 1 else None
+        print(f"Updated {backfill_promoted_fields(limit=limit)} events")
+        return 0
+    if command == "task" and len(argv) > 1:
+        db = get_db_sync()
+        try:
+            events = task_lifecycle(db, argv[1])
+            print(f"{len(events)} event(s) for task {argv[1]}:")
+            for event in events:
+                try:
+                    payload = event_payload(event)
+                except (ValueError, TypeError):
+                    payload = event.payload_json
+                print(f"  {event.ts}  [{event.source}] {event.type}  {json.dumps(payload, default=str)[:200]}")
+        finally:
+            db.close()
+        return 0
+    print("Usage: python -m app.storage.event_fields [backfill [limit] | task <task_id>]")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
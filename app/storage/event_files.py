@@ -0,0 +1,149 @@
+"""Bulk loading of JSON-lines event files (from the file sink) into the events table."""
+import gzip
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+from app.config.settings import get_settings
+from app.core.event_schema import extract_promoted_fields
+from app.core.logger import JSONL_ACTIVE_FILE, JSONL_ROTATED_PREFIX, insert_event_rows
+from app.storage.db import get_db_sync
+
+
+# Names of files already loaded, one per line, kept in the sink directory
+IMPORTED_MANIFEST = "imported.txt"
+
+
+def _file_key(filename: str) -> str:
+    """Identity of a rotated file, the same before and after compression."""
+    return filename[:-3] if filename.endswith(".gz") else filename
+
+
+def list_rotated_files(directory: str) -> List[str]:
+    """
+    List rotated event files, oldest first.
+    
+    The active file and files still being compressed are skipped. If both
+    the plain and compressed copy exist, only the compressed one is listed.
+    """
+    if not os.path.isdir(directory):
+        return []
+    files: Dict[str, str] = {}
+    for filename in os.listdir(directory):
+        if not filename.startswith(JSONL_ROTATED_PREFIX):
+            continue
+        if not (filename.endswith(".jsonl") or filename.endswith(".jsonl.gz")):
+            continue
+        key = _file_key(filename)
+        if key not in files or filename.endswith(".gz"):
+            files[key] = filename
+    return [os.path.join(directory, files[key]) for key in sorted(files)]
+
+
+def iter_event_file(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield insertable event rows (with promoted fields) from a plain or gzipped JSONL file."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line from a crash mid-append
+                continue
+            row = {
+                "ts": datetime.fromisoformat(record["ts"]),
+                "source": record["source"],
+                "type": record["type"],
+                "payload_json": record["payload_json"],
+            }
+            try:
+                payload = json.loads(record["payload_json"])
+            except (TypeError, ValueError):
+                payload = None
+            row.update(extract_promoted_fields(row["source"], row["type"], payload))
+            yield row
+
+
+def _read_manifest(directory: str) -> set:
+    path = os.path.join(directory, IMPORTED_MANIFEST)
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def load_event_files(
+    directory: str,
+    batch_size: int = 5000,
+    include_active: bool = False,
+) -> Dict[str, Any]:
+    """
+    Import rotated event files into the events table in bulk.
+    
+    Each file is loaded in one transaction and then recorded in the
+    directory's manifest, so running the loader again skips it.
+    
+    Args:
+        directory: File sink directory
+        batch_size: Rows per insert statement
+        include_active: Also load the active file (not recorded in the
+            manifest, since it may still grow)
+    
+    Returns:
+        Dictionary with 'loaded' row count and 'files' imported
+    """
+    imported = _read_manifest(directory)
+    paths = [path for path in list_rotated_files(directory) if _file_key(os.path.basename(path)) not in imported]
+    active_path = os.path.join(directory, JSONL_ACTIVE_FILE)
+    if include_active and os.path.exists(active_path):
+        paths.append(active_path)
+    
+    loaded = 0
+    files = []
+    for path in paths:
+        db = get_db_sync()
+        try:
+            batch: List[Dict[str, Any]] = []
+            count = 0
+            for row in iter_event_file(path):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    insert_event_rows(db, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                insert_event_rows(db, batch)
+                count += len(batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        
+        loaded += count
+        files.append(os.path.basename(path))
+        if path != active_path:
+            with open(os.path.join(directory, IMPORTED_MANIFEST), "a", encoding="utf-8") as f:
+                f.write(_file_key(os.path.basename(path)) + "\n")
+    
+    return {"loaded": loaded, "files": files}
+
+
+def main(argv: List[str]) -> int:
+    """CLI: python -m app.storage.event_files load [directory]"""
+    if not argv or argv[0] != "load":
+        print("Usage: python -m app.storage.event_files load [directory]")
+        return 1
+    directory = argv[1] if len(argv) > 1 else get_settings().event_file_sink_dir
+    result = load_event_files(directory)
+    print(f"Loaded {result['loaded']} events from {len(result['files'])} file(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
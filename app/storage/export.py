@@ -0,0 +1,336 @@
+"""Incremental, streaming export of events and control tables to Parquet.
+
+Tables are read in id order, one chunk at a time (keyset on the primary
+key), and each chunk is written out before the next is read, so memory use
+depends on the chunk size, not the table size. Output is Hive-partitioned:
+
+    <export_dir>/events/date=2026-01-31/source=discord/type=command_received/part-00000101-00005100.parquet
+    <export_dir>/scheduler_tasks/date=2026-01-31/part-....parquet
+    <export_dir>/consent_ledger/date=2026-01-31/part-....parquet
+
+Event payloads are flattened into "payload.<key>" columns (nested dicts use
+dotted keys). Each file holds a single event type, so its columns are that
+type's payload fields. The raw payload_json is kept alongside.
+
+The last exported id per table is kept in <export_dir>/_export_state.json
+and the next run resumes after it. Archived events are merged into the
+events stream by id, so that id is always a point below which everything
+was exported. Part files are named by id range, so a
+run that was interrupted mid-chunk rewrites the same files when resumed.
+Rows of scheduler_tasks that change after they were exported are only
+picked up by a full re-export.
+
+pyarrow is an optional dependency (pip install .[export]).
+"""
+import heapq
+import json
+import os
+import shutil
+import sys
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from app.config.settings import get_settings
+from app.core.event_schema import extract_promoted_fields
+from app.storage.archive import archived_event_ids, load_segment_events
+from app.storage.codec import event_payload
+from app.storage.db import get_read_db
+from app.storage.models import ConsentLedger, Event, SchedulerTask
+
+
+STATE_FILE = "_export_state.json"
+PAYLOAD_PREFIX = "payload."
+MAX_FLATTEN_DEPTH = 3
+
+EXPORT_TABLES = ("events", "scheduler_tasks", "consent_ledger")
+
+
+def export_available() -> bool:
+    """Check whether the optional pyarrow dependency is installed."""
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def load_export_state(export_dir: str) -> Dict[str, int]:
+    """Last exported id per table (missing tables start from 0)."""
+    try:
+        with open(os.path.join(export_dir, STATE_FILE), encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {table: int(last_id) for table, last_id in state.items()}
+
+
+def _save_export_state(export_dir: str, state: Dict[str, int]) -> None:
+    path = os.path.join(export_dir, STATE_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def flatten_payload(payload: Any, prefix: str = PAYLOAD_PREFIX, depth: int = 0) -> Dict[str, Any]:
+    """
+    Flatten a payload into dotted column names.
+
+    Nested dicts become "payload.a.b" columns (up to MAX_FLATTEN_DEPTH);
+    lists and deeper values are stored as JSON text.
+    """
+    if not isinstance(payload, dict):
+        return {prefix.rstrip("."): payload if _is_scalar(payload) else json.dumps(payload, default=str)}
+    flat: Dict[str, Any] = {}
+    for key, value in payload.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and value and depth < MAX_FLATTEN_DEPTH:
+            flat.update(flatten_payload(value, f"{name}.", depth + 1))
+        elif _is_scalar(value):
+            flat[name] = value
+        else:
+            flat[name] = json.dumps(value, default=str)
+    return flat
+
+
+def _is_scalar(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool, datetime))
+
+
+def _columns(records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """
+    Column lists for a batch of records with possibly differing keys.
+
+    Missing values become nulls; ints mixed with floats become floats, and
+    any other mix of value types becomes text, so Arrow can type each column.
+    """
+    names: Dict[str, None] = {}
+    for record in records:
+        names.update(dict.fromkeys(record))
+    columns = {}
+    for name in names:
+        values = [record.get(name) for record in records]
+        types = {type(value) for value in values if value is not None}
+        if types == {int, float}:
+            values = [None if value is None else float(value) for value in values]
+        elif len(types) > 1:
+            values = [None if value is None else str(value) for value in values]
+        columns[name] = values
+    return columns
+
+
+def _write_part(directory: str, first_id: int, last_id: int, records: List[Dict[str, Any]]) -> str:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{first_id:08d}-{last_id:08d}.parquet")
+    tmp_path = f"{path}.tmp"
+    pq.write_table(pa.table(_columns(records)), tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+    return path
+
+
+def _partition(**values: Any) -> str:
+    # Hive-style key=value directories; values are URI-encoded, which is
+    # how pyarrow's hive partitioning decodes them
+    return os.path.join(*(f"{key}={quote(str(value), safe='')}" for key, value in values.items()))
+
+
+def _event_record(event: Event) -> Tuple[Tuple[str, ...], Dict[str, Any]]:
+    try:
+        payload = event_payload(event)
+    except (TypeError, ValueError):
+        payload = None
+    record = {"id": event.id, "ts": event.ts}
+    # Extracted rather than read from the columns: archived and not yet
+    # backfilled rows don't have them filled
+    record.update(extract_promoted_fields(event.source, event.type, payload))
+    # Compact rows keep no payload_json text
+    record["payload_json"] = event.payload_json or json.dumps(payload, default=str)
+    record.update(flatten_payload(payload))
+    day = event.ts.date() if event.ts else date.min
+    return (_partition(date=day, source=event.source, type=event.type),), record
+
+
+def _row_record(model: Any, ts_column: str) -> Callable[[Any], Tuple[Tuple[str, ...], Dict[str, Any]]]:
+    columns = [column.key for column in model.__table__.columns]
+
+    def to_record(row: Any) -> Tuple[Tuple[str, ...], Dict[str, Any]]:
+        record = {column: getattr(row, column) for column in columns}
+        ts = record.get(ts_column)
+        return (_partition(date=ts.date() if ts else date.min),), record
+
+    return to_record
+
+
+_TABLES = {
+    "events": (Event, _event_record),
+    "scheduler_tasks": (SchedulerTask, _row_record(SchedulerTask, "created_at")),
+    "consent_ledger": (ConsentLedger, _row_record(ConsentLedger, "ts")),
+}
+
+
+def _iter_chunks(model: Any, after_id: int, chunk_size: int) -> Iterator[List[Any]]:
+    """Rows with id > after_id in id order, one chunk per read session."""
+    last_id = after_id
+    while True:
+        db = get_read_db()
+        try:
+            rows = (
+                db.query(model)
+                .filter(model.id > last_id)
+                .order_by(model.id)
+                .limit(chunk_size)
+                .all()
+            )
+            # Detach so the chunk can be released once written
+            db.expunge_all()
+        finally:
+            db.close()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def _iter_archived(after_id: int) -> Iterator[Event]:
+    """
+    Archived events with id > after_id, in id order.
+
+    Segments are per day and events are logged out of id order, so the ids
+    are collected and sorted first; segments already exported entirely are
+    skipped.
+    """
+    loaded: Dict[date, Dict[int, Event]] = {}
+    for event_id, day in archived_event_ids(after_id=after_id):
+        if day not in loaded:
+            # Ids mostly follow days: keep only the segment being read
+            loaded = {day: load_segment_events(day)}
+        yield loaded[day][event_id]
+
+
+def _iter_event_chunks(after_id: int, chunk_size: int) -> Iterator[List[Event]]:
+    """
+    Live and archived events with id > after_id, merged in id order, in chunks.
+
+    Archiving goes by timestamp, and timestamps don't follow ids exactly, so
+    a live event can have a lower id than an archived one. Merging keeps the
+    saved state meaning "every lower id was exported".
+    """
+    live = (event for rows in _iter_chunks(Event, after_id, chunk_size) for event in rows)
+    chunk: List[Event] = []
+    last_id = after_id
+    for event in heapq.merge(_iter_archived(after_id), live, key=lambda event: event.id):
+        if event.id == last_id:
+            # Archived while this export was reading
+            continue
+        last_id = event.id
+        chunk.append(event)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _export_chunks(
+    export_dir: str,
+    table: str,
+    chunks: Iterable[List[Any]],
+    to_record: Callable[[Any], Tuple[Tuple[str, ...], Dict[str, Any]]],
+    state: Dict[str, int],
+    totals: Dict[str, int],
+) -> None:
+    for rows in chunks:
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            key, record = to_record(row)
+            groups.setdefault(key, []).append(record)
+        for key, records in groups.items():
+            _write_part(
+                os.path.join(export_dir, table, *key),
+                records[0]["id"], records[-1]["id"], records,
+            )
+            totals["files"] += 1
+        totals["rows"] += len(rows)
+        # Only advance once every file of the chunk is in place
+        state[table] = max(state.get(table, 0), rows[-1].id)
+        _save_export_state(export_dir, state)
+
+
+def export_tables(
+    export_dir: Optional[str] = None,
+    tables: Iterable[str] = EXPORT_TABLES,
+    chunk_size: Optional[int] = None,
+    include_archive: bool = True,
+    full: bool = False,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Export new rows of each table to partitioned Parquet files.
+
+    Args:
+        export_dir: Output directory (defaults to EXPORT_DIR)
+        tables: Tables to export (any of EXPORT_TABLES)
+        chunk_size: Rows read and written per step (defaults to EXPORT_CHUNK_SIZE)
+        include_archive: Also export archived events not exported yet
+        full: Delete the table's previous export and export every row again
+
+    Returns:
+        Per table: rows and files written, and the last exported id
+
+    Raises:
+        RuntimeError: If pyarrow is not installed
+        ValueError: If a table can't be exported
+    """
+    if not export_available():
+        raise RuntimeError("Parquet export requires pyarrow (pip install .[export])")
+    settings = get_settings()
+    export_dir = export_dir or settings.export_dir
+    chunk_size = max(1, chunk_size or settings.export_chunk_size)
+    for table in tables:
+        if table not in _TABLES:
+            raise ValueError(f"Cannot export '{table}': expected one of {', '.join(EXPORT_TABLES)}")
+
+    os.makedirs(export_dir, exist_ok=True)
+    state = load_export_state(export_dir)
+    if full:
+        for table in tables:
+            # Chunk boundaries differ between runs; don't leave overlapping parts behind
+            shutil.rmtree(os.path.join(export_dir, table), ignore_errors=True)
+            state.pop(table, None)
+    summary = {}
+    for table in tables:
+        model, to_record = _TABLES[table]
+        totals = {"rows": 0, "files": 0}
+        if table == "events" and include_archive:
+            chunks = _iter_event_chunks(state.get(table, 0), chunk_size)
+        else:
+            chunks = _iter_chunks(model, state.get(table, 0), chunk_size)
+        _export_chunks(export_dir, table, chunks, to_record, state, totals)
+        summary[table] = {**totals, "last_id": state.get(table, 0)}
+    return summary
+
+
+def main(argv: List[str]) -> int:
+    """CLI: python -m app.storage.export [run [dir] | full [dir] | status [dir]]"""
+    command = argv[0] if argv else "run"
+    export_dir = argv[1] if len(argv) > 1 else get_settings().export_dir
+    if command == "status":
+        state = load_export_state(export_dir)
+        for table in EXPORT_TABLES:
+            print(f"{table}: last exported id {state.get(table, 0)}")
+        return 0
+    if command in ("run", "full"):
+        result = export_tables(export_dir, full=command == "full")
+        for table, totals in result.items():
+            print(f"{table}: {totals['rows']} rows in {totals['files']} files (last id {totals['last_id']})")
+        return 0
+    print("Usage: python -m app.storage.export [run [dir] | full [dir] | status [dir]]")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
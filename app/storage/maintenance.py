@@ -0,0 +1,257 @@
+"""Scheduled SQLite maintenance: checkpoint, incremental vacuum, statistics, quick check.
+
+Runs as a scheduler cron task (DB_MAINTENANCE_CRON, a low-traffic time by
+default) under a time budget. Every step is a short statement or batch in
+its own transaction with a pause in between, so application writers get
+the database between steps instead of waiting for the whole run:
+
+1. WAL checkpoint (PASSIVE: copies what it can without blocking writers)
+2. incremental_vacuum, DB_MAINTENANCE_VACUUM_PAGES free pages per batch
+3. ANALYZE bounded by analysis_limit, then PRAGMA optimize
+4. quick_check on a separate read-only connection, interrupted when the
+   budget runs out (no FTS integrity-check, which reads every token)
+5. a final PASSIVE checkpoint of the pages the run itself wrote
+
+Each database file (see app.storage.routing) gets the steps in turn, under
+one shared budget. Sizes and page counts before and after, plus per-step
+timings per file, are logged as one 'db_maintenance' event.
+
+incremental_vacuum needs auto_vacuum=INCREMENTAL. New databases get it
+from DB_AUTO_VACUUM; existing ones need a one-time offline conversion
+(python -m app.storage.maintenance convert, a full VACUUM).
+"""
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy.engine import Connection
+
+from app.config.settings import get_settings
+from app.core.logger import log_event, log_error
+from app.storage.db import get_engine
+from app.storage.routing import database_files
+
+
+TASK_ID = "db_maintenance"
+HANDLER_TYPE = "db_maintenance"
+
+# Pause between steps so queued writers can take the lock
+YIELD_SECONDS = 0.05
+ANALYSIS_LIMIT = 1000
+
+_AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+
+def _pragma(conn: Connection, statement: str) -> List[Any]:
+    # PRAGMAs aren't wrapped in an implicit transaction by pysqlite, so each
+    # one commits on its own
+    result = conn.exec_driver_sql(statement)
+    return result.fetchall() if result.returns_rows else []
+
+
+def _db_file(conn: Connection) -> str:
+    return conn.engine.url.database
+
+
+def database_stats(conn: Connection) -> Dict[str, Any]:
+    """Page counts and on-disk sizes of the connection's database and its WAL."""
+    db_file = _db_file(conn)
+    page_size = _pragma(conn, "PRAGMA page_size")[0][0]
+    wal_file = f"{db_file}-wal"
+    return {
+        "file_bytes": os.path.getsize(db_file) if os.path.exists(db_file) else 0,
+        "wal_bytes": os.path.getsize(wal_file) if os.path.exists(wal_file) else 0,
+        "page_size": page_size,
+        "page_count": _pragma(conn, "PRAGMA page_count")[0][0],
+        "freelist_count": _pragma(conn, "PRAGMA freelist_count")[0][0],
+    }
+
+
+def _checkpoint(conn: Connection, deadline: float) -> Dict[str, Any]:
+    busy, log_frames, checkpointed = _pragma(conn, "PRAGMA wal_checkpoint(PASSIVE)")[0]
+    return {"busy": bool(busy), "log_frames": log_frames, "checkpointed": checkpointed}
+
+
+def _incremental_vacuum(conn: Connection, deadline: float) -> Dict[str, Any]:
+    mode = _AUTO_VACUUM_MODES.get(_pragma(conn, "PRAGMA auto_vacuum")[0][0], "unknown")
+    if mode != "incremental":
+        return {"skipped": f"auto_vacuum={mode}"}
+    pages = max(1, get_settings().db_maintenance_vacuum_pages)
+    # sqlite3's execute() steps a statement once, and incremental_vacuum
+    # frees one page per step; executescript() runs it to completion
+    dbapi_connection = conn.connection.driver_connection
+    initial = free = _pragma(conn, "PRAGMA freelist_count")[0][0]
+    while free and time.monotonic() < deadline:
+        dbapi_connection.executescript(f"PRAGMA incremental_vacuum({pages});")
+        free = _pragma(conn, "PRAGMA freelist_count")[0][0]
+        time.sleep(YIELD_SECONDS)
+    return {"pages_freed": initial - free, "pages_left": free}
+
+
+def _analyze(conn: Connection, deadline: float) -> Dict[str, Any]:
+    # analysis_limit samples each index instead of reading it in full
+    _pragma(conn, f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+    conn.exec_driver_sql("ANALYZE")
+    conn.commit()
+    _pragma(conn, "PRAGMA optimize")
+    return {"analysis_limit": ANALYSIS_LIMIT}
+
+
+def _quick_check(conn: Connection, deadline: float) -> Dict[str, Any]:
+    # Read-only connection: in WAL mode this never blocks writers
+    check = sqlite3.connect(f"file:{_db_file(conn)}?mode=ro", uri=True)
+    try:
+        check.set_progress_handler(lambda: 1 if time.monotonic() > deadline else 0, 10000)
+        try:
+            problems = [row[0] for row in check.execute("PRAGMA quick_check(10)")]
+        except sqlite3.OperationalError as e:
+            if "interrupt" in str(e):
+                return {"ok": None, "interrupted": True}
+            raise
+    finally:
+        check.close()
+    return {"ok": problems == ["ok"], "problems": [] if problems == ["ok"] else problems}
+
+
+STEPS: List[tuple] = [
+    ("checkpoint", _checkpoint),
+    ("incremental_vacuum", _incremental_vacuum),
+    ("analyze", _analyze),
+    ("quick_check", _quick_check),
+    ("final_checkpoint", _checkpoint),
+]
+
+
+def run_db_maintenance(budget_seconds: float | None = None) -> Dict[str, Any]:
+    """
+    Run the maintenance steps in order until done or out of time.
+
+    Each database file runs every step before the next file starts. Steps
+    not started before the budget runs out are reported as skipped; the
+    vacuum and quick check also stop partway when it expires.
+
+    Returns:
+        Dictionary with per-file 'files' results ('before'/'after' database
+        stats and per-step 'steps' with ms and result) and 'duration_ms'
+    """
+    if budget_seconds is None:
+        budget_seconds = get_settings().db_maintenance_budget_seconds
+    started = time.monotonic()
+    deadline = started + budget_seconds
+    files = {db_file: _maintain_file(db_file, deadline) for db_file in database_files()}
+
+    result = {
+        "files": files,
+        "budget_seconds": budget_seconds,
+        "duration_ms": round((time.monotonic() - started) * 1000, 1),
+    }
+    log_event(source="storage", event_type="db_maintenance", payload=result)
+    return result
+
+
+def _maintain_file(db_file: str, deadline: float) -> Dict[str, Any]:
+    steps: Dict[str, Any] = {}
+    with get_engine(db_file).connect() as conn:
+        before = database_stats(conn)
+        for name, step in STEPS:
+            if time.monotonic() >= deadline:
+                steps[name] = {"skipped": "budget"}
+                continue
+            step_started = time.monotonic()
+            try:
+                result = step(conn, deadline)
+            except Exception as e:
+                conn.rollback()
+                log_error("storage", e, {"action": "db_maintenance", "step": name, "file": db_file})
+                result = {"error": str(e)[:200]}
+            result["ms"] = round((time.monotonic() - step_started) * 1000, 1)
+            steps[name] = result
+            time.sleep(YIELD_SECONDS)
+        after = database_stats(conn)
+    return {"before": before, "after": after, "steps": steps}
+
+
+def _maintenance_handler(parameters: Dict[str, Any]) -> None:
+    """Cron handler (sync, so the scheduler runs it on a worker thread, off its loop)."""
+    run_db_maintenance(parameters.get("budget_seconds"))
+
+
+def register_maintenance_handler(scheduler: Any) -> None:
+    """Register the cron handler (before restore_pending_tasks, so a persisted run restores)."""
+    scheduler.register_restore_handler(HANDLER_TYPE, _maintenance_handler)
+
+
+def schedule_db_maintenance(scheduler: Any) -> bool:
+    """
+    Schedule (or reschedule with current settings) the maintenance cron task.
+
+    Returns:
+        False if DB_MAINTENANCE_CRON is empty (maintenance disabled)
+    """
+    settings = get_settings()
+    register_maintenance_handler(scheduler)
+    if not settings.db_maintenance_cron:
+        # Drop a run restored from an earlier configuration
+        scheduler.cancel_cron_task(TASK_ID)
+        return False
+    scheduler.schedule_cron(
+        task_id=TASK_ID,
+        cron_expression=settings.db_maintenance_cron,
+        timezone_name=settings.db_maintenance_timezone,
+        handler_type=HANDLER_TYPE,
+        parameters={"budget_seconds": settings.db_maintenance_budget_seconds},
+        name="Database maintenance",
+    )
+    return True
+
+
+def convert_to_incremental_vacuum() -> Dict[str, Any]:
+    """
+    Switch every existing database file to auto_vacuum=INCREMENTAL.
+
+    This is a full VACUUM: it rewrites each file and holds an exclusive lock
+    throughout, so run it while the app is stopped.
+
+    Returns:
+        Resulting mode and duration per file
+    """
+    return {db_file: _convert_file(db_file) for db_file in database_files()}
+
+
+def _convert_file(db_file: str) -> Dict[str, Any]:
+    conn = sqlite3.connect(db_file, isolation_level=None)
+    try:
+        conn.execute(f"PRAGMA busy_timeout={int(get_settings().db_busy_timeout_ms)}")
+        started = time.monotonic()
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    finally:
+        conn.close()
+    return {"auto_vacuum": _AUTO_VACUUM_MODES.get(mode, mode), "seconds": round(time.monotonic() - started, 1)}
+
+
+def main(argv: List[str]) -> int:
+    """CLI: python -m app.storage.maintenance [run [budget_seconds] | convert]"""
+    command = argv[0] if argv else "run"
+    if command == "run":
+        budget = float(argv[1]) if len(argv) > 1 else None
+        result = run_db_maintenance(budget)
+        for db_file, file_result in result["files"].items():
+            print(f"{db_file}:")
+            for name, step in file_result["steps"].items():
+                print(f"  {name}: {step}")
+            print(f"  before: {file_result['before']}")
+            print(f"  after:  {file_result['after']}")
+        return 0
+    if command == "convert":
+        print(convert_to_incremental_vacuum())
+        return 0
+    print("Usage: python -m app.storage.maintenance [run [budget_seconds] | convert]")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,332 @@
+"""Versioned schema migrations tracked in SQLite's PRAGMA user_version.
+
+Each migration has a version number and runs once, in order, in its own
+transaction together with the user_version bump (both are transactional in
+SQLite), so an interrupted upgrade resumes at the failed step. When the
+database is current, startup costs a single PRAGMA read.
+
+Schema changes go here as new steps at the end of MIGRATIONS, never as edits
+to released ones. Fresh databases run every step too, after the baseline has
+created tables from the current models, so steps that add columns or
+indexes must tolerate them already existing (add_missing_columns and
+create_index do).
+
+Databases created before versioning start at user_version 0; the baseline
+steps are the old per-startup checks and are safe to re-run on them.
+"""
+import json
+import sqlite3
+import sys
+from typing import Callable, Dict, List, NamedTuple, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.storage.models import Base
+from app.storage.routing import DB_FILE, TABLE_GROUPS, table_file, tables_in_file
+from app.storage.search import ensure_search_index
+from app.storage.stats import COUNTED_TABLES, ensure_counters, ensure_event_counters
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    # Called with the connection and the names of the tables routed to its file
+    apply: Callable[[Connection, Set[str]], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+StepFunc = Callable[[Connection, Set[str]], None]
+
+
+def migration(version: int, description: str) -> Callable[[StepFunc], StepFunc]:
+    """Register a migration step (versions must be added in increasing order)."""
+    def register(func: StepFunc) -> StepFunc:
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} is out of order")
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+    return register
+
+
+def schema_version() -> int:
+    """The version a fully migrated database has."""
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def get_user_version(conn: Connection) -> int:
+    return int(conn.exec_driver_sql("PRAGMA user_version").scalar() or 0)
+
+
+def add_missing_columns(conn: Connection, table_name: str, columns: Dict[str, str]) -> List[str]:
+    """
+    ALTER TABLE ... ADD COLUMN for each column (name -> SQL type/default) the table lacks.
+
+    Returns:
+        Names of the columns added
+    """
+    existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table_name})"))}
+    if not existing:
+        return []
+    added = []
+    for name, definition in columns.items():
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {definition}"))
+            added.append(name)
+    return added
+
+
+def create_index(conn: Connection, table_name: str, index_name: str) -> None:
+    """Create one of a model's declared indexes if it doesn't exist yet."""
+    for index in Base.metadata.tables[table_name].indexes:
+        if index.name == index_name:
+            index.create(bind=conn, checkfirst=True)
+            return
+    raise ValueError(f"No index '{index_name}' declared on {table_name}")
+
+
+def migrate(engine: Engine, db_file: str = DB_FILE) -> List[int]:
+    """
+    Bring one database file's schema up to schema_version().
+
+    Every file runs every step; steps only touch the tables routed to the
+    file (see app.storage.routing) and skip the others.
+
+    Returns:
+        Versions applied (empty when the schema was already current)
+    """
+    target = schema_version()
+    with engine.connect() as conn:
+        current = get_user_version(conn)
+    if current == target:
+        return []
+    if current > target:
+        print(f"[db] Database schema version {current} is newer than this code ({target}); skipping migrations")
+        return []
+
+    tables = set(tables_in_file(db_file, list(Base.metadata.tables)))
+    applied = []
+    for step in MIGRATIONS:
+        if step.version <= current:
+            continue
+        with engine.begin() as conn:
+            step.apply(conn, tables)
+            conn.exec_driver_sql(f"PRAGMA user_version = {int(step.version)}")
+        applied.append(step.version)
+    return applied
+
+
+@migration(1, "create tables")
+def _create_tables(conn: Connection, tables: Set[str]) -> None:
+    Base.metadata.create_all(bind=conn, tables=[Base.metadata.tables[name] for name in tables])
+
+
+@migration(2, "scheduler_tasks cron columns")
+def _scheduler_cron_columns(conn: Connection, tables: Set[str]) -> None:
+    add_missing_columns(conn, "scheduler_tasks", {
+        "cron_expression": "TEXT",
+        "timezone_name": "VARCHAR(100)",
+        "last_run_at": "DATETIME",
+        "next_run_at": "DATETIME",
+    })
+
+
+@migration(3, "events payload encoding and promoted field columns")
+def _event_columns(conn: Connection, tables: Set[str]) -> None:
+    added = add_missing_columns(conn, "events", {
+        "payload_format": "INTEGER NOT NULL DEFAULT 0",
+        "payload_blob": "BLOB",
+        "task_id": "VARCHAR(255)",
+        "tool_name": "VARCHAR(100)",
+        "handler_type": "VARCHAR(100)",
+        "status_code": "INTEGER",
+        "error_type": "VARCHAR(100)",
+    })
+    if "task_id" not in added:
+        return
+    # Existing rows get their promoted fields in the same transaction, so
+    # field filters never see a half-filled table
+    from app.storage.event_fields import backfill_promoted_fields
+
+    db = Session(bind=conn)
+    try:
+        backfill_promoted_fields(db=db)
+    finally:
+        db.close()
+
+
+@migration(4, "model indexes")
+def _model_indexes(conn: Connection, tables: Set[str]) -> None:
+    # Indexes declared on models whose tables predate them
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+@migration(5, "full-text search tables")
+def _search_index(conn: Connection, tables: Set[str]) -> None:
+    ensure_search_index(conn, tables)
+
+
+@migration(6, "seed row counters")
+def _seed_counters(conn: Connection, tables: Set[str]) -> None:
+    # Only a file holding every counted table can recount them (the single-file layout)
+    if not set(COUNTED_TABLES) | {"table_counters", "event_counters"} <= tables:
+        return
+    # The session joins the migration's transaction instead of committing it
+    db = Session(bind=conn)
+    try:
+        ensure_counters(db)
+    finally:
+        db.close()
+
+
+@migration(7, "scheduler_tasks due-time index")
+def _scheduler_due_index(conn: Connection, tables: Set[str]) -> None:
+    if "scheduler_tasks" in tables:
+        create_index(conn, "scheduler_tasks", "ix_scheduler_tasks_due")
+
+
+@migration(8, "seed event counters in a split events file")
+def _seed_split_event_counters(conn: Connection, tables: Set[str]) -> None:
+    # Events and their counters always share a file; the table counters span
+    # files, so init_db seeds those once every file is migrated
+    if "table_counters" in tables or not {"events", "event_counters"} <= tables:
+        return
+    db = Session(bind=conn)
+    try:
+        ensure_event_counters(db)
+    finally:
+        db.close()
+
+
+# FTS tables that belong to (and move with) a routed table
+_FTS_TABLES = {"events": "events_fts", "memory": "memory_fts"}
+
+
+def relocate_tables(main_file: str = DB_FILE, busy_timeout_ms: int = 5000) -> Dict[str, int]:
+    """
+    Move routed tables that are still in the main file to their own file.
+
+    Runs after every file is migrated, so the target tables exist. Rows are
+    copied in one transaction, then the table (and its FTS index) is dropped
+    from the main file. A target that already holds exactly the legacy row
+    count is an interrupted earlier move, so only the drop is redone; any
+    other target with rows is left alone rather than merged, with a warning.
+
+    Returns:
+        Rows moved per table
+    """
+    moved: Dict[str, int] = {}
+    main = sqlite3.connect(main_file, isolation_level=None)
+    try:
+        main.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        legacy = {row[0] for row in main.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        for table_name in TABLE_GROUPS:
+            target_file = table_file(table_name)
+            if target_file == main_file or table_name not in legacy:
+                continue
+            target = sqlite3.connect(target_file, isolation_level=None)
+            try:
+                target.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+                target_count = target.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+                if target_count:
+                    legacy_count = main.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+                    if target_count != legacy_count:
+                        print(f"[db] Not moving {table_name} from {main_file}: {target_file} already has rows")
+                        continue
+                    # Copied before a crash, not yet dropped: finish the move
+                    print(f"[db] Finishing earlier move of {table_name} to {target_file}")
+                    _drop_legacy_table(main, table_name)
+                    moved[table_name] = 0
+                    continue
+                target_cols = [row[1] for row in target.execute(f"PRAGMA table_info({table_name})")]
+                legacy_cols = {row[1] for row in main.execute(f"PRAGMA table_info({table_name})")}
+                columns = ", ".join(col for col in target_cols if col in legacy_cols)
+                target.execute("ATTACH DATABASE ? AS legacy", (main_file,))
+                try:
+                    target.execute("BEGIN IMMEDIATE")
+                    # Sync triggers index the JSON rows of events/memory as they are copied
+                    count = target.execute(
+                        f"INSERT INTO main.{table_name} ({columns}) SELECT {columns} FROM legacy.{table_name}"
+                    ).rowcount
+                    target.execute("COMMIT")
+                finally:
+                    target.execute("DETACH DATABASE legacy")
+                if table_name == "events":
+                    _index_compact_events(target_file)
+            finally:
+                target.close()
+            _drop_legacy_table(main, table_name)
+            moved[table_name] = count
+    finally:
+        main.close()
+    if moved:
+        print(f"[db] Moved tables out of {main_file}: {moved}")
+    return moved
+
+
+def _drop_legacy_table(main: sqlite3.Connection, table_name: str) -> None:
+    """Drop a moved table (and its FTS index) from the main file."""
+    main.execute(f"DROP TABLE {table_name}")
+    if table_name in _FTS_TABLES:
+        main.execute(f"DROP TABLE IF EXISTS {_FTS_TABLES[table_name]}")
+
+
+def _index_compact_events(db_file: str, batch_size: int = 1000) -> None:
+    """Add FTS entries for copied compact-encoded events (the sync triggers skip them)."""
+    # Local import: codec depends on the db module, which imports this one
+    from app.storage.codec import FORMAT_COMPACT, decode_payload
+
+    conn = sqlite3.connect(db_file, isolation_level=None)
+    try:
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                "SELECT id, payload_blob FROM events WHERE payload_format = ? AND id > ? ORDER BY id LIMIT ?",
+                (FORMAT_COMPACT, last_id, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            try:
+                entries = [(event_id, json.dumps(decode_payload(blob))) for event_id, blob in rows]
+            except Exception:
+                # msgpack/zstandard missing: those rows stay unsearchable, as before the move
+                break
+            conn.execute("BEGIN")
+            conn.executemany("INSERT INTO events_fts(rowid, payload_json) VALUES (?, ?)", entries)
+            conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def main(argv: List[str]) -> int:
+    """CLI: python -m app.storage.migrations [status | upgrade]"""
+    from app.storage.db import get_engine, init_db
+    from app.storage.routing import database_files
+
+    command = argv[0] if argv else "status"
+    if command == "status":
+        for db_file in database_files():
+            with get_engine(db_file).connect() as conn:
+                current = get_user_version(conn)
+            print(f"{db_file}: schema version {current} (latest {schema_version()})")
+            for step in MIGRATIONS:
+                print(f"  {'x' if step.version <= current else ' '} {step.version:>3}  {step.description}")
+        return 0
+    if command == "upgrade":
+        init_db()
+        print("Schema current")
+        return 0
+    print("Usage: python -m app.storage.migrations [status | upgrade]")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
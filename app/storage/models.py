@@ -2,7 +2,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, Float, Integer, String, Text, func
+from sqlalchemy import Boolean, DateTime, Float, Index, Integer, LargeBinary, String, Text, func, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -17,7 +17,7 @@ class Run(Base):
     __tablename__ = "runs"
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    started_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False, index=True)
     ended_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     version: Mapped[str] = mapped_column(Text, nullable=True)
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -27,12 +27,89 @@ class Event(Base):
     """Logs all external interactions and events."""
     
     __tablename__ = "events"
+    # Single-column SQLite indexes end in the rowid, so source/type/ts each
+    # already serve "filter + ORDER BY id" keyset pages; this covers both.
+    __table_args__ = (
+        Index("ix_events_source_type_id", "source", "type", "id"),
+        # Promoted fields are NULL for most events; partial indexes keep
+        # them small and still serve equality lookups
+        Index("ix_events_task_id", "task_id", sqlite_where=text("task_id IS NOT NULL")),
+        Index("ix_events_tool_name", "tool_name", sqlite_where=text("tool_name IS NOT NULL")),
+        Index("ix_events_handler_type", "handler_type", sqlite_where=text("handler_type IS NOT NULL")),
+        Index("ix_events_status_code", "status_code", sqlite_where=text("status_code IS NOT NULL")),
+        Index("ix_events_error_type", "error_type", sqlite_where=text("error_type IS NOT NULL")),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     ts: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False, index=True)
     source: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
     type: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
     payload_json: Mapped[str] = mapped_column(Text, nullable=False)
+    
+    # Payload storage format: 0 = JSON text in payload_json,
+    # 1 = msgpack + zstd in payload_blob (payload_json left empty)
+    payload_format: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    payload_blob: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    
+    # Payload fields promoted to columns (see app.core.event_schema)
+    task_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    tool_name: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    handler_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    error_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+
+
+class ErrorAggregate(Base):
+    """Repeats of one error fingerprint collapsed within an aggregation window."""
+    
+    __tablename__ = "error_aggregates"
+    __table_args__ = (
+        Index("ux_error_aggregates_window", "fingerprint", "window_start", unique=True),
+        Index("ix_error_aggregates_last_seen_id", "last_seen", "id"),
+        Index("ix_error_aggregates_source_last_seen", "source", "last_seen", "id"),
+    )
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(40), nullable=False)
+    source: Mapped[str] = mapped_column(String(100), nullable=False)
+    error_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    sample_payload_json: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # redacted
+    window_start: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    first_seen: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_seen: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+
+class PayloadDictionary(Base):
+    """Trained zstd dictionaries used by compact event payloads."""
+    
+    __tablename__ = "payload_dictionaries"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)  # zstd dictionary id
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
+class TableCounter(Base):
+    """Incrementally maintained row count per table (see app.storage.stats)."""
+    
+    __tablename__ = "table_counters"
+    
+    table_name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+
+
+class EventCounter(Base):
+    """Incrementally maintained event count per (source, type)."""
+    
+    __tablename__ = "event_counters"
+    
+    source: Mapped[str] = mapped_column(String(100), primary_key=True)
+    type: Mapped[str] = mapped_column(String(100), primary_key=True)
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
 
 class ConsentLedger(Base):
@@ -52,6 +129,9 @@ class Memory(Base):
     """Stores key-value memory entries for the Dom Bot."""
     
     __tablename__ = "memory"
+    __table_args__ = (
+        Index("ix_memory_updated_at_id", "updated_at", "id"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     key: Mapped[str] = mapped_column(String(255), nullable=False, unique=True, index=True)
@@ -65,6 +145,15 @@ class SchedulerTask(Base):
     """Stores scheduler tasks for persistence across restarts."""
     
     __tablename__ = "scheduler_tasks"
+    # Keyset pages are ordered by (updated_at, id); one index per filter
+    __table_args__ = (
+        Index("ix_scheduler_tasks_updated_at_id", "updated_at", "id"),
+        Index("ix_scheduler_tasks_status_updated_at", "status", "updated_at", "id"),
+        Index("ix_scheduler_tasks_handler_type_updated_at", "handler_type", "updated_at", "id"),
+        Index("ix_scheduler_tasks_task_type_updated_at", "task_type", "updated_at", "id"),
+        # Scheduler refills page through pending one-shots by due time
+        Index("ix_scheduler_tasks_due", "task_type", "status", "scheduled_for", "id"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     task_id: Mapped[str] = mapped_column(String(255), nullable=False, unique=True, index=True)
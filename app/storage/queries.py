@@ -0,0 +1,288 @@
+"""Query API for the dashboard and tools: filtered, keyset-paginated reads.
+
+Pages are ordered newest first on an indexed key and continued with an
+opaque cursor holding the last row's key values, so fetching page N costs
+the same as page 1 (no OFFSET scans). Event queries can also span the hot
+events table and archive segments.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import Query, Session
+
+from app.core.event_schema import PROMOTED_FIELDS, extract_promoted_fields
+from app.storage.archive import iter_archived_events
+from app.storage.models import ConsentLedger, ErrorAggregate, Event, Memory, Run, SchedulerTask
+
+
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode a row's sort-key values as an opaque cursor string."""
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, keys: Sequence[Any]) -> List[Any]:
+    """
+    Decode a cursor for the given sort-key columns.
+
+    Raises:
+        ValueError: If the cursor is malformed or doesn't match the keys
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    decoded = []
+    for key, value in zip(keys, values):
+        if value is not None and key.type.python_type is datetime:
+            value = datetime.fromisoformat(value)
+        decoded.append(value)
+    return decoded
+
+
+def paginate(q: Query, keys: Sequence[Any], cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Apply keyset pagination to a query, newest (largest key) first.
+
+    Args:
+        q: Filtered query over a single model
+        keys: Sort-key columns; the last one must be unique (normally the id)
+        cursor: Cursor from a previous page, or None for the first page
+        limit: Page size (capped at MAX_PAGE_SIZE)
+
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        if len(keys) == 1:
+            q = q.filter(keys[0] < values[0])
+        else:
+            q = q.filter(tuple_(*keys) < tuple_(*(literal(v, k.type) for k, v in zip(keys, values))))
+
+    rows = q.order_by(*(key.desc() for key in keys)).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, key.key) for key in keys])
+
+
+def _time_range(q: Query, column: Any, since: Optional[datetime], until: Optional[datetime]) -> Query:
+    if since:
+        q = q.filter(column >= since)
+    if until:
+        q = q.filter(column <= until)
+    return q
+
+
+def _check_fields(fields: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    fields = {column: value for column, value in (fields or {}).items() if value is not None}
+    for column in fields:
+        if column not in PROMOTED_FIELDS:
+            raise ValueError(f"Cannot filter events on '{column}': not a promoted field")
+    return fields
+
+
+def query_events(
+    db: Session,
+    source: Optional[str] = None,
+    event_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 500,
+    include_archive: bool = False,
+    before_id: Optional[int] = None,
+    fields: Optional[Dict[str, Any]] = None,
+) -> List[Event]:
+    """
+    Query events newest first.
+
+    Args:
+        db: Database session
+        source: Optional event source filter
+        event_type: Optional event type filter
+        since: Optional lower bound on event timestamp (naive UTC)
+        until: Optional upper bound on event timestamp (naive UTC)
+        limit: Maximum number of events to return
+        include_archive: Also read archive segments when the hot table has
+            fewer than `limit` matching events
+        before_id: Only return events with a smaller id (keyset cursor)
+        fields: Promoted field filters, e.g. {"task_id": "abc"} (index seeks)
+
+    Returns:
+        List of events (archived ones are detached from the session)
+
+    Raises:
+        ValueError: If a field filter is not a promoted field
+    """
+    fields = _check_fields(fields)
+    # Ordered by id, which follows insertion time; the source/type/ts
+    # indexes all end in the rowid, so filter + id range + order is one
+    # index walk.
+    q = db.query(Event)
+    if source:
+        q = q.filter(Event.source == source)
+    if event_type:
+        q = q.filter(Event.type == event_type)
+    for column, value in fields.items():
+        q = q.filter(getattr(Event, column) == value)
+    q = _time_range(q, Event.ts, since, until)
+    if before_id is not None:
+        q = q.filter(Event.id < before_id)
+    events = q.order_by(Event.id.desc()).limit(limit).all()
+
+    if include_archive and len(events) < limit:
+        # Archived events are all older than anything still in the hot table
+        oldest_hot_id = min((event.id for event in events), default=before_id)
+        for event in iter_archived_events(since=since, until=until, newest_first=True):
+            if oldest_hot_id is not None and event.id >= oldest_hot_id:
+                continue
+            if source and event.source != source:
+                continue
+            if event_type and event.type != event_type:
+                continue
+            if fields:
+                # Archive records only keep the payload; extract on the fly
+                try:
+                    payload = json.loads(event.payload_json)
+                except (TypeError, ValueError):
+                    payload = None
+                promoted = extract_promoted_fields(event.source, event.type, payload)
+                if any(promoted[column] != value for column, value in fields.items()):
+                    continue
+            events.append(event)
+            if len(events) >= limit:
+                break
+
+    return events
+
+
+def page_events(
+    db: Session,
+    source: Optional[str] = None,
+    event_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 500,
+    include_archive: bool = False,
+    cursor: Optional[str] = None,
+    fields: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Event], Optional[str]]:
+    """One page of query_events(); returns (events, next_cursor)."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    before_id = decode_cursor(cursor, [Event.id])[0] if cursor else None
+    events = query_events(
+        db, source=source, event_type=event_type, since=since, until=until,
+        limit=limit + 1, include_archive=include_archive, before_id=before_id, fields=fields,
+    )
+    if len(events) <= limit:
+        return events, None
+    events = events[:limit]
+    return events, encode_cursor([events[-1].id])
+
+
+def task_lifecycle(db: Session, task_id: str, include_archive: bool = True, limit: int = 1000) -> List[Event]:
+    """All events recorded for one scheduler task, oldest first (an index seek on task_id)."""
+    events = query_events(db, limit=limit, include_archive=include_archive, fields={"task_id": task_id})
+    events.reverse()
+    return events
+
+
+def task_overview(
+    db: Session, task_id: str, include_archive: bool = True, limit: int = 1000,
+) -> Tuple[Optional[SchedulerTask], List[Event]]:
+    """
+    A scheduler task's persisted row together with its lifecycle events.
+
+    The two live in different database files (control and events); the
+    session's binds route each query to its file and the join happens here.
+    """
+    task = db.query(SchedulerTask).filter(SchedulerTask.task_id == task_id).one_or_none()
+    return task, task_lifecycle(db, task_id, include_archive=include_archive, limit=limit)
+
+
+def page_runs(
+    db: Session,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Run], Optional[str]]:
+    """Runs newest first, optionally limited to a started_at range."""
+    q = _time_range(db.query(Run), Run.started_at, since, until)
+    return paginate(q, [Run.id], cursor, limit)
+
+
+def page_consent(
+    db: Session,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[ConsentLedger], Optional[str]]:
+    """Consent ledger entries newest first, optionally limited to a ts range."""
+    q = _time_range(db.query(ConsentLedger), ConsentLedger.ts, since, until)
+    return paginate(q, [ConsentLedger.id], cursor, limit)
+
+
+def page_memory(
+    db: Session,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 500,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Memory], Optional[str]]:
+    """Memory entries most recently updated first, optionally limited to an updated_at range."""
+    q = _time_range(db.query(Memory), Memory.updated_at, since, until)
+    return paginate(q, [Memory.updated_at, Memory.id], cursor, limit)
+
+
+def page_scheduler_tasks(
+    db: Session,
+    status: Optional[str] = None,
+    handler_type: Optional[str] = None,
+    task_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 500,
+    cursor: Optional[str] = None,
+) -> Tuple[List[SchedulerTask], Optional[str]]:
+    """Persisted scheduler tasks most recently updated first, with optional filters."""
+    q = db.query(SchedulerTask)
+    if status:
+        q = q.filter(SchedulerTask.status == status)
+    if handler_type:
+        q = q.filter(SchedulerTask.handler_type == handler_type)
+    if task_type:
+        q = q.filter(SchedulerTask.task_type == task_type)
+    q = _time_range(q, SchedulerTask.updated_at, since, until)
+    return paginate(q, [SchedulerTask.updated_at, SchedulerTask.id], cursor, limit)
+
+
+def page_error_aggregates(
+    db: Session,
+    source: Optional[str] = None,
+    error_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[ErrorAggregate], Optional[str]]:
+    """Aggregated errors, most recently seen first, optionally limited to a last_seen range."""
+    q = db.query(ErrorAggregate)
+    if source:
+        q = q.filter(ErrorAggregate.source == source)
+    if error_type:
+        q = q.filter(ErrorAggregate.error_type == error_type)
+    q = _time_range(q, ErrorAggregate.last_seen, since, until)
+    return paginate(q, [ErrorAggregate.last_seen, ErrorAggregate.id], cursor, limit)
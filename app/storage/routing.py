@@ -0,0 +1,61 @@
+"""Which database file each table lives in.
+
+Tables are grouped by write pattern, and each group can get its own SQLite
+file (and so its own write lock):
+
+- events: the append-heavy event log and what's written with it
+- control: consent, scheduler state and memory, whose writes are latency
+  sensitive and must not queue behind an event logging burst
+- main: everything else (runs, and any table not listed here)
+
+DB_EVENTS_FILE / DB_CONTROL_FILE choose the files; leaving one empty keeps
+that group in the main database.
+"""
+from typing import Dict, List
+
+from app.config.settings import get_settings
+
+
+# SQLite database file for the main group
+DB_FILE = "local.db"
+
+MAIN = "main"
+EVENTS = "events"
+CONTROL = "control"
+
+TABLE_GROUPS: Dict[str, str] = {
+    "events": EVENTS,
+    "event_counters": EVENTS,
+    "error_aggregates": EVENTS,
+    "payload_dictionaries": EVENTS,
+    "consent_ledger": CONTROL,
+    "scheduler_tasks": CONTROL,
+    "memory": CONTROL,
+    # Bumped in the same transaction as consent/scheduler/memory writes
+    "table_counters": CONTROL,
+}
+
+
+def group_files() -> Dict[str, str]:
+    """Database file per group (several groups may share one file)."""
+    settings = get_settings()
+    return {
+        MAIN: DB_FILE,
+        EVENTS: settings.db_events_file or DB_FILE,
+        CONTROL: settings.db_control_file or DB_FILE,
+    }
+
+
+def table_file(table_name: str) -> str:
+    """Database file a table lives in."""
+    return group_files()[TABLE_GROUPS.get(table_name, MAIN)]
+
+
+def database_files() -> List[str]:
+    """Distinct database files in use, main first."""
+    return list(dict.fromkeys(group_files().values()))
+
+
+def tables_in_file(db_file: str, table_names: List[str]) -> List[str]:
+    """The subset of table_names stored in db_file."""
+    return [name for name in table_names if table_file(name) == db_file]
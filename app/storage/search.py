@@ -0,0 +1,226 @@
+"""Full-text search over event payloads and memory values (SQLite FTS5)."""
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import column, literal_column, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.storage.models import Event, Memory
+
+
+# External-content FTS5 tables: the index stores only tokens, the text
+# itself stays in events/memory. Triggers keep the index in sync for JSON
+# text rows; compact (binary) event rows are indexed by the code that writes
+# or deletes them, via index_compact_events()/unindex_compact_events().
+_FTS_TRIGGERS = [
+    "events_fts_ai", "events_fts_ad", "events_fts_au",
+    "events_fts_bu_json", "events_fts_au_json",
+]
+
+_FTS_SCHEMA = {
+    "events": [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+            payload_json, content='events', content_rowid='id'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events
+        WHEN new.payload_format = 0 BEGIN
+            INSERT INTO events_fts(rowid, payload_json) VALUES (new.id, new.payload_json);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events
+        WHEN old.payload_format = 0 BEGIN
+            INSERT INTO events_fts(events_fts, rowid, payload_json) VALUES ('delete', old.id, old.payload_json);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS events_fts_bu_json BEFORE UPDATE OF payload_json, payload_format ON events
+        WHEN old.payload_format = 0 BEGIN
+            INSERT INTO events_fts(events_fts, rowid, payload_json) VALUES ('delete', old.id, old.payload_json);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS events_fts_au_json AFTER UPDATE OF payload_json, payload_format ON events
+        WHEN new.payload_format = 0 BEGIN
+            INSERT INTO events_fts(rowid, payload_json) VALUES (new.id, new.payload_json);
+        END
+        """,
+    ],
+    "memory": [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+            key, value, content='memory', content_rowid='id'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS memory_fts_ai AFTER INSERT ON memory BEGIN
+            INSERT INTO memory_fts(rowid, key, value) VALUES (new.id, new.key, new.value);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS memory_fts_ad AFTER DELETE ON memory BEGIN
+            INSERT INTO memory_fts(memory_fts, rowid, key, value) VALUES ('delete', old.id, old.key, old.value);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS memory_fts_au AFTER UPDATE OF key, value ON memory BEGIN
+            INSERT INTO memory_fts(memory_fts, rowid, key, value) VALUES ('delete', old.id, old.key, old.value);
+            INSERT INTO memory_fts(rowid, key, value) VALUES (new.id, new.key, new.value);
+        END
+        """,
+    ],
+}
+
+# Lightweight table constructs for joining against the FTS tables
+events_fts = table("events_fts", column("rowid"), column("rank"))
+memory_fts = table("memory_fts", column("rowid"), column("rank"))
+
+
+def ensure_search_index(conn: Connection, tables: Optional[Set[str]] = None) -> bool:
+    """
+    Create the FTS5 tables and sync triggers, backfilling existing rows once.
+
+    Runs in the caller's transaction (a schema migration step).
+
+    Args:
+        conn: Connection to the database file holding the indexed tables
+        tables: Only index these of events/memory (default: both)
+
+    Returns:
+        True if full-text search is available, False if SQLite lacks FTS5
+    """
+    indexed = [name for name in _FTS_SCHEMA if tables is None or name in tables]
+    existing = {
+        row[0]
+        for row in conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name IN ('events_fts', 'memory_fts')"
+        ))
+    }
+    try:
+        # Recreate triggers so a migration re-running this picks up definition changes
+        if "events" in indexed:
+            for trigger in _FTS_TRIGGERS:
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        for name in indexed:
+            for statement in _FTS_SCHEMA[name]:
+                conn.execute(text(statement))
+    except Exception:
+        # SQLite built without FTS5 - callers fall back to LIKE scans
+        return False
+
+    # Index rows that were written before the FTS tables existed
+    for name in indexed:
+        if f"{name}_fts" not in existing:
+            conn.execute(text(f"INSERT INTO {name}_fts({name}_fts) VALUES ('rebuild')"))
+    return True
+
+
+def index_compact_events(db: Session, rows: List[Tuple[int, str]]) -> None:
+    """Add FTS entries for compact events, given (event id, payload JSON text) pairs."""
+    if not rows:
+        return
+    try:
+        db.execute(
+            text("INSERT INTO events_fts(rowid, payload_json) VALUES (:id, :payload)"),
+            [{"id": event_id, "payload": payload} for event_id, payload in rows],
+            # Route to the events database (text() has no table to route by)
+            bind_arguments={"mapper": Event},
+        )
+    except OperationalError:
+        # No FTS5 index in this database
+        pass
+
+
+def unindex_compact_events(db: Session, rows: List[Tuple[int, str]]) -> None:
+    """Remove FTS entries for compact events, given the text they were indexed with."""
+    if not rows:
+        return
+    try:
+        db.execute(
+            text("INSERT INTO events_fts(events_fts, rowid, payload_json) VALUES ('delete', :id, :payload)"),
+            [{"id": event_id, "payload": payload} for event_id, payload in rows],
+            # Route to the events database (text() has no table to route by)
+            bind_arguments={"mapper": Event},
+        )
+    except OperationalError:
+        pass
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn free user text into a safe FTS5 MATCH expression.
+
+    Each whitespace-separated term becomes a quoted prefix query, so FTS
+    syntax in the input is never interpreted and partial words still match.
+    All terms must match (implicit AND).
+    """
+    terms = [term.replace('"', '""') for term in query.split()]
+    terms = [term for term in terms if term.strip('"')]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_events(
+    db: Session,
+    query: str,
+    limit: int = 10,
+    source: Optional[str] = None,
+    event_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Event]:
+    """
+    Ranked full-text search over event payloads.
+
+    Args:
+        db: Database session
+        query: Free-text query
+        limit: Maximum number of events to return
+        source: Optional event source filter
+        event_type: Optional event type filter
+        since: Optional lower bound on event timestamp
+        until: Optional upper bound on event timestamp
+
+    Returns:
+        Matching events, best match first
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+
+    q = (
+        db.query(Event)
+        .join(events_fts, events_fts.c.rowid == Event.id)
+        .filter(literal_column("events_fts").op("MATCH")(match))
+    )
+    if source:
+        q = q.filter(Event.source == source)
+    if event_type:
+        q = q.filter(Event.type == event_type)
+    if since:
+        q = q.filter(Event.ts >= since)
+    if until:
+        q = q.filter(Event.ts <= until)
+    return q.order_by(events_fts.c.rank).limit(limit).all()
+
+
+def search_memory(db: Session, query: str, limit: int = 10) -> List[Memory]:
+    """Ranked full-text search over memory keys and values."""
+    match = build_match_query(query)
+    if match is None:
+        return []
+
+    return (
+        db.query(Memory)
+        .join(memory_fts, memory_fts.c.rowid == Memory.id)
+        .filter(literal_column("memory_fts").op("MATCH")(match))
+        .order_by(memory_fts.c.rank)
+        .limit(limit)
+        .all()
+    )
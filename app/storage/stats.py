@@ -0,0 +1,233 @@
+"""Incrementally maintained row counters for the dashboard stats.
+
+Writers bump the counters in the same transaction as the rows they add or
+remove, so reading stats is a handful of primary-key lookups instead of
+COUNT(*) scans. A periodic reconciliation recounts everything to repair
+drift from writers that don't maintain counters (or from manual edits).
+"""
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import delete, func, literal, select, union_all
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.storage.models import (
+    ConsentLedger, Event, EventCounter, Memory, Run, SchedulerTask, TableCounter,
+)
+from app.storage.routing import table_file
+
+
+# Counted tables, keyed by the name used in TableCounter rows
+COUNTED_TABLES = {
+    "runs": Run,
+    "events": Event,
+    "consent_ledger": ConsentLedger,
+    "memory": Memory,
+    "scheduler_tasks": SchedulerTask,
+}
+
+
+def bump_table_counter(db: Session, table_name: str, delta: int = 1) -> None:
+    """Add delta to a table's row counter (runs in the caller's transaction)."""
+    if not delta:
+        return
+    stmt = insert(TableCounter).values(
+        table_name=table_name, row_count=delta, updated_at=datetime.now(timezone.utc)
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[TableCounter.table_name],
+        set_={"row_count": TableCounter.row_count + delta, "updated_at": stmt.excluded.updated_at},
+    ))
+
+
+def bump_event_counters(db: Session, counts: Mapping[Tuple[str, str], int]) -> None:
+    """
+    Add per-(source, type) deltas to the event counters.
+
+    The events total is their sum, so event writes only touch the events
+    database (table_counters lives with the control tables).
+    """
+    if not counts:
+        return
+    for (source, event_type), delta in counts.items():
+        if not delta:
+            continue
+        stmt = insert(EventCounter).values(source=source, type=event_type, row_count=delta)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[EventCounter.source, EventCounter.type],
+            set_={"row_count": EventCounter.row_count + delta},
+        ))
+
+
+def count_event_rows(rows: Iterable[Any], sign: int = 1) -> Dict[Tuple[str, str], int]:
+    """Tally event rows (dicts or Event objects) by (source, type)."""
+    counts: Counter = Counter()
+    for row in rows:
+        if isinstance(row, dict):
+            counts[(row["source"], row["type"])] += sign
+        else:
+            counts[(row.source, row.type)] += sign
+    return dict(counts)
+
+
+def reconcile_counters(db: Session, read_db: Optional[Session] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Recount every counted table and correct the counters by their drift.
+
+    The scans run first, outside any write transaction (on read_db if
+    given, else on db). Each reads a table's rows and its counter in one
+    statement, so both come from the same snapshot and the difference is
+    exactly the drift. Writers bump the counters in the same transaction
+    as their rows, so adding the drift afterwards, in a short write
+    transaction, keeps whatever they committed in between. (The runs
+    counter lives in another file than its table in a split layout; a
+    write racing its two reads shows up as drift and is undone by the
+    next run.)
+
+    Returns:
+        Dictionary with 'totals' per table and 'drift' (recounted minus
+        counter value) for tables whose counter was wrong
+    """
+    reader = read_db if read_db is not None else db
+    totals: Dict[str, int] = {name: 0 for name in COUNTED_TABLES}
+    counters: Dict[str, Optional[int]] = {"events": 0}
+    for name, model in COUNTED_TABLES.items():
+        if name != "events":
+            totals[name], counters[name] = _count_with_counter(reader, name, model)
+    event_drift: Dict[Tuple[str, str], int] = {}
+    for source, event_type, count, counter in reader.execute(_EVENT_DRIFT_QUERY):
+        totals["events"] += count
+        counters["events"] += counter
+        if count != counter:
+            event_drift[(source, event_type)] = count - counter
+    if read_db is None:
+        # End the read so the write transaction below starts fresh
+        db.commit()
+
+    drift = {
+        name: total - (counters[name] or 0)
+        for name, total in totals.items()
+        if total != (counters[name] or 0)
+    }
+    try:
+        for name, total in totals.items():
+            if name == "events":
+                continue
+            if counters[name] is None and not total:
+                # A zero row marks the counters as seeded (see ensure_counters)
+                db.execute(insert(TableCounter).values(
+                    table_name=name, row_count=0, updated_at=datetime.now(timezone.utc)
+                ).on_conflict_do_nothing())
+            else:
+                bump_table_counter(db, name, drift.get(name, 0))
+        bump_event_counters(db, event_drift)
+        if event_drift:
+            db.execute(delete(EventCounter).where(EventCounter.row_count == 0))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {"totals": totals, "drift": drift}
+
+
+def _count_with_counter(db: Session, name: str, model: Any) -> Tuple[int, Optional[int]]:
+    """A table's row count and its counter value (None if it has no row yet)."""
+    count = select(func.count()).select_from(model).scalar_subquery()
+    counter = select(TableCounter.row_count).where(TableCounter.table_name == name).scalar_subquery()
+    if table_file(model.__tablename__) == table_file(TableCounter.__tablename__):
+        return tuple(db.execute(select(count, counter)).one())
+    return db.execute(select(count)).scalar_one(), db.execute(select(counter)).scalar_one_or_none()
+
+
+def _event_drift_query() -> Any:
+    # Per (source, type): rows counted and counter value, in one statement so
+    # both come from the same snapshot (events and their counters share a file)
+    counted = select(
+        Event.source, Event.type, func.count().label("count"), literal(0).label("counter")
+    ).group_by(Event.source, Event.type)
+    stored = select(
+        EventCounter.source, EventCounter.type, literal(0).label("count"), EventCounter.row_count.label("counter")
+    )
+    both = union_all(counted, stored).subquery()
+    return select(
+        both.c.source, both.c.type, func.sum(both.c.count), func.sum(both.c.counter)
+    ).group_by(both.c.source, both.c.type)
+
+
+_EVENT_DRIFT_QUERY = _event_drift_query()
+
+
+def ensure_counters(db: Session) -> None:
+    """Seed the counters with a full recount if they have never been populated."""
+    if db.execute(select(func.count()).select_from(TableCounter)).scalar_one() == 0:
+        reconcile_counters(db)
+
+
+def ensure_event_counters(db: Session) -> None:
+    """Seed only the event counters with a recount if they have never been populated."""
+    if db.execute(select(func.count()).select_from(EventCounter)).scalar_one() == 0:
+        _add_event_counts(db)
+        db.commit()
+
+
+def _add_event_counts(db: Session) -> None:
+    grouped = db.execute(
+        select(Event.source, Event.type, func.count()).group_by(Event.source, Event.type)
+    ).all()
+    for source, event_type, count in grouped:
+        db.add(EventCounter(source=source, type=event_type, row_count=count))
+
+
+def get_table_counts(db: Session) -> Dict[str, int]:
+    """Row count per counted table, from the counters."""
+    counts = {name: 0 for name in COUNTED_TABLES}
+    for name, row_count in db.execute(select(TableCounter.table_name, TableCounter.row_count)):
+        counts[name] = row_count
+    counts["events"] = db.execute(select(func.coalesce(func.sum(EventCounter.row_count), 0))).scalar_one()
+    return counts
+
+
+def get_event_breakdown(db: Session) -> Dict[str, Any]:
+    """
+    Event counts per source and per (source, type), from the counters.
+
+    Returns:
+        Dictionary with 'by_source' {source: count} and 'by_source_type'
+        [{source, type, count}] sorted by count, largest first
+    """
+    by_source: Counter = Counter()
+    by_source_type = []
+    rows = db.execute(
+        select(EventCounter.source, EventCounter.type, EventCounter.row_count)
+        .where(EventCounter.row_count > 0)
+        .order_by(EventCounter.row_count.desc())
+    )
+    for source, event_type, row_count in rows:
+        by_source[source] += row_count
+        by_source_type.append({"source": source, "type": event_type, "count": row_count})
+    return {"by_source": dict(by_source.most_common()), "by_source_type": by_source_type}
+
+
+def run_counter_reconciliation() -> Dict[str, Dict[str, int]]:
+    """Scheduler job: recount all tables and repair counter drift."""
+    # Imported here: the logger itself maintains counters through this module
+    from app.core.logger import log_error, log_event
+    from app.storage.db import get_db_sync, get_read_db
+
+    db = get_db_sync()
+    # Scans go through the read engines, never holding a writer connection
+    read_db = get_read_db(allow_snapshot=False)
+    try:
+        result = reconcile_counters(db, read_db)
+    except Exception as e:
+        log_error("storage", e, {"action": "counter_reconciliation"})
+        return {"totals": {}, "drift": {}, "error": str(e)}
+    finally:
+        read_db.close()
+        db.close()
+
+    if result["drift"]:
+        log_event(source="storage", event_type="counters_reconciled", payload=result)
+    return result
@@ -0,0 +1,157 @@
+"""Live event fan-out for the dashboard's server-sent event stream.
+
+One background poller per process follows the events table by id cursor
+(an index range scan on the primary key) and fans each new event out to
+every connected subscriber, so open dashboard tabs share a single query.
+"""
+import json
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.storage.codec import event_payload
+from app.storage.db import get_read_db
+from app.storage.models import Event
+
+
+def serialize_event(event: Event) -> Dict[str, Any]:
+    """Serialize an event the same way the events endpoint does."""
+    try:
+        payload = event_payload(event)
+    except (ValueError, TypeError):
+        payload = {"raw": event.payload_json}
+    return {
+        "id": event.id,
+        "ts": event.ts.isoformat() if event.ts else None,
+        "source": event.source,
+        "type": event.type,
+        "payload": payload,
+    }
+
+
+def fetch_events_after(
+    after_id: int,
+    source: Optional[str] = None,
+    event_type: Optional[str] = None,
+    limit: int = 500,
+) -> List[Dict[str, Any]]:
+    """Fetch serialized events with id > after_id, oldest first."""
+    db = get_read_db(allow_snapshot=False)
+    try:
+        q = db.query(Event).filter(Event.id > after_id)
+        if source:
+            q = q.filter(Event.source == source)
+        if event_type:
+            q = q.filter(Event.type == event_type)
+        return [serialize_event(event) for event in q.order_by(Event.id).limit(limit).all()]
+    finally:
+        db.close()
+
+
+class Subscription:
+    """One connected stream client with its own filters and bounded queue."""
+
+    def __init__(self, source: Optional[str], event_type: Optional[str], max_queue: int = 1000):
+        self.source = source
+        self.event_type = event_type
+        self.queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        # Set when the client fell too far behind; it should reconnect and resume
+        self.overflowed = False
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.source and event["source"] != self.source:
+            return False
+        if self.event_type and event["type"] != self.event_type:
+            return False
+        return True
+
+
+class EventStreamHub:
+    """Shared id-cursor poller that fans new events out to subscribers."""
+
+    def __init__(self, poll_interval: float = 0.5, batch_size: int = 500):
+        self._poll_interval = poll_interval
+        self._batch_size = batch_size
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._cursor = 0
+
+    def subscribe(self, source: Optional[str] = None, event_type: Optional[str] = None) -> Subscription:
+        """Register a subscriber, starting the poller if needed."""
+        subscription = Subscription(source, event_type)
+        with self._lock:
+            self._subscribers.append(subscription)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._poll_loop, name="event-stream", daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def _latest_id(self) -> int:
+        db = get_read_db(allow_snapshot=False)
+        try:
+            latest = db.query(Event.id).order_by(Event.id.desc()).first()
+            return latest[0] if latest else 0
+        finally:
+            db.close()
+
+    def _poll_loop(self) -> None:
+        """Poll for new events while anyone is subscribed."""
+        stop = threading.Event()
+        try:
+            self._cursor = self._latest_id()
+        except Exception:
+            self._cursor = 0
+
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                events = fetch_events_after(self._cursor, limit=self._batch_size)
+            except Exception:
+                events = []
+            if events:
+                self._cursor = events[-1]["id"]
+                self._broadcast(events)
+            if len(events) < self._batch_size:
+                stop.wait(self._poll_interval)
+
+    def _broadcast(self, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if subscription.overflowed:
+                continue
+            for event in events:
+                if not subscription.matches(event):
+                    continue
+                try:
+                    subscription.queue.put_nowait(event)
+                except queue.Full:
+                    subscription.overflowed = True
+                    break
+
+
+_hub: Optional[EventStreamHub] = None
+_hub_lock = threading.Lock()
+
+
+def get_event_stream_hub() -> EventStreamHub:
+    """Get or create the process-wide event stream hub."""
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = EventStreamHub()
+    return _hub
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Format one event as an SSE message (id enables Last-Event-ID resume)."""
+    return f"id: {event['id']}\nevent: event\ndata: {json.dumps(event, default=str)}\n\n"
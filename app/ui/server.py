@@ -1,17 +1,27 @@
 """Flask web server for viewing database and scheduler status."""
 import json
-from datetime import datetime
-from typing import Any, Dict, List
+import queue
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 
-from flask import Flask, jsonify, render_template
+from flask import Flask, Response, jsonify, render_template, request, stream_with_context
 
+from app.core.event_schema import PROMOTED_FIELDS
 from app.core.scheduler import get_scheduler
-from app.storage.db import get_db_sync
-from app.storage.models import Run, Event, ConsentLedger, Memory, SchedulerTask
+from app.storage.db import get_read_db
+from app.storage.queries import (
+    page_consent, page_error_aggregates, page_events, page_memory, page_runs, page_scheduler_tasks,
+    task_overview,
+)
+from app.storage.stats import get_event_breakdown, get_table_counts
+from app.ui.event_stream import fetch_events_after, format_sse, get_event_stream_hub, serialize_event
 
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
 
+STREAM_HEARTBEAT_SECONDS = 15.0
+STREAM_BACKFILL_BATCH = 500
+
 
 def serialize_datetime(obj: Any) -> str:
     """Convert datetime objects to ISO format strings."""
@@ -20,6 +30,69 @@ def serialize_datetime(obj: Any) -> str:
     raise TypeError(f"Type {type(obj)} not serializable")
 
 
+def parse_datetime_arg(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO 8601 query parameter into naive UTC (as stored in SQLite)."""
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def time_range_args() -> Dict[str, Optional[datetime]]:
+    """Parse the common since/until query params."""
+    return {
+        "since": parse_datetime_arg(request.args.get("since")),
+        "until": parse_datetime_arg(request.args.get("until")),
+    }
+
+
+def page_args(default_limit: int) -> Dict[str, Any]:
+    """Parse the common limit/cursor pagination query params."""
+    return {
+        "limit": request.args.get("limit", default_limit, type=int),
+        "cursor": request.args.get("cursor") or None,
+    }
+
+
+def promoted_field_args() -> Dict[str, Any]:
+    """Parse filters on promoted event fields (task_id, tool_name, ...)."""
+    fields = {}
+    for column, column_type in PROMOTED_FIELDS.items():
+        value = request.args.get(column, type=column_type)
+        if value not in (None, ""):
+            fields[column] = value
+    return fields
+
+
+def serialize_scheduler_task(task: Any) -> Dict[str, Any]:
+    """Convert a SchedulerTask row to a JSON-serializable dict."""
+    try:
+        parameters = json.loads(task.parameters_json) if task.parameters_json else None
+    except json.JSONDecodeError:
+        parameters = {"raw": task.parameters_json}
+
+    return {
+        "id": task.id,
+        "task_id": task.task_id,
+        "task_type": task.task_type,
+        "name": task.name,
+        "status": task.status,
+        "interval_seconds": task.interval_seconds,
+        "scheduled_for": task.scheduled_for.isoformat() if task.scheduled_for else None,
+        "cron_expression": task.cron_expression,
+        "timezone_name": task.timezone_name,
+        "last_run_at": task.last_run_at.isoformat() if task.last_run_at else None,
+        "next_run_at": task.next_run_at.isoformat() if task.next_run_at else None,
+        "handler_type": task.handler_type,
+        "parameters": parameters,
+        "created_at": task.created_at.isoformat() if task.created_at else None,
+        "updated_at": task.updated_at.isoformat() if task.updated_at else None,
+        "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+    }
+
+
 @app.route("/")
 def index():
     """Render the main dashboard page."""
@@ -28,11 +101,15 @@ def index():
 
 @app.route("/api/database/runs")
 def get_runs():
-    """Get all runs from the database."""
+    """
+    Get runs, newest first.
+    
+    Query params: since, until (ISO 8601, on started_at), limit, cursor.
+    """
     try:
-        db = get_db_sync()
+        db = get_read_db()
         try:
-            runs = db.query(Run).order_by(Run.started_at.desc()).limit(100).all()
+            runs, next_cursor = page_runs(db, **time_range_args(), **page_args(100))
             result = []
             for run in runs:
                 result.append({
@@ -42,48 +119,161 @@ def get_runs():
                     "version": run.version,
                     "notes": run.notes
                 })
-            return jsonify({"success": True, "data": result, "count": len(result)})
+            return jsonify({"success": True, "data": result, "count": len(result), "next_cursor": next_cursor})
         finally:
             db.close()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 @app.route("/api/database/events")
 def get_events():
-    """Get recent events from the database."""
+    """
+    Get recent events from the database.
+    
+    Query params: source, type, since, until (ISO 8601), promoted fields
+    (task_id, tool_name, handler_type, status_code, error_type), archive=1
+    to include events that retention has moved to archive segments, and
+    limit/cursor for paging back (pass the previous response's next_cursor).
+    """
+    try:
+        db = get_read_db()
+        try:
+            events, next_cursor = page_events(
+                db,
+                source=request.args.get("source") or None,
+                event_type=request.args.get("type") or None,
+                include_archive=request.args.get("archive") in ("1", "true", "yes"),
+                fields=promoted_field_args(),
+                **time_range_args(),
+                **page_args(500),
+            )
+            result = [serialize_event(event) for event in events]
+            return jsonify({"success": True, "data": result, "count": len(result), "next_cursor": next_cursor})
+        finally:
+            db.close()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/api/events/stream")
+def stream_events():
+    """
+    Stream new events as server-sent events.
+
+    Query params: source, type. Each message carries the event id, so a
+    reconnecting EventSource resumes via the Last-Event-ID header (or the
+    last_event_id query param) without missing or repeating events.
+    """
+    source = request.args.get("source") or None
+    event_type = request.args.get("type") or None
+    last_id_arg = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_id = int(last_id_arg) if last_id_arg else None
+    except ValueError:
+        last_id = None
+
+    hub = get_event_stream_hub()
+
+    def generate():
+        nonlocal last_id
+        # Subscribe before backfilling so nothing committed in between is lost;
+        # duplicates are dropped by comparing ids below.
+        subscription = hub.subscribe(source, event_type)
+        try:
+            yield "retry: 3000\n\n"
+            if last_id is not None:
+                while True:
+                    backlog = fetch_events_after(last_id, source, event_type, limit=STREAM_BACKFILL_BATCH)
+                    for event in backlog:
+                        yield format_sse(event)
+                        last_id = event["id"]
+                    if len(backlog) < STREAM_BACKFILL_BATCH:
+                        break
+
+            while not subscription.overflowed:
+                try:
+                    event = subscription.queue.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if last_id is not None and event["id"] <= last_id:
+                    continue
+                yield format_sse(event)
+                last_id = event["id"]
+            # Fell behind: end the response; the client reconnects with
+            # Last-Event-ID and catches up from the database.
+        finally:
+            hub.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/api/database/errors")
+def get_error_aggregates():
+    """
+    Get aggregated errors (repeats collapsed per fingerprint and window).
+    
+    Query params: source, error_type, since, until (ISO 8601, on last_seen),
+    limit, cursor.
+    """
     try:
-        db = get_db_sync()
+        db = get_read_db()
         try:
-            events = db.query(Event).order_by(Event.ts.desc()).limit(500).all()
+            aggregates, next_cursor = page_error_aggregates(
+                db,
+                source=request.args.get("source") or None,
+                error_type=request.args.get("error_type") or None,
+                **time_range_args(),
+                **page_args(100),
+            )
             result = []
-            for event in events:
+            for aggregate in aggregates:
                 try:
-                    payload = json.loads(event.payload_json) if event.payload_json else {}
+                    sample_payload = json.loads(aggregate.sample_payload_json) if aggregate.sample_payload_json else None
                 except json.JSONDecodeError:
-                    payload = {"raw": event.payload_json}
+                    sample_payload = {"raw": aggregate.sample_payload_json}
                 
                 result.append({
-                    "id": event.id,
-                    "ts": event.ts.isoformat() if event.ts else None,
-                    "source": event.source,
-                    "type": event.type,
-                    "payload": payload
+                    "id": aggregate.id,
+                    "fingerprint": aggregate.fingerprint,
+                    "source": aggregate.source,
+                    "error_type": aggregate.error_type,
+                    "message": aggregate.message,
+                    "count": aggregate.count,
+                    "window_start": aggregate.window_start.isoformat() if aggregate.window_start else None,
+                    "first_seen": aggregate.first_seen.isoformat() if aggregate.first_seen else None,
+                    "last_seen": aggregate.last_seen.isoformat() if aggregate.last_seen else None,
+                    "sample_payload": sample_payload,
                 })
-            return jsonify({"success": True, "data": result, "count": len(result)})
+            return jsonify({"success": True, "data": result, "count": len(result), "next_cursor": next_cursor})
         finally:
             db.close()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 @app.route("/api/database/consent")
 def get_consent():
-    """Get consent ledger entries."""
+    """
+    Get consent ledger entries, newest first.
+    
+    Query params: since, until (ISO 8601), limit, cursor.
+    """
     try:
-        db = get_db_sync()
+        db = get_read_db()
         try:
-            entries = db.query(ConsentLedger).order_by(ConsentLedger.ts.desc()).limit(100).all()
+            entries, next_cursor = page_consent(db, **time_range_args(), **page_args(100))
             result = []
             for entry in entries:
                 try:
@@ -104,20 +294,26 @@ def get_consent():
                     "revoked_topics": revoked_topics,
                     "armed_until_ts": entry.armed_until_ts.isoformat() if entry.armed_until_ts else None
                 })
-            return jsonify({"success": True, "data": result, "count": len(result)})
+            return jsonify({"success": True, "data": result, "count": len(result), "next_cursor": next_cursor})
         finally:
             db.close()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 @app.route("/api/database/memory")
 def get_memory():
-    """Get memory entries."""
+    """
+    Get memory entries, most recently updated first.
+    
+    Query params: since, until (ISO 8601, on updated_at), limit, cursor.
+    """
     try:
-        db = get_db_sync()
+        db = get_read_db()
         try:
-            memories = db.query(Memory).order_by(Memory.updated_at.desc()).limit(500).all()
+            memories, next_cursor = page_memory(db, **time_range_args(), **page_args(500))
             result = []
             for memory in memories:
                 try:
@@ -133,9 +329,11 @@ def get_memory():
                     "created_at": memory.created_at.isoformat() if memory.created_at else None,
                     "updated_at": memory.updated_at.isoformat() if memory.updated_at else None
                 })
-            return jsonify({"success": True, "data": result, "count": len(result)})
+            return jsonify({"success": True, "data": result, "count": len(result), "next_cursor": next_cursor})
         finally:
             db.close()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -153,61 +351,89 @@ def get_scheduler_status():
 
 @app.route("/api/database/scheduler_tasks")
 def get_scheduler_tasks():
-    """Get persisted scheduler tasks from the database."""
+    """
+    Get persisted scheduler tasks, most recently updated first.
+    
+    Query params: status, handler_type, task_type, since, until (ISO 8601,
+    on updated_at), limit, cursor.
+    """
     try:
-        db = get_db_sync()
+        db = get_read_db()
         try:
-            tasks = (
-                db.query(SchedulerTask)
-                .order_by(SchedulerTask.updated_at.desc())
-                .limit(500)
-                .all()
+            tasks, next_cursor = page_scheduler_tasks(
+                db,
+                status=request.args.get("status") or None,
+                handler_type=request.args.get("handler_type") or None,
+                task_type=request.args.get("task_type") or None,
+                **time_range_args(),
+                **page_args(500),
             )
-            result = []
-            for task in tasks:
-                try:
-                    parameters = json.loads(task.parameters_json) if task.parameters_json else None
-                except json.JSONDecodeError:
-                    parameters = {"raw": task.parameters_json}
+            result = [serialize_scheduler_task(task) for task in tasks]
+            return jsonify({"success": True, "data": result, "count": len(result), "next_cursor": next_cursor})
+        finally:
+            db.close()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
 
-                result.append({
-                    "id": task.id,
-                    "task_id": task.task_id,
-                    "task_type": task.task_type,
-                    "name": task.name,
-                    "status": task.status,
-                    "interval_seconds": task.interval_seconds,
-                    "scheduled_for": task.scheduled_for.isoformat() if task.scheduled_for else None,
-                    "cron_expression": task.cron_expression,
-                    "timezone_name": task.timezone_name,
-                    "last_run_at": task.last_run_at.isoformat() if task.last_run_at else None,
-                    "next_run_at": task.next_run_at.isoformat() if task.next_run_at else None,
-                    "handler_type": task.handler_type,
-                    "parameters": parameters,
-                    "created_at": task.created_at.isoformat() if task.created_at else None,
-                    "updated_at": task.updated_at.isoformat() if task.updated_at else None,
-                    "completed_at": task.completed_at.isoformat() if task.completed_at else None,
-                })
-            return jsonify({"success": True, "data": result, "count": len(result)})
+
+@app.route("/api/database/scheduler_tasks/<task_id>")
+def get_scheduler_task(task_id: str):
+    """
+    Get one persisted scheduler task with its lifecycle events, oldest first.
+
+    The task row and its events are stored in different database files; this
+    combines them. Query params: archive=0 to skip archived events, limit.
+    """
+    try:
+        db = get_read_db()
+        try:
+            task, events = task_overview(
+                db,
+                task_id,
+                include_archive=request.args.get("archive") not in ("0", "false", "no"),
+                limit=request.args.get("limit", 1000, type=int),
+            )
+            if task is None and not events:
+                return jsonify({"success": False, "error": f"Unknown task: {task_id}"}), 404
+            return jsonify({
+                "success": True,
+                "data": {
+                    "task": serialize_scheduler_task(task) if task is not None else None,
+                    "events": [serialize_event(event) for event in events],
+                },
+            })
         finally:
             db.close()
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 @app.route("/api/database/stats")
 def get_database_stats():
-    """Get database statistics."""
+    """
+    Get database statistics from the incrementally maintained counters.
+    
+    Query params: breakdown=1 adds event counts per (source, type).
+    """
     try:
-        db = get_db_sync()
+        db = get_read_db()
         try:
+            counts = get_table_counts(db)
+            events = get_event_breakdown(db)
             stats = {
-                "runs": db.query(Run).count(),
-                "events": db.query(Event).count(),
-                "consent_entries": db.query(ConsentLedger).count(),
-                "memory_entries": db.query(Memory).count(),
-                "scheduler_tasks": db.query(SchedulerTask).count(),
+                "runs": counts["runs"],
+                "events": counts["events"],
+                "consent_entries": counts["consent_ledger"],
+                "memory_entries": counts["memory"],
+                "scheduler_tasks": counts["scheduler_tasks"],
+                "events_by_source": events["by_source"],
             }
+            if request.args.get("breakdown") in ("1", "true", "yes"):
+                stats["events_by_source_type"] = events["by_source_type"]
             return jsonify({"success": True, "data": stats})
         finally:
             db.close()
@@ -217,7 +443,7 @@ def get_database_stats():
 
 def run_server(host: str = "127.0.0.1", port: int = 5000, debug: bool = False):
     """Run the Flask development server."""
-    app.run(host=host, port=port, debug=debug)
+    app.run(host=host, port=port, debug=debug, threaded=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+"""Benchmark structural secret redaction against the legacy regex passes.
+
+Usage: python bench_redaction.py [iterations]
+"""
+import json
+import re
+import sys
+import timeit
+
+from app.core.redaction import serialize_redacted
+
+
+# Legacy implementation (five case-insensitive passes over the serialized JSON)
+LEGACY_PATTERNS = [
+    r'token["\s:=]+([^\s"\'\),]+)',
+    r'password["\s:=]+([^\s"\'\),]+)',
+    r'secret["\s:=]+([^\s"\'\),]+)',
+    r'api[_-]?key["\s:=]+([^\s"\'\),]+)',
+    r'authorization["\s:=]+([^\s"\'\),]+)',
+]
+
+
+def legacy_redact(payload: dict) -> str:
+    """Serialize, then redact the way log_event used to."""
+    result = json.dumps(payload, default=str)
+    for pattern in LEGACY_PATTERNS:
+        result = re.sub(pattern, r'\1***REDACTED***', result, flags=re.IGNORECASE)
+    return result
+
+
+def structural_redact(payload: dict) -> str:
+    """Redact structurally, then serialize (current log_event path)."""
+    return serialize_redacted(payload)
+
+
+def _conversation_turn() -> dict:
+    """A multi-tool conversation_turn payload."""
+    tool_calls = []
+    for i in range(12):
+        tool_calls.append({
+            "tool_name": "memory_search",
+            "args": {"query": f"check-in {i}", "limit": 10},
+            "result": {
+                "results": [
+                    {
+                        "id": i * 100 + j,
+                        "source": "discord",
+                        "type": "message_sent",
+                        "timestamp": "2026-01-06T17:30:00+00:00",
+                        "payload": {"channel": "discord", "message_preview": "Report in. " * 8},
+                    }
+                    for j in range(10)
+                ],
+                "count": 10,
+            },
+        })
+    return {
+        "user_text": "Schedule my check-ins for the rest of the day",
+        "channel_id": "123456789",
+        "user_id": "987654321",
+        "tool_calls_count": len(tool_calls),
+        "tool_calls": tool_calls,
+        "response_message": "Done. " * 50,
+        "actions_count": 3,
+        "timestamp": "2026-01-06T17:30:00+00:00",
+    }
+
+
+def _bluesky_error() -> dict:
+    """A Bluesky auth failure payload with secrets in keys and free text."""
+    return {
+        "error": "401 Unauthorized: token=eyJhbGciOiJIUzI1NiJ9.SECRET1 rejected",
+        "error_type": "HTTPStatusError",
+        "service": "bluesky",
+        "status_code": 401,
+        "error_detail": {"error": "AuthenticationRequired", "message": "Invalid identifier or password"},
+        "request": {
+            "url": "https://bsky.social/xrpc/com.atproto.server.createSession",
+            "headers": {"Authorization": "Bearer SECRET2", "Content-Type": "application/json"},
+            "body": {"identifier": "me.bsky.social", "password": "SECRET3"},
+        },
+        "api_key": "SECRET4",
+        "error_text": "client_secret: SECRET5, retry later",
+    }
+
+
+SAMPLES = {
+    "conversation_turn": (_conversation_turn(), []),
+    "bluesky_error": (_bluesky_error(), ["SECRET1", "SECRET2", "SECRET3", "SECRET4", "SECRET5"]),
+}
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print("=" * 60)
+    print(f"Redaction benchmark ({iterations} iterations per sample)")
+    print("=" * 60)
+
+    for name, (payload, secrets) in SAMPLES.items():
+        # Strictness check: no planted secret may survive redaction
+        redacted = structural_redact(payload)
+        leaked = [secret for secret in secrets if secret in redacted]
+
+        legacy_s = timeit.timeit(lambda: legacy_redact(payload), number=iterations)
+        structural_s = timeit.timeit(lambda: structural_redact(payload), number=iterations)
+
+        print(f"\n{name} ({len(json.dumps(payload))} bytes serialized)")
+        print(f"  legacy:     {legacy_s / iterations * 1e6:9.1f} us/event")
+        print(f"  structural: {structural_s / iterations * 1e6:9.1f} us/event")
+        print(f"  speedup:    {legacy_s / structural_s:9.2f}x")
+        print(f"  leaked:     {leaked if leaked else 'none'}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,13 @@
 """Check recent error logs from database."""
-from app.storage.db import get_db_sync
-from app.storage.models import Event
-from sqlalchemy import desc
+from app.storage.codec import event_payload
+from app.storage.db import get_read_db
+from app.storage.queries import page_error_aggregates, query_events
 import json
 
-db = get_db_sync()
+db = get_read_db(allow_snapshot=False)
 try:
-    # Get recent errors from dom_bot
-    errors = db.query(Event).filter(
-        Event.source == "dom_bot",
-        Event.type == "error"
-    ).order_by(desc(Event.ts)).limit(5).all()
+    # Get recent errors from dom_bot (falls back to archived events if needed)
+    errors = query_events(db, source="dom_bot", event_type="error", limit=5, include_archive=True)
     
     print(f"Found {len(errors)} recent errors:")
     print("=" * 60)
@@ -18,7 +15,7 @@ try:
     for i, error in enumerate(errors, 1):
         print(f"\nError {i} (at {error.ts}):")
         try:
-            payload = json.loads(error.payload_json)
+            payload = event_payload(error)
             print(f"  Error type: {payload.get('error_type', 'unknown')}")
             print(f"  Error message: {payload.get('error', 'unknown')}")
             if 'error_details' in payload:
@@ -31,8 +28,17 @@ try:
                 print(f"  Using tools: {payload['using_tools']}")
         except Exception as e:
             print(f"  Could not parse payload: {e}")
-            print(f"  Raw payload: {error.payload_json[:500]}")
+            print(f"  Raw payload: {(error.payload_json or repr(error.payload_blob))[:500]}")
         print("-" * 60)
+    
+    # Repeats of the same error are collapsed into aggregates
+    aggregates, _ = page_error_aggregates(db, limit=10)
+    print(f"\nMost recent error groups ({len(aggregates)}):")
+    print("=" * 60)
+    for aggregate in aggregates:
+        print(f"\n[{aggregate.source}] {aggregate.error_type} x{aggregate.count}")
+        print(f"  Message: {aggregate.message}")
+        print(f"  First seen: {aggregate.first_seen}  Last seen: {aggregate.last_seen}")
 finally:
     db.close()
 
@@ -0,0 +1,34 @@
+"""Shared fixtures: each test gets its own database files in a temporary directory."""
+import pytest
+
+from app.core.logger import flush_events
+from app.storage import db as db_module
+from app.storage.async_db import drain_db_executors
+from app.storage.models import Base
+from app.storage.routing import DB_FILE
+
+
+def _reset_engines() -> None:
+    # SQLAlchemy makes a relative SQLite path absolute when the engine is
+    # created, so engines are rebuilt after changing directory
+    for engine in list(db_module._engines.values()) + list(db_module._read_engines.values()):
+        engine.dispose()
+    db_module._engines.clear()
+    db_module._read_engines.clear()
+    db_module._read_sessionmakers.clear()
+    db_module.ENGINE = db_module.get_engine(DB_FILE)
+    db_module.SessionLocal.configure(
+        bind=db_module.ENGINE,
+        binds={table: db_module.engine_for_table(table.name) for table in Base.metadata.sorted_tables},
+    )
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """A migrated, empty database in tmp_path (also the working directory)."""
+    monkeypatch.chdir(tmp_path)
+    _reset_engines()
+    db_module.init_db()
+    yield tmp_path
+    flush_events()
+    drain_db_executors(timeout=5.0)
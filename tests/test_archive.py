@@ -0,0 +1,96 @@
+"""Event archive: moving old events to day segments and reading them back."""
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.core.logger import log_event
+from app.storage.archive import SEGMENT_SUFFIX, archive_events, archived_event_ids, iter_archived_events
+from app.storage.db import get_db_sync
+from app.storage.models import Event
+from app.storage.queries import query_events
+from app.storage.stats import get_table_counts
+
+
+def _now():
+    # Event timestamps are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _log_events(count, days_ago):
+    """Log events, then backdate them; returns their ids."""
+    for i in range(count):
+        log_event("test", "archived" if days_ago else "live", {"n": i, "days_ago": days_ago})
+    db = get_db_sync()
+    try:
+        ids = [
+            event_id for (event_id,) in
+            db.query(Event.id).filter(Event.source == "test", Event.payload_json.like(f'%"days_ago": {days_ago}}}'))
+        ]
+        db.execute(
+            update(Event).where(Event.id.in_(ids)).values(ts=_now() - timedelta(days=days_ago))
+        )
+        db.commit()
+    finally:
+        db.close()
+    return sorted(ids)
+
+
+def test_round_trip(fresh_db):
+    old_ids = _log_events(5, days_ago=10) + _log_events(3, days_ago=3)
+    live_ids = _log_events(2, days_ago=0)
+    db = get_db_sync()
+    try:
+        counted_before = get_table_counts(db)["events"]
+    finally:
+        db.close()
+
+    result = archive_events(timedelta(days=1), archive_dir="archive", batch_size=4)
+
+    assert result["archived"] == len(old_ids)
+    assert len(result["segments"]) == 2
+    db = get_db_sync()
+    try:
+        assert sorted(event_id for (event_id,) in db.query(Event.id).filter(Event.source == "test")) == live_ids
+        # The counters follow the rows out of the table
+        assert get_table_counts(db)["events"] == counted_before - len(old_ids)
+    finally:
+        db.close()
+
+    archived = list(iter_archived_events(archive_dir="archive"))
+    assert sorted(event.id for event in archived) == old_ids
+    assert all(json.loads(event.payload_json)["days_ago"] in (3, 10) for event in archived)
+    assert [event_id for event_id, _ in archived_event_ids("archive")] == old_ids
+
+
+def test_range_reads_only_matching_days(fresh_db):
+    _log_events(2, days_ago=10)
+    recent = _log_events(2, days_ago=3)
+    archive_events(timedelta(days=1), archive_dir="archive")
+
+    since = _now() - timedelta(days=5)
+    assert sorted(event.id for event in iter_archived_events("archive", since=since)) == recent
+
+
+def test_batch_archived_twice_is_read_once(fresh_db):
+    ids = _log_events(3, days_ago=10)
+    archive_events(timedelta(days=1), archive_dir="archive")
+    # A crash between appending a batch and deleting its rows archives it again
+    segment = next((fresh_db / "archive").glob(f"*{SEGMENT_SUFFIX}"))
+    segment.write_bytes(segment.read_bytes() * 2)
+
+    assert [event.id for event in iter_archived_events(archive_dir="archive")] == ids
+
+
+def test_query_events_falls_back_to_the_archive(fresh_db):
+    archived = _log_events(3, days_ago=10)
+    live = _log_events(2, days_ago=0)
+    # EVENT_ARCHIVE_DIR defaults to "archive" in the working directory
+    archive_events(timedelta(days=1))
+
+    db = get_db_sync()
+    try:
+        events = query_events(db, source="test", limit=10, include_archive=True)
+    finally:
+        db.close()
+    assert [event.id for event in events] == sorted(live + archived, reverse=True)
@@ -0,0 +1,91 @@
+"""Parquet export: live and archived events in one id-ordered stream, and resuming it."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.core.logger import log_event
+from app.storage import archive, export
+from app.storage.archive import archive_events
+from app.storage.db import get_db_sync
+from app.storage.models import Event
+
+
+def _log_interleaved(count):
+    """Log events and archive every other one, so archived ids sit between live ones."""
+    for i in range(count):
+        log_event("test", "exported", {"n": i})
+    db = get_db_sync()
+    try:
+        ids = sorted(event_id for (event_id,) in db.query(Event.id).filter(Event.source == "test"))
+        old = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=10)
+        db.execute(update(Event).where(Event.id.in_(ids[1::2])).values(ts=old))
+        db.commit()
+    finally:
+        db.close()
+    archive_events(timedelta(days=1))
+    return ids
+
+
+def _ids(chunks):
+    return [event.id for chunk in chunks for event in chunk]
+
+
+def test_event_stream_merges_archive_in_id_order(fresh_db):
+    ids = _log_interleaved(9)
+
+    chunks = list(export._iter_event_chunks(0, chunk_size=2))
+
+    assert _ids(chunks) == ids
+    assert [len(chunk) for chunk in chunks] == [2, 2, 2, 2, 1]
+
+
+def test_event_stream_resumes_after_the_saved_id(fresh_db):
+    ids = _log_interleaved(9)
+    # An export stopped after its second chunk saved that chunk's last id
+    first = list(export._iter_event_chunks(0, chunk_size=2))[:2]
+    saved = first[-1][-1].id
+
+    rest = list(export._iter_event_chunks(saved, chunk_size=2))
+
+    assert _ids(first) + _ids(rest) == ids
+
+
+def test_segments_below_the_saved_id_are_not_read(fresh_db, monkeypatch):
+    ids = _log_interleaved(4)
+    read = []
+    real_read = archive._read_segment
+
+    def recording_read(archive_dir, day):
+        read.append(day)
+        return real_read(archive_dir, day)
+
+    monkeypatch.setattr(archive, "_read_segment", recording_read)
+
+    assert archive.archived_event_ids(after_id=ids[-1]) == []
+    assert read == []
+
+
+def test_export_resumes_after_interruption(fresh_db, monkeypatch):
+    pytest.importorskip("pyarrow")
+    ids = _log_interleaved(9)
+    real_write = export._write_part
+    writes = []
+
+    def failing_write(*args):
+        if len(writes) == 2:
+            raise OSError("disk full")
+        writes.append(args)
+        return real_write(*args)
+
+    monkeypatch.setattr(export, "_write_part", failing_write)
+    with pytest.raises(OSError):
+        export.export_tables("exports", tables=["events"], chunk_size=2)
+    saved = export.load_export_state("exports")["events"]
+    assert saved in ids
+
+    monkeypatch.setattr(export, "_write_part", real_write)
+    result = export.export_tables("exports", tables=["events"], chunk_size=2)
+
+    assert result["events"]["last_id"] == ids[-1]
+    assert result["events"]["rows"] == len([event_id for event_id in ids if event_id > saved])
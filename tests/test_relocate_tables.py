@@ -0,0 +1,68 @@
+"""relocate_tables: moving routed tables out of the main file, and resuming a move."""
+import sqlite3
+
+import pytest
+
+from app.config.settings import get_settings
+from app.storage.migrations import relocate_tables
+
+MEMORY_SCHEMA = "CREATE TABLE memory (id INTEGER PRIMARY KEY, key TEXT, value TEXT)"
+ROWS = [("a", "1"), ("b", "2"), ("c", "3")]
+
+
+@pytest.fixture
+def split_control(tmp_path, monkeypatch):
+    """Route the control tables to control.db, with an empty memory table there."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(get_settings(), "db_control_file", "control.db")
+    with sqlite3.connect("control.db") as conn:
+        conn.execute(MEMORY_SCHEMA)
+    return tmp_path
+
+
+def _legacy_memory(rows):
+    with sqlite3.connect("local.db") as conn:
+        conn.execute(MEMORY_SCHEMA)
+        conn.execute("CREATE TABLE memory_fts (value TEXT)")
+        conn.executemany("INSERT INTO memory (key, value) VALUES (?, ?)", rows)
+
+
+def _tables(db_file):
+    with sqlite3.connect(db_file) as conn:
+        return {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+
+def _keys(db_file):
+    with sqlite3.connect(db_file) as conn:
+        return [key for (key,) in conn.execute("SELECT key FROM memory ORDER BY id")]
+
+
+def test_moves_rows_and_drops_legacy_table(split_control):
+    _legacy_memory(ROWS)
+
+    assert relocate_tables("local.db") == {"memory": 3}
+    assert _keys("control.db") == ["a", "b", "c"]
+    assert not {"memory", "memory_fts"} & _tables("local.db")
+    # Nothing left to move on the next start
+    assert relocate_tables("local.db") == {}
+
+
+def test_resumes_move_interrupted_before_the_drop(split_control):
+    _legacy_memory(ROWS)
+    # The copy committed, then the process died before dropping the legacy table
+    with sqlite3.connect("control.db") as conn:
+        conn.executemany("INSERT INTO memory (key, value) VALUES (?, ?)", ROWS)
+
+    assert relocate_tables("local.db") == {"memory": 0}
+    assert _keys("control.db") == ["a", "b", "c"]
+    assert not {"memory", "memory_fts"} & _tables("local.db")
+
+
+def test_leaves_a_diverged_target_alone(split_control):
+    _legacy_memory(ROWS)
+    with sqlite3.connect("control.db") as conn:
+        conn.execute("INSERT INTO memory (key, value) VALUES ('other', 'x')")
+
+    assert relocate_tables("local.db") == {}
+    assert _keys("control.db") == ["other"]
+    assert _keys("local.db") == ["a", "b", "c"]
@@ -0,0 +1,100 @@
+"""Scheduler: one-shot tasks beyond the horizon wait in the database; cancelling them."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config.settings import get_settings
+from app.core.scheduler import Scheduler
+from app.storage.db import get_db_sync
+from app.storage.models import SchedulerTask
+
+
+async def _noop(parameters=None):
+    pass
+
+
+@pytest.fixture
+def scheduler(fresh_db):
+    scheduler = Scheduler()
+    scheduler.start()
+    scheduler.register_restore_handler("noop", _noop)
+    # Restoring starts the refill loop, which is what lets tasks be deferred
+    scheduler.restore_pending_tasks()
+    yield scheduler
+    scheduler.stop()
+
+
+def _status(task_id):
+    db = get_db_sync()
+    try:
+        return db.query(SchedulerTask.status).filter(SchedulerTask.task_id == task_id).scalar()
+    finally:
+        db.close()
+
+
+def _in(minutes):
+    return datetime.now(timezone.utc) + timedelta(minutes=minutes)
+
+
+def _refill(scheduler):
+    return asyncio.run_coroutine_threadsafe(scheduler._refill(), scheduler.loop).result(timeout=5)
+
+
+def test_far_task_waits_in_the_database(scheduler):
+    coro = _noop()
+    task_id = scheduler.schedule_at(_in(24 * 60), coro, handler_type="noop")
+
+    assert task_id not in scheduler._one_shot_tasks
+    # The caller's coroutine is replaced by the handler
+    assert coro.cr_frame is None
+    assert _status(task_id) == "scheduled"
+
+
+def test_near_task_is_held_in_memory(scheduler):
+    task_id = scheduler.schedule_at(_in(5), _noop(), handler_type="noop")
+
+    assert task_id in scheduler._one_shot_tasks
+    assert _status(task_id) == "scheduled"
+
+
+def test_task_without_handler_stays_in_memory(scheduler):
+    task_id = scheduler.schedule_at(_in(24 * 60), _noop())
+
+    assert task_id in scheduler._one_shot_tasks
+
+
+def test_refill_pages_in_tasks_entering_the_horizon(scheduler, monkeypatch):
+    task_ids = scheduler.schedule_many([(_in(24 * 60), "noop", {"n": n}) for n in range(3)])
+    assert not set(task_ids) & set(scheduler._one_shot_tasks)
+
+    monkeypatch.setattr(get_settings(), "scheduler_horizon_minutes", 2 * 24 * 60)
+    assert _refill(scheduler) == 3
+    assert set(task_ids) <= set(scheduler._one_shot_tasks)
+    # Already in memory: a second refill adds nothing
+    assert _refill(scheduler) == 0
+
+
+def test_cancelled_deferred_task_is_not_paged_in(scheduler, monkeypatch):
+    task_id = scheduler.schedule_at(_in(24 * 60), _noop(), handler_type="noop")
+
+    assert scheduler.cancel_one_shot_task(task_id)
+    assert _status(task_id) == "cancelled"
+    monkeypatch.setattr(get_settings(), "scheduler_horizon_minutes", 2 * 24 * 60)
+    assert _refill(scheduler) == 0
+    assert task_id not in scheduler._one_shot_tasks
+
+
+def test_cancel_all_cancels_memory_and_database_tasks(scheduler):
+    near = scheduler.schedule_at(_in(5), _noop(), handler_type="noop")
+    far = scheduler.schedule_at(_in(24 * 60), _noop(), handler_type="noop")
+
+    scheduler.cancel_all()
+    scheduler._journal.flush()
+
+    assert scheduler._one_shot_tasks == {}
+    assert _status(near) == "cancelled"
+    assert _status(far) == "cancelled"
+    # Refills are paused after cancel_all, so new tasks are no longer deferred
+    later = scheduler.schedule_at(_in(24 * 60), _noop(), handler_type="noop")
+    assert later in scheduler._one_shot_tasks
@@ -0,0 +1,76 @@
+"""unit_of_work: one commit per block, rollback on error, savepoints for nested units."""
+import pytest
+
+from app.core.logger import log_event
+from app.storage.db import ambient_session, get_db_sync, get_read_db, unit_of_work
+from app.storage.models import Event, Memory
+
+
+def _memory_keys():
+    # A read session: get_db_sync() would join an open unit
+    db = get_read_db(allow_snapshot=False)
+    try:
+        return sorted(key for (key,) in db.query(Memory.key))
+    finally:
+        db.close()
+
+
+def _event_types():
+    db = get_read_db(allow_snapshot=False)
+    try:
+        return sorted(event_type for (event_type,) in db.query(Event.type).filter(Event.source == "test"))
+    finally:
+        db.close()
+
+
+def test_block_commits_once_at_exit(fresh_db):
+    with unit_of_work() as db:
+        db.add(Memory(key="a", value="1"))
+        log_event("test", "written")
+        # Nothing is visible to other sessions before the unit ends
+        assert _memory_keys() == []
+    assert _memory_keys() == ["a"]
+    assert _event_types() == ["written"]
+
+
+def test_nested_calls_join_the_unit(fresh_db):
+    with unit_of_work():
+        nested = get_db_sync()
+        nested.add(Memory(key="a", value="1"))
+        nested.commit()  # only flushes
+        nested.close()  # leaves the unit's session open
+        assert ambient_session() is not None
+    assert ambient_session() is None
+    assert _memory_keys() == ["a"]
+
+
+def test_raising_block_rolls_back_everything(fresh_db):
+    with pytest.raises(RuntimeError, match="boom"):
+        with unit_of_work() as db:
+            db.add(Memory(key="a", value="1"))
+            log_event("test", "written")
+            raise RuntimeError("boom")
+    assert _memory_keys() == []
+    assert _event_types() == []
+
+
+def test_nested_unit_failure_only_undoes_its_savepoint(fresh_db):
+    with unit_of_work() as db:
+        db.add(Memory(key="outer", value="1"))
+        with pytest.raises(RuntimeError):
+            with unit_of_work() as inner:
+                inner.add(Memory(key="inner", value="1"))
+                inner.flush()
+                raise RuntimeError("boom")
+        with unit_of_work() as inner:
+            inner.add(Memory(key="second", value="1"))
+    assert _memory_keys() == ["outer", "second"]
+
+
+def test_nested_rollback_dooms_the_unit(fresh_db):
+    with pytest.raises(RuntimeError, match="rolled back by a nested call"):
+        with unit_of_work() as db:
+            db.add(Memory(key="a", value="1"))
+            nested = get_db_sync()
+            nested.rollback()
+    assert _memory_keys() == []